@@ -1,6 +1,7 @@
 import os
 
 from celery import Celery
+from celery.signals import worker_process_init
 
 # Set the default Django settings module for the 'celery' program.
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "app.settings")
@@ -23,6 +24,22 @@ app.autodiscover_tasks()
 # }
 
 
+# Pools forked from the parent are kept referenced but never used again:
+# closing or collecting them would close sockets the parent still owns.
+_inherited_pools = []
+
+
+@worker_process_init.connect
+def reset_db_pools(**kwargs):
+    """Give every prefork child its own database pool (DB_POOL_MAX_SIZE)."""
+    from django.db import connections
+
+    for conn in connections.all(initialized_only=True):
+        pools = getattr(conn, "_connection_pools", None)
+        if pools and conn.alias in pools:
+            _inherited_pools.append(pools.pop(conn.alias))
+
+
 @app.task(bind=True, ignore_result=True)
 def debug_task(self):
     print(f"Request: {self.request!r}")
@@ -81,6 +81,8 @@ REST_FRAMEWORK = {
 }
 
 MIDDLEWARE = [
+    # no-op unless METRICS_ENABLED; first so it times the whole stack
+    "core.metrics.RequestMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "corsheaders.middleware.CorsMiddleware",  # 🟢 Add this line HERE
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -89,6 +91,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "core.replicas.PrimaryPinMiddleware",
 ]
 
 ROOT_URLCONF = "app.urls"
@@ -116,6 +119,23 @@ ASGI_APPLICATION = "app.asgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
+# Connections are reused per process; each process (web, Celery worker,
+# Channels) can size its own pool through its environment:
+#   DB_POOL_MAX_SIZE > 0  one psycopg pool per process, shared by all of
+#                         its threads, sync_to_async workers included
+#   DB_POOL_MAX_SIZE = 0  no pool; DB_CONN_MAX_AGE seconds of persistent
+#                         connection per thread instead (0 = per request)
+DB_POOL_MAX_SIZE = int(os.environ.get("DB_POOL_MAX_SIZE") or 10)
+DB_POOL = {
+    "min_size": min(int(os.environ.get("DB_POOL_MIN_SIZE") or 2), DB_POOL_MAX_SIZE),
+    "max_size": DB_POOL_MAX_SIZE,
+    # seconds to wait for a free connection before raising
+    "timeout": float(os.environ.get("DB_POOL_TIMEOUT") or 10),
+    # recycle connections so server-side memory and stale state never pile up
+    "max_lifetime": float(os.environ.get("DB_POOL_MAX_LIFETIME") or 1800),
+    "max_idle": float(os.environ.get("DB_POOL_MAX_IDLE") or 300),
+}
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.postgresql",
@@ -123,9 +143,32 @@ DATABASES = {
         "NAME": os.environ.get("DB_NAME"),
         "USER": os.environ.get("DB_USER"),
         "PASSWORD": os.environ.get("DB_PASS"),
+        # Pooled connections are returned at the end of each request/task.
+        "CONN_MAX_AGE": (
+            0 if DB_POOL_MAX_SIZE else int(os.environ.get("DB_CONN_MAX_AGE") or 0)
+        ),
+        # Check a reused connection before handing it out (also applies to
+        # connections taken from the pool).
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {"pool": DB_POOL} if DB_POOL_MAX_SIZE else {},
     }
 }
 
+# Optional read replica for the public availability and listing endpoints
+# (core.replicas). A user who just wrote reads from the primary for
+# DB_REPLICA_PIN_SECONDS; writes never leave the primary.
+if os.environ.get("DB_REPLICA_HOST"):
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "HOST": os.environ.get("DB_REPLICA_HOST"),
+        "TEST": {"MIRROR": "default"},
+    }
+DATABASE_ROUTERS = ["core.replicas.ReplicaRouter"]
+DB_REPLICA_PIN_SECONDS = int(os.environ.get("DB_REPLICA_PIN_SECONDS") or 10)
+# Cap on how long an answer computed from the replica may be cached, since
+# it can lag behind the write that invalidated the previous one.
+DB_REPLICA_CACHE_TIMEOUT = int(os.environ.get("DB_REPLICA_CACHE_TIMEOUT") or 5)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -222,20 +265,72 @@ SUPPORT_EMAIL = os.environ.get("SUPPORT_EMAIL", "support@example.com")
 SECURITY_EMAIL = os.environ.get("SECURITY_EMAIL", "security@example.com")
 
 
+# Cache (Redis) used by the public availability endpoints
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ.get("REDIS_CACHE_URL") or "redis://redis:6379/1",
+    }
+}
+
+# Seconds a cached availability answer may live; writes invalidate it sooner
+AVAILABILITY_CACHE_TIMEOUT = int(os.environ.get("AVAILABILITY_CACHE_TIMEOUT") or 60)
+
+# Seconds the serialized clinic catalog stays in Redis. Clinic writes move
+# it to a new version key; this only reclaims the old ones.
+CLINIC_CATALOG_TIMEOUT = int(os.environ.get("CLINIC_CATALOG_TIMEOUT") or 60 * 60 * 24)
+
+# Max-age for content-addressed clinic logos (/api/clinic/logos/<hash>/).
+CLINIC_LOGO_MAX_AGE = int(os.environ.get("CLINIC_LOGO_MAX_AGE") or 60 * 60 * 24 * 365)
+
+
+# Per-view latency / SQL metrics (core.metrics), shown to admins at
+# /api/metrics/. Only METRICS_SAMPLE_RATE of the requests are measured.
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "").lower() in ("1", "true")
+METRICS_SAMPLE_RATE = float(os.environ.get("METRICS_SAMPLE_RATE") or 0.1)
+
+# Readiness probe (/api/health/ready/): per-dependency timeout and how
+# long one result is reused before the dependencies are probed again.
+HEALTH_CHECK_TIMEOUT = float(os.environ.get("HEALTH_CHECK_TIMEOUT") or 2.0)
+HEALTH_CHECK_CACHE_SECONDS = float(os.environ.get("HEALTH_CHECK_CACHE_SECONDS") or 5)
+
+# Channel layer. List several Redis URLs in CHANNEL_LAYER_HOSTS (comma
+# separated) to shard channels and groups across them; every ASGI worker
+# must be given the same list in the same order.
 CHANNEL_LAYERS = {
     "default": {
         "BACKEND": "channels_redis.core.RedisChannelLayer",
         "CONFIG": {
-            "hosts": [("redis", 6379)],
+            "hosts": [
+                host.strip()
+                for host in (
+                    os.environ.get("CHANNEL_LAYER_HOSTS") or "redis://redis:6379/0"
+                ).split(",")
+                if host.strip()
+            ],
+            "capacity": int(os.environ.get("CHANNEL_LAYER_CAPACITY") or 100),
         },
     },
 }
 
+# Chat write-behind: messages are broadcast at once, buffered in a Redis
+# stream and persisted in batches by the flush-chat-buffer beat task
+CHAT_WRITE_BEHIND = os.environ.get("CHAT_WRITE_BEHIND", "").lower() in ("1", "true")
+CHAT_BUFFER_REDIS_URL = (
+    os.environ.get("CHAT_BUFFER_REDIS_URL") or "redis://redis:6379/2"
+)
+# Cap on buffered messages (approximate); only reached if flushing stalls
+CHAT_BUFFER_MAXLEN = int(os.environ.get("CHAT_BUFFER_MAXLEN") or 100000)
+
 CELERY_BEAT_SCHEDULE = {
     "prepare-upcoming-chats": {
         "task": "chat.tasks.prepare_upcoming_chats",
         "schedule": 60.0,  # every minute
     },
+    "flush-chat-buffer": {
+        "task": "chat.tasks.flush_chat_buffer",
+        "schedule": 2.0,
+    },
     "close-and-purge-chats": {
         "task": "chat.tasks.auto_close_and_purge",
         "schedule": 100.0,
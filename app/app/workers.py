@@ -0,0 +1,12 @@
+"""Gunicorn worker classes for the ASGI (WebSocket) tier."""
+
+from uvicorn_worker import UvicornWorker
+
+
+class ChannelsWorker(UvicornWorker):
+    """
+    Uvicorn worker for the Channels application. ProtocolTypeRouter has no
+    lifespan handler, so the lifespan protocol is switched off.
+    """
+
+    CONFIG_KWARGS = {**UvicornWorker.CONFIG_KWARGS, "lifespan": "off"}
@@ -0,0 +1,145 @@
+"""
+Doctor day-sheets: every schedule of a doctor-day with its slots.
+
+The days that are not cached yet are read together in one query: the
+doctor's schedules LEFT JOINed to their appointments, the patients and
+the chat sessions. Slots are laid out in Python from the schedule's slot
+grid. Each day is cached on its own under the versioned agenda scope
+(appointment.cache), which every schedule, appointment and chat session
+write to that doctor-day bumps.
+"""
+
+import datetime
+from collections import defaultdict
+
+from django.db.models import F
+
+from schedules.models import DoctorSchedule
+from user.models import full_name
+
+from . import cache as availability_cache
+from .models import Appointment
+
+# Longest span one agenda request may cover, in days.
+MAX_AGENDA_DAYS = 7
+
+FREE = "free"
+BOOKED = "booked"
+CANCELED = "canceled"
+COMPLETED = "completed"
+
+# What a slot shows when several appointments were made for it over
+# time: an active booking wins over a completed visit, which wins over
+# a cancellation. A rescheduled appointment has left its slot.
+SLOT_STATUS = {
+    Appointment.Status.PENDING: (BOOKED, 3),
+    Appointment.Status.CONFIRMED: (BOOKED, 3),
+    Appointment.Status.COMPLETED: (COMPLETED, 2),
+    Appointment.Status.CANCELED: (CANCELED, 1),
+    Appointment.Status.RESCHEDULED: (CANCELED, 1),
+}
+
+
+def load_days(doctor_id, dates):
+    """Build the agenda of each date in one query; {date: [schedule, ...]}."""
+    rows = (
+        DoctorSchedule.all_objects.filter(
+            doctor_id=doctor_id, date__in=dates, is_active=True
+        )
+        .values(
+            "id",
+            "date",
+            "start_time",
+            "end_time",
+            "slot_duration",
+            "clinic_id",
+            "appointment_type",
+            clinic_name=F("clinic__name"),
+            appointment_id=F("appointments__id"),
+            appointment_start=F("appointments__start_time"),
+            appointment_status=F("appointments__status"),
+            patient_id=F("appointments__patient_id"),
+            patient_name=full_name("appointments__patient__"),
+            chat_session_id=F("appointments__chat_session__id"),
+        )
+        .order_by("date", "start_time", "id")
+    )
+
+    schedules = {}
+    appointments = defaultdict(dict)  # schedule ID -> start time -> row
+    for row in rows:
+        schedule = schedules.get(row["id"])
+        if schedule is None:
+            schedule = schedules[row["id"]] = row
+        if row["appointment_id"] is None:
+            continue
+        slot_status, rank = SLOT_STATUS[row["appointment_status"]]
+        current = appointments[row["id"]].get(row["appointment_start"])
+        if current is None or rank > current["rank"]:
+            appointments[row["id"]][row["appointment_start"]] = {
+                "rank": rank,
+                "status": slot_status,
+                "appointment_id": row["appointment_id"],
+                "appointment_status": row["appointment_status"],
+                "patient_id": row["patient_id"],
+                "patient_name": row["patient_name"],
+                "chat_session_id": row["chat_session_id"],
+            }
+
+    days = {date: [] for date in dates}
+    for schedule_id, row in schedules.items():
+        grid = DoctorSchedule(
+            date=row["date"],
+            start_time=row["start_time"],
+            end_time=row["end_time"],
+            slot_duration=row["slot_duration"],
+        ).get_time_slots()
+        booked = appointments.get(schedule_id, {})
+        slots = []
+        for start, end in grid:
+            slot = {"start_time": start.isoformat(), "end_time": end.isoformat()}
+            appointment = booked.get(start)
+            if appointment is None:
+                slot["status"] = FREE
+            else:
+                slot.update(appointment)
+                del slot["rank"]
+            slots.append(slot)
+        days[row["date"]].append(
+            {
+                "id": schedule_id,
+                "clinic_id": row["clinic_id"],
+                "clinic_name": row["clinic_name"],
+                "appointment_type": row["appointment_type"],
+                "start_time": row["start_time"].isoformat(),
+                "end_time": row["end_time"].isoformat(),
+                "slot_duration": row["slot_duration"],
+                "slots": slots,
+            }
+        )
+    return days
+
+
+def doctor_agenda(doctor_id, date_from, days=1):
+    """
+    The doctor's agenda for `days` consecutive dates from date_from, as a
+    list of {"date", "schedules"}. Cached days are reused; the rest are
+    loaded together and cached.
+    """
+    dates = [date_from + datetime.timedelta(days=n) for n in range(days)]
+    cached, missing = {}, {}
+    for date in dates:
+        key, data = availability_cache.lookup(
+            availability_cache.agenda_scope(doctor_id, date)
+        )
+        if data is None:
+            missing[date] = key
+        else:
+            cached[date] = data
+
+    if missing:
+        for date, schedules in load_days(doctor_id, list(missing)).items():
+            availability_cache.store(missing[date], schedules)
+            cached[date] = schedules
+
+    return [{"date": date.isoformat(), "schedules": cached[date]} for date in dates]
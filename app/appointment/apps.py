@@ -2,5 +2,9 @@ from django.apps import AppConfig
 
 
 class AppointmentConfig(AppConfig):
-    default_auto_field = 'django.db.models.BigAutoField'
-    name = 'appointment'
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "appointment"
+
+    def ready(self):
+        # Import signals to ensure they are registered.
+        import appointment.signals  # noqa
@@ -0,0 +1,90 @@
+"""
+Set-based availability queries for the booking endpoints.
+
+Everything here reads the materialized ScheduleSlot rows, so the answers
+come out of a fixed number of SQL queries instead of per-schedule loops.
+"""
+
+import datetime
+
+from django.db.models import Count, F, Q
+
+from schedules.models import DoctorSchedule, ScheduleSlot
+
+# Upper bound on the span a single bulk availability request may cover.
+MAX_RANGE_DAYS = 62
+
+
+def bookable_schedules(appointment_type, now=None, date_from=None, date_to=None):
+    """
+    Active schedules of the given type that have not ended yet,
+    optionally limited to the [date_from, date_to] range.
+    """
+    now = now or datetime.datetime.now()
+    date_from = max(date_from or now.date(), now.date())
+
+    qs = DoctorSchedule.objects.filter(
+        appointment_type=appointment_type, is_active=True, date__gte=date_from
+    ).exclude(date=now.date(), end_time__lte=now.time())
+    if date_to:
+        qs = qs.filter(date__lte=date_to)
+    return qs
+
+
+def available_dates(
+    doctor_id, clinic_id, appointment_type, now=None, date_from=None, date_to=None
+):
+    """
+    Sorted dates on which the doctor has at least one free slot at the clinic.
+    Free and total slot counts are aggregated per date in a single query.
+    """
+    return list(
+        bookable_schedules(appointment_type, now, date_from, date_to)
+        .filter(doctor_id=doctor_id, clinic_id=clinic_id)
+        .values("date")
+        .annotate(
+            total=Count("slots"),
+            booked=Count("slots", filter=Q(slots__is_booked=True)),
+        )
+        .filter(booked__lt=F("total"))
+        .order_by("date")
+        .values_list("date", flat=True)
+    )
+
+
+def free_slot_map(
+    clinic_id, appointment_type, date_from, date_to, doctor_ids=None, now=None
+):
+    """
+    Map doctor_id -> ISO date -> list of free slots for every active doctor
+    at the clinic, read in one query regardless of how many doctors match.
+    """
+    schedules = bookable_schedules(appointment_type, now, date_from, date_to).filter(
+        clinic_id=clinic_id,
+        doctor__doctor_profile__is_active=True,
+    )
+    if doctor_ids:
+        schedules = schedules.filter(doctor_id__in=doctor_ids)
+
+    rows = (
+        ScheduleSlot.objects.filter(schedule__in=schedules, is_booked=False)
+        .order_by("schedule__doctor_id", "schedule__date", "start_time")
+        .values_list(
+            "schedule__doctor_id",
+            "schedule__date",
+            "schedule_id",
+            "start_time",
+            "end_time",
+        )
+    )
+
+    result = {}
+    for doctor_id, day, schedule_id, start, end in rows:
+        result.setdefault(doctor_id, {}).setdefault(day.isoformat(), []).append(
+            {
+                "schedule": schedule_id,
+                "start_time": start.isoformat(),
+                "end_time": end.isoformat(),
+            }
+        )
+    return result
@@ -0,0 +1,114 @@
+"""
+Versioned Redis cache for the public availability endpoints and the
+doctor agenda.
+
+Every cached answer is stored under a key that embeds the version stamp of
+the scope it depends on: (type), (clinic, type), (doctor, clinic, type),
+(doctor, clinic, type, date) or, for the agenda, (doctor, date). Writes to schedules or appointments bump the
+stamps of every scope they touch, both immediately and again once the
+transaction commits, so a reader racing a booking can only ever fill a key
+that is already dead. Cache outages fall through to the database.
+"""
+
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from core import replicas
+
+logger = logging.getLogger(__name__)
+
+
+def type_scope(appointment_type):
+    return f"avail:type:{appointment_type}"
+
+
+def clinic_scope(clinic_id, appointment_type):
+    return f"avail:clinic:{clinic_id}:{appointment_type}"
+
+
+def doctor_scope(doctor_id, clinic_id, appointment_type):
+    return f"avail:doctor:{doctor_id}:{clinic_id}:{appointment_type}"
+
+
+def day_scope(doctor_id, clinic_id, appointment_type, date):
+    return f"avail:day:{doctor_id}:{clinic_id}:{appointment_type}:{date}"
+
+
+def agenda_scope(doctor_id, date):
+    return f"agenda:{doctor_id}:{date}"
+
+
+def lookup(scope):
+    """
+    Return (key, value) for the current version of a scope.
+    value is None on a miss; key is None if the cache is unreachable.
+    """
+    try:
+        version = cache.get(scope)
+        if version is None:
+            version = time.time_ns()
+            if not cache.add(scope, version, timeout=None):
+                version = cache.get(scope, version)
+        key = f"{scope}:v{version}"
+        return key, cache.get(key)
+    except Exception:
+        logger.warning("Availability cache unavailable for %s", scope, exc_info=True)
+        return None, None
+
+
+def store(key, value):
+    """Cache a freshly computed value under a key returned by lookup()."""
+    if key is None:
+        return
+    timeout = settings.AVAILABILITY_CACHE_TIMEOUT
+    if replicas.reading():
+        # The replica may not have the write that bumped this version yet.
+        timeout = min(timeout, settings.DB_REPLICA_CACHE_TIMEOUT)
+    try:
+        cache.set(key, value, timeout)
+    except Exception:
+        logger.warning("Could not store availability for %s", key, exc_info=True)
+
+
+def scopes_for(doctor_id, clinic_id, appointment_type, date):
+    """All scopes whose cached answers depend on one doctor-day."""
+    return {
+        type_scope(appointment_type),
+        clinic_scope(clinic_id, appointment_type),
+        doctor_scope(doctor_id, clinic_id, appointment_type),
+        day_scope(doctor_id, clinic_id, appointment_type, date),
+        agenda_scope(doctor_id, date),
+    }
+
+
+def invalidate(scopes):
+    """Bump the version stamps of the given scopes now and after commit."""
+    scopes = set(scopes)
+    if not scopes:
+        return
+
+    def bump():
+        try:
+            cache.set_many({scope: time.time_ns() for scope in scopes}, timeout=None)
+        except Exception:
+            logger.warning("Could not invalidate availability cache", exc_info=True)
+
+    bump()
+    transaction.on_commit(bump)
+
+
+def invalidate_schedules(schedules):
+    """Invalidate every scope touched by an iterable of DoctorSchedule rows."""
+    scopes = set()
+    for schedule in schedules:
+        scopes |= scopes_for(
+            schedule.doctor_id,
+            schedule.clinic_id,
+            schedule.appointment_type,
+            schedule.date,
+        )
+    invalidate(scopes)
@@ -0,0 +1,112 @@
+"""
+Batched auto-completion of appointments whose slot has ended.
+
+Stale appointments are completed in bounded chunks, each one a single
+UPDATE ... RETURNING in its own short transaction, so a large backlog never
+holds row locks across thousands of round trips. The affected rows are
+handed to one bulk hook per chunk (slot sync + the `appointments_completed`
+signal) instead of per-row save() calls.
+
+Each run scans every active appointment that has ended. There is no
+"since last run" cut-off: an already-ended slot can still be booked later
+the same day, and such a row must be completed too. The partial
+appointment_active_end_idx covers only pending/confirmed rows, so the scan
+stays proportional to what is still active rather than to the table.
+"""
+
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from schedules.models import ScheduleSlot
+
+from .models import Appointment
+from .signals import appointments_completed
+
+BATCH_SIZE = 500
+
+ACTIVE_STATUSES = [Appointment.Status.PENDING, Appointment.Status.CONFIRMED]
+RETURNING = [
+    "id",
+    "schedule_id",
+    "start_time",
+    "doctor_id",
+    "clinic_id",
+    "appointment_type",
+    "date",
+]
+
+
+def stale_appointments(now):
+    """Active appointments that ended at or before now."""
+    return Appointment.objects.filter(status__in=ACTIVE_STATUSES).filter(
+        Q(date__lt=now.date()) | Q(date=now.date(), end_time__lte=now.time())
+    )
+
+
+def complete_chunk(now, batch_size=BATCH_SIZE):
+    """
+    Complete up to batch_size stale appointments in one statement and run the
+    post-completion hook for them. Returns the affected rows as dicts.
+    """
+    ids = stale_appointments(now).order_by("date", "end_time").values("pk")[:batch_size]
+    sql, params = ids.query.sql_with_params()
+    table = Appointment._meta.db_table
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            # Re-check the status on the outer UPDATE: a row cancelled while
+            # we waited for its lock must not be flipped to completed.
+            cursor.execute(
+                f"UPDATE {table} SET status = %s "
+                f"WHERE id IN ({sql}) AND status IN (%s, %s) "
+                f"RETURNING {', '.join(RETURNING)}",
+                [Appointment.Status.COMPLETED, *params, *ACTIVE_STATUSES],
+            )
+            rows = [dict(zip(RETURNING, row)) for row in cursor.fetchall()]
+        if rows:
+            on_completed(rows)
+    return rows
+
+
+def on_completed(rows):
+    """Bulk post-completion hook for one chunk of completed appointments."""
+    ids = [row["id"] for row in rows]
+    # Completed appointments no longer hold their slot.
+    ScheduleSlot.objects.filter(
+        Exists(
+            Appointment.objects.filter(
+                pk__in=ids,
+                schedule=OuterRef("schedule"),
+                start_time=OuterRef("start_time"),
+            )
+        )
+    ).update(
+        is_booked=Exists(
+            Appointment.objects.filter(
+                schedule=OuterRef("schedule"),
+                start_time=OuterRef("start_time"),
+                status__in=ACTIVE_STATUSES,
+            )
+        )
+    )
+    appointments_completed.send(
+        sender=Appointment,
+        appointment_ids=ids,
+        appointments=rows,
+    )
+
+
+def complete_past_appointments(now=None, batch_size=BATCH_SIZE):
+    """
+    Complete every stale appointment in chunks.
+    Returns the number of appointments completed.
+    """
+    now = now or timezone.localtime()
+    total = 0
+    while True:
+        rows = complete_chunk(now, batch_size)
+        total += len(rows)
+        if len(rows) < batch_size:
+            break
+    return total
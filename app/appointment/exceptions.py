@@ -0,0 +1,12 @@
+"""API exceptions for the appointment app."""
+
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class SlotConflict(APIException):
+    """A concurrent request booked the same slot first."""
+
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "This time slot has just been booked. Please pick another."
+    default_code = "slot_conflict"
@@ -0,0 +1,314 @@
+"""
+Django command to benchmark the booking pipeline under concurrent load.
+
+Seeds throwaway clinics, doctors, schedules and patients, drives the
+booking, cancel, reschedule and availability endpoints from one thread per
+patient, and reports latency percentiles, throughput and SQL queries per
+endpoint. Run it against a development or staging database only.
+"""
+
+import argparse
+import datetime
+import random
+import time
+import uuid
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from appointment import cache as availability_cache
+from clinic.models import Clinic
+from profiles.models import DoctorProfile
+from schedules.models import DoctorSchedule, ScheduleSlot
+
+User = get_user_model()
+
+AVAILABILITY_ENDPOINTS = ("available-dates", "available-slots", "available-slots-bulk")
+
+
+def positive_int(value):
+    """argparse type for counts that must be at least 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    """Django command to benchmark booking throughput."""
+
+    help = (
+        "Seed throwaway data and benchmark booking, cancel, reschedule and "
+        "availability endpoints under concurrent load."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clinics", type=positive_int, default=2)
+        parser.add_argument(
+            "--doctors", type=positive_int, default=5, help="Doctors per clinic."
+        )
+        parser.add_argument(
+            "--days",
+            type=positive_int,
+            default=14,
+            help="Days of schedules per doctor.",
+        )
+        parser.add_argument(
+            "--patients",
+            type=positive_int,
+            default=20,
+            help="Concurrent patients; each one drives its own thread.",
+        )
+        parser.add_argument(
+            "--iterations", type=positive_int, default=25, help="Requests per patient."
+        )
+        parser.add_argument(
+            "--hot",
+            action="store_true",
+            help="Send every booking to one popular doctor to measure contention.",
+        )
+        parser.add_argument("--seed", type=int, default=None)
+        parser.add_argument(
+            "--keep", action="store_true", help="Keep the seeded data afterwards."
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        rng = random.Random(options["seed"])
+        tag = uuid.uuid4().hex[:8]
+
+        self.stdout.write(f"Seeding benchmark data ({tag})...")
+        data = self.seed(tag, options)
+        try:
+            self.stdout.write(
+                f"Running {options['patients']} patients x "
+                f"{options['iterations']} requests..."
+            )
+            samples, elapsed = self.run(data, options, rng)
+        finally:
+            if not options["keep"]:
+                self.cleanup(data)
+
+        self.report(samples, elapsed)
+
+    # ─── Seeding ─────────────────────────────────────────────────────── #
+
+    def seed(self, tag, options):
+        with transaction.atomic():
+            clinics = Clinic.objects.bulk_create(
+                Clinic(name=f"Bench {tag} #{i}", name_ar=f"Bench {tag} #{i}")
+                for i in range(options["clinics"])
+            )
+
+            doctors = []
+            for i in range(options["clinics"] * options["doctors"]):
+                doctor = User.objects.create_user(
+                    email=f"bench-{tag}-doctor{i}@example.com",
+                    first_name="Bench",
+                    last_name=f"Doctor {i}",
+                )
+                DoctorProfile.objects.create(user=doctor)
+                doctors.append(doctor)
+
+            patients = [
+                User.objects.create_user(
+                    email=f"bench-{tag}-patient{i}@example.com",
+                    first_name="Bench",
+                    last_name=f"Patient {i}",
+                )
+                for i in range(options["patients"])
+            ]
+
+            today = datetime.date.today()
+            schedules = DoctorSchedule.all_objects.bulk_create(
+                DoctorSchedule(
+                    doctor=doctor,
+                    clinic=clinics[i % len(clinics)],
+                    date=today + datetime.timedelta(days=day),
+                    start_time=datetime.time(9, 0),
+                    end_time=datetime.time(17, 0),
+                    slot_duration=15,
+                    appointment_type="physical",
+                )
+                for i, doctor in enumerate(doctors)
+                for day in range(1, options["days"] + 1)
+            )
+            ScheduleSlot.objects.create_for(schedules)
+            availability_cache.invalidate_schedules(schedules)
+
+        return {
+            "clinics": clinics,
+            "doctors": doctors,
+            "patients": patients,
+            "schedules": schedules,
+            "slots": {
+                s.pk: [start for start, _ in s.get_time_slots()] for s in schedules
+            },
+        }
+
+    def cleanup(self, data):
+        # Cascades to profiles, schedules, slots and appointments.
+        User.objects.filter(
+            pk__in=[u.pk for u in data["doctors"] + data["patients"]]
+        ).delete()
+        Clinic.objects.filter(pk__in=[c.pk for c in data["clinics"]]).delete()
+
+    # ─── Load generation ─────────────────────────────────────────────── #
+
+    def run(self, data, options, rng):
+        jobs = [
+            (patient, data, options, random.Random(rng.random()))
+            for patient in data["patients"]
+        ]
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(jobs)) as pool:
+            results = list(pool.map(lambda job: self.drive(*job), jobs))
+        elapsed = time.perf_counter() - started
+
+        samples = defaultdict(list)
+        for result in results:
+            for endpoint, seconds, queries, status_code in result:
+                samples[endpoint].append((seconds, queries, status_code))
+        return samples, elapsed
+
+    def drive(self, patient, data, options, rng):
+        """One patient's request loop; runs in its own thread/connection."""
+        client = APIClient(SERVER_NAME="localhost")
+        client.force_authenticate(user=patient)
+        booked = []
+        results = []
+
+        if options["hot"]:
+            hot_doctor = data["doctors"][0].pk
+            targets = [s for s in data["schedules"] if s.doctor_id == hot_doctor]
+        else:
+            targets = data["schedules"]
+
+        try:
+            for _ in range(options["iterations"]):
+                endpoints = ["book"] * 3 + list(AVAILABILITY_ENDPOINTS)
+                if booked:
+                    endpoints += ["cancel", "reschedule"]
+                endpoint = rng.choice(endpoints)
+
+                if endpoint == "book":
+                    schedule = rng.choice(targets)
+                    res, seconds, queries = self.timed(
+                        client.post,
+                        reverse("appointment:appointment-list"),
+                        {
+                            "schedule": schedule.pk,
+                            "start_time": rng.choice(data["slots"][schedule.pk]),
+                        },
+                    )
+                    if res.status_code == 201:
+                        booked.append(res.data["id"])
+                elif endpoint == "cancel":
+                    res, seconds, queries = self.timed(
+                        client.post,
+                        reverse(
+                            "appointment:appointment-cancel",
+                            kwargs={"pk": booked.pop()},
+                        ),
+                        {"cancellation_reason": "benchmark"},
+                    )
+                elif endpoint == "reschedule":
+                    schedule = rng.choice(targets)
+                    appointment_id = booked.pop()
+                    res, seconds, queries = self.timed(
+                        client.post,
+                        reverse(
+                            "appointment:appointment-reschedule",
+                            kwargs={"pk": appointment_id},
+                        ),
+                        {
+                            "new_schedule": schedule.pk,
+                            "new_start_time": rng.choice(data["slots"][schedule.pk]),
+                        },
+                    )
+                    booked.append(
+                        res.data["new"]["id"]
+                        if res.status_code == 200
+                        else appointment_id
+                    )
+                else:
+                    res, seconds, queries = self.timed(
+                        client.get,
+                        reverse(f"appointment:{endpoint}"),
+                        self.availability_params(endpoint, rng.choice(targets)),
+                    )
+                results.append((endpoint, seconds, queries, res.status_code))
+        finally:
+            connection.close()
+        return results
+
+    def availability_params(self, endpoint, schedule):
+        params = {"clinic_id": schedule.clinic_id, "type": schedule.appointment_type}
+        if endpoint == "available-slots-bulk":
+            return {
+                **params,
+                "start_date": schedule.date.isoformat(),
+                "end_date": (schedule.date + datetime.timedelta(days=27)).isoformat(),
+            }
+        params["doctor_id"] = schedule.doctor_id
+        if endpoint == "available-slots":
+            params["date"] = schedule.date.isoformat()
+        return params
+
+    def timed(self, method, url, payload):
+        """Issue one request; return (response, seconds, SQL query count)."""
+        queries = []
+
+        def count_queries(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count_queries):
+            started = time.perf_counter()
+            if method.__name__ == "get":
+                res = method(url, payload)
+            else:
+                res = method(url, payload, format="json")
+            seconds = time.perf_counter() - started
+        return res, seconds, len(queries)
+
+    # ─── Reporting ───────────────────────────────────────────────────── #
+
+    def report(self, samples, elapsed):
+        total = sum(len(rows) for rows in samples.values())
+        header = (
+            f"{'endpoint':<22}{'requests':>9}{'p50 ms':>9}{'p99 ms':>9}"
+            f"{'avg SQL':>9}{'max SQL':>9}  statuses"
+        )
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        for endpoint in sorted(samples):
+            rows = samples[endpoint]
+            latencies = [seconds * 1000 for seconds, _, _ in rows]
+            queries = [count for _, count, _ in rows]
+            statuses = Counter(code for _, _, code in rows)
+            self.stdout.write(
+                f"{endpoint:<22}{len(rows):>9}"
+                f"{percentile(latencies, 50):>9.1f}{percentile(latencies, 99):>9.1f}"
+                f"{sum(queries) / len(queries):>9.1f}{max(queries):>9}  "
+                + ", ".join(f"{code}x{n}" for code, n in sorted(statuses.items()))
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{total} requests in {elapsed:.2f}s "
+                f"({total / elapsed if elapsed else 0:.1f} req/s)"
+            )
+        )
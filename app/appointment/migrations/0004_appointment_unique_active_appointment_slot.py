@@ -0,0 +1,21 @@
+# Generated by Django 5.1.15 on 2026-10-18 14:44
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointment', '0003_initial'),
+        ('clinic', '0002_initial'),
+        ('schedules', '0003_scheduleslot'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='appointment',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['pending', 'confirmed'])), fields=('schedule', 'start_time'), name='unique_active_appointment_slot'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.15 on 2026-10-18 14:56
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointment', '0004_appointment_unique_active_appointment_slot'),
+        ('clinic', '0002_initial'),
+        ('schedules', '0004_alter_scheduleslot_options'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(condition=models.Q(('status__in', ['pending', 'confirmed'])), fields=['date', 'end_time'], name='appointment_active_end_idx'),
+        ),
+    ]
@@ -2,14 +2,40 @@
 
 from django.conf import settings
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Exists, F, OuterRef
 
 from clinic.models import Clinic
-from schedules.models import DoctorSchedule
+from schedules.models import DoctorSchedule, ScheduleSlot
+from user.models import full_name
 
 User = settings.AUTH_USER_MODEL
 
 
+class AppointmentQuerySet(models.QuerySet):
+    def listing(self):
+        """
+        Appointment list rows as dicts, with the doctor's and patient's
+        names, the clinic name and the chat session ID joined in, so a
+        list costs one query however long it is. See AppointmentListSerializer.
+        """
+        return self.values(
+            "id",
+            "doctor_id",
+            "patient_id",
+            "clinic_id",
+            "date",
+            "start_time",
+            "appointment_type",
+            "status",
+            "created_at",  # cursor position of the default ordering
+            doctor_name=full_name("doctor__"),
+            patient_name=full_name("patient__"),
+            clinic_name=F("clinic__name"),
+            chat_session_id=F("chat_session__id"),
+        )
+
+
 class Appointment(models.Model):
     class Status(models.TextChoices):
         PENDING = "pending", "Pending"
@@ -77,11 +103,45 @@ class Appointment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = AppointmentQuerySet.as_manager()
+
     class Meta:
         ordering = ["date", "start_time"]
         indexes = [
             models.Index(fields=["status"]),
             models.Index(fields=["date", "start_time"]),
+            # The per-user appointment lists (AppointmentListMixin orderings).
+            models.Index(
+                fields=["doctor", "date", "start_time"],
+                name="appointment_doctor_date_idx",
+            ),
+            models.Index(
+                fields=["patient", "date", "start_time"],
+                name="appointment_patient_date_idx",
+            ),
+            models.Index(
+                fields=["doctor", "-created_at"],
+                name="appointment_doctor_recent_idx",
+            ),
+            models.Index(
+                fields=["patient", "-created_at"],
+                name="appointment_patient_recent_idx",
+            ),
+            # Keeps the auto-completion scan to still-active appointments.
+            models.Index(
+                fields=["date", "end_time"],
+                condition=models.Q(status__in=["pending", "confirmed"]),
+                name="appointment_active_end_idx",
+            ),
+        ]
+        constraints = [
+            # At most one active booking per slot; the database is the
+            # arbiter for concurrent bookings instead of a schedule lock.
+            models.UniqueConstraint(
+                fields=["schedule", "start_time"],
+                condition=models.Q(status__in=["pending", "confirmed"]),
+                name="unique_active_appointment_slot",
+            ),
         ]
         verbose_name = "Appointment"
         verbose_name_plural = "Appointments"
@@ -129,10 +189,33 @@ class Appointment(models.Model):
 
         super().clean()
 
-    def save(self, *args, **kwargs):
-        # Run full model validation before saving.
-        self.full_clean()
-        super().save(*args, **kwargs)
+    def save(self, *args, validate=True, **kwargs):
+        # Run full model validation before saving, unless the caller
+        # (e.g. AppointmentSerializer) has already validated the slot.
+        if validate:
+            self.full_clean()
+        # Saved and synced in one transaction: post_save's on-commit cache
+        # bump must not come before the slot's booked flag is updated.
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+            self.sync_slot()
+
+    def sync_slot(self):
+        """
+        Re-derive the booked flag of this appointment's ScheduleSlot from the
+        active appointments on it, so cancel/reschedule/complete free it.
+        """
+        ScheduleSlot.objects.filter(
+            schedule_id=self.schedule_id, start_time=self.start_time
+        ).update(
+            is_booked=Exists(
+                Appointment.objects.filter(
+                    schedule=OuterRef("schedule"),
+                    start_time=OuterRef("start_time"),
+                    status__in=[self.Status.PENDING, self.Status.CONFIRMED],
+                )
+            )
+        )
 
     def __str__(self):
         return (
@@ -5,14 +5,15 @@ Serializers for the hospital appointment booking system.
 from datetime import datetime, timedelta
 
 from django.contrib.auth import get_user_model
-from django.db import transaction
+from django.db import IntegrityError, transaction
 from django.utils import timezone
 
 from rest_framework import serializers
 
+from appointment.exceptions import SlotConflict
 from appointment.models import Appointment
 from profiles.models import DoctorProfile
-from schedules.models import DoctorSchedule
+from schedules.models import DoctorSchedule, ScheduleSlot
 
 
 class AppointmentSerializer(serializers.ModelSerializer):
@@ -80,15 +81,16 @@ class AppointmentSerializer(serializers.ModelSerializer):
         ).time()
 
         # Validate that the (start_time, computed_end_time) tuple is one of the schedule's valid slots.
-        valid_slots = schedule.get_time_slots()
-        if (start_time, computed_end_time) not in valid_slots:
+        slot = schedule.slots.filter(
+            start_time=start_time, end_time=computed_end_time
+        ).first()
+        if slot is None:
             raise serializers.ValidationError(
                 "Invalid time slot for the selected schedule."
             )
 
         # Validate that the slot is available (i.e. not already booked).
-        available_slots = schedule.get_available_time_slots()
-        if (start_time, computed_end_time) not in available_slots:
+        if slot.is_booked:
             raise serializers.ValidationError("Selected time slot is not available.")
 
         # Pass the computed end_time forward for use in create().
@@ -103,8 +105,8 @@ class AppointmentSerializer(serializers.ModelSerializer):
 
         # Auto-populate related fields from the schedule.
         validated_data["patient"] = self.context["request"].user
-        validated_data["doctor"] = schedule.doctor
-        validated_data["clinic"] = schedule.clinic
+        validated_data["doctor_id"] = schedule.doctor_id
+        validated_data["clinic_id"] = schedule.clinic_id
         validated_data["date"] = schedule.date
         validated_data["appointment_type"] = schedule.appointment_type
         validated_data["end_time"] = computed_end_time
@@ -112,7 +114,20 @@ class AppointmentSerializer(serializers.ModelSerializer):
         # Automatically confirm the appointment if all validations pass.
         validated_data["status"] = Appointment.Status.CONFIRMED
 
-        return super().create(validated_data)
+        # Claim the slot row; a concurrent booking that got there first wins.
+        if not ScheduleSlot.objects.claim(schedule, validated_data["start_time"]):
+            raise SlotConflict()
+
+        # validate() already checked the slot, so skip the model's second
+        # validation pass; the partial unique constraint backs the insert.
+        appointment = Appointment(**validated_data)
+        try:
+            appointment.save(validate=False)
+        except IntegrityError as exc:
+            if "unique_active_appointment_slot" not in str(exc):
+                raise
+            raise SlotConflict()
+        return appointment
 
 
 class ChatSessionMixin(serializers.Serializer):
@@ -155,6 +170,33 @@ class AppointmentReadSerializer(ChatSessionMixin, serializers.ModelSerializer):
         return str(obj.patient) if obj.patient else None
 
 
+class AppointmentListSerializer(serializers.BaseSerializer):
+    """
+    Read-only list serializer for Appointment.objects.listing() rows.
+    Same output as AppointmentReadSerializer, but each row is one dict
+    built directly, with no model instances or per-row field objects.
+    """
+
+    date_field = serializers.DateField()
+    time_field = serializers.TimeField()
+
+    def to_representation(self, row):
+        return {
+            "id": row["id"],
+            "doctor_id": row["doctor_id"],
+            "patient_id": row["patient_id"],
+            "clinic_id": row["clinic_id"],
+            "doctor_name": row["doctor_name"],
+            "patient_name": row["patient_name"],
+            "clinic_name": row["clinic_name"],
+            "date": self.date_field.to_representation(row["date"]),
+            "start_time": self.time_field.to_representation(row["start_time"]),
+            "appointment_type": row["appointment_type"],
+            "status": row["status"],
+            "chat_session_id": row["chat_session_id"],
+        }
+
+
 class RescheduleSerializer(serializers.Serializer):
     new_schedule = serializers.PrimaryKeyRelatedField(
         queryset=DoctorSchedule.objects.all()
@@ -174,14 +216,15 @@ class RescheduleSerializer(serializers.Serializer):
             + timedelta(minutes=new_schedule.slot_duration)
         ).time()
 
-        valid_slots = new_schedule.get_time_slots()
-        if (new_start_time, new_end_time) not in valid_slots:
+        slot = new_schedule.slots.filter(
+            start_time=new_start_time, end_time=new_end_time
+        ).first()
+        if slot is None:
             raise serializers.ValidationError(
                 "Invalid time slot for the selected schedule."
             )
 
-        available_slots = new_schedule.get_available_time_slots()
-        if (new_start_time, new_end_time) not in available_slots:
+        if slot.is_booked:
             raise serializers.ValidationError("Selected time slot is not available.")
 
         data["new_end_time"] = new_end_time
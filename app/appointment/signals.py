@@ -0,0 +1,122 @@
+"""Availability cache invalidation for schedule and appointment writes."""
+
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import Signal, receiver
+
+from clinic.models import Clinic
+from schedules.models import DoctorSchedule
+
+from . import cache as availability_cache
+from .models import Appointment
+
+User = get_user_model()
+
+# The User fields that make up the patient names cached in doctor agendas.
+NAME_FIELDS = ("first_name", "middle_name", "last_name")
+
+# Sent once per batch by appointment.completion with `appointment_ids` and
+# `appointments` (dicts of the completed rows) instead of per-row post_save.
+appointments_completed = Signal()
+
+
+@receiver(pre_save, sender=DoctorSchedule)
+def remember_schedule_scopes(sender, instance, **kwargs):
+    """
+    Remember which doctor-day an existing schedule belonged to, so moving it
+    to another date/clinic/type also invalidates the old scopes.
+    """
+    instance._previous_availability_scopes = set()
+    if instance.pk is None:
+        return
+    previous = (
+        DoctorSchedule.all_objects.filter(pk=instance.pk)
+        .values("doctor_id", "clinic_id", "appointment_type", "date")
+        .first()
+    )
+    if previous:
+        instance._previous_availability_scopes = availability_cache.scopes_for(
+            **previous
+        )
+
+
+@receiver(post_save, sender=DoctorSchedule)
+@receiver(post_delete, sender=DoctorSchedule)
+def invalidate_schedule_availability(sender, instance, **kwargs):
+    """Schedule create/update/soft-delete/delete changes availability."""
+    scopes = getattr(instance, "_previous_availability_scopes", set())
+    availability_cache.invalidate(
+        scopes
+        | availability_cache.scopes_for(
+            instance.doctor_id,
+            instance.clinic_id,
+            instance.appointment_type,
+            instance.date,
+        )
+    )
+
+
+@receiver(post_save, sender=Appointment)
+@receiver(post_delete, sender=Appointment)
+def invalidate_appointment_availability(sender, instance, **kwargs):
+    """Booking, cancelling, rescheduling or completing flips a slot."""
+    availability_cache.invalidate(
+        availability_cache.scopes_for(
+            instance.doctor_id,
+            instance.clinic_id,
+            instance.appointment_type,
+            instance.date,
+        )
+    )
+
+
+@receiver(appointments_completed, sender=Appointment)
+def invalidate_completed_availability(sender, appointments, **kwargs):
+    """Batch completion frees slots without going through save()."""
+    scopes = set()
+    for row in appointments:
+        scopes |= availability_cache.scopes_for(
+            row["doctor_id"], row["clinic_id"], row["appointment_type"], row["date"]
+        )
+    availability_cache.invalidate(scopes)
+
+
+@receiver(post_save, sender=Clinic)
+@receiver(post_delete, sender=Clinic)
+def invalidate_clinic_availability(sender, instance, **kwargs):
+    """Clinic details are embedded in the cached available-clinics lists."""
+    availability_cache.invalidate(
+        availability_cache.type_scope(appointment_type)
+        for appointment_type, _ in DoctorSchedule.APPOINTMENT_TYPE_CHOICES
+    )
+
+
+@receiver(pre_save, sender=User)
+def remember_user_name(sender, instance, update_fields=None, **kwargs):
+    """Remember the stored name of a user whose name may be changing."""
+    instance._previous_name = None
+    if instance.pk is None:
+        return
+    if update_fields is not None and not set(update_fields) & set(NAME_FIELDS):
+        return  # e.g. the last_login update on every login
+    instance._previous_name = (
+        User.objects.filter(pk=instance.pk).values_list(*NAME_FIELDS).first()
+    )
+
+
+@receiver(post_save, sender=User)
+def invalidate_patient_agendas(sender, instance, created, **kwargs):
+    """Doctor agendas embed the patient's name; a rename makes them stale."""
+    previous = getattr(instance, "_previous_name", None)
+    if created or previous is None:
+        return
+    if previous == tuple(getattr(instance, field) for field in NAME_FIELDS):
+        return
+    days = (
+        Appointment.objects.filter(patient=instance)
+        .values_list("doctor_id", "date")
+        .distinct()
+    )
+    availability_cache.invalidate(
+        availability_cache.agenda_scope(doctor_id, date) for doctor_id, date in days
+    )
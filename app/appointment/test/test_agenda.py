@@ -0,0 +1,166 @@
+"""Tests for the cached doctor agenda (day-sheet) endpoint."""
+
+import datetime
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+
+from appointment.models import Appointment
+from chat.models import ChatSession
+from chat.tasks import prepare_upcoming_chats
+from clinic.models import Clinic
+from profiles.models import DoctorProfile
+from schedules.models import DoctorSchedule
+
+User = get_user_model()
+
+
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "agenda-tests",
+        }
+    }
+)
+class DoctorAgendaTests(TestCase):
+    def setUp(self):
+        self.doctor = User.objects.create_user(
+            email="doctor@example.com",
+            first_name="Doc",
+            last_name="Tor",
+            password="password123",
+            role="doctor",
+        )
+        DoctorProfile.objects.create(user=self.doctor)
+        self.patient = User.objects.create_user(
+            email="patient@example.com",
+            first_name="Pat",
+            middle_name="Q",
+            last_name="Ient",
+            password="password123",
+        )
+        self.clinic = Clinic.objects.create(name="Test Clinic")
+        self.date = timezone.localdate() + datetime.timedelta(days=1)
+        self.schedule = DoctorSchedule.objects.create(
+            doctor=self.doctor,
+            clinic=self.clinic,
+            date=self.date,
+            start_time=datetime.time(9, 0),
+            end_time=datetime.time(10, 30),
+            slot_duration=30,
+            appointment_type="online",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.doctor)
+        self.url = reverse("appointment:doctor-agenda")
+
+    def tearDown(self):
+        cache.clear()
+
+    def book(self, hour, minute=0, status=Appointment.Status.CONFIRMED):
+        start = datetime.time(hour, minute)
+        return Appointment.objects.create(
+            patient=self.patient,
+            schedule=self.schedule,
+            start_time=start,
+            end_time=(
+                datetime.datetime.combine(self.date, start)
+                + datetime.timedelta(minutes=30)
+            ).time(),
+            appointment_type="online",
+            status=status,
+        )
+
+    def agenda(self, queries, **params):
+        params.setdefault("date", self.date.isoformat())
+        # IsDoctor's profile check, plus one query if anything is uncached
+        with self.assertNumQueries(queries):
+            res = self.client.get(self.url, params)
+        self.assertEqual(res.status_code, 200)
+        return res.data
+
+    def slots(self, queries):
+        (day,) = self.agenda(queries)
+        (schedule,) = day["schedules"]
+        return schedule["slots"]
+
+    def test_slots_are_annotated_from_one_query(self):
+        booked = self.book(9)
+        session = ChatSession.objects.create(appointment=booked)
+        self.book(9, 30, status=Appointment.Status.CANCELED)
+
+        slots = self.slots(2)
+
+        self.assertEqual([s["status"] for s in slots], ["booked", "canceled", "free"])
+        self.assertEqual(slots[0]["appointment_id"], booked.pk)
+        self.assertEqual(slots[0]["patient_name"], "Pat Q Ient")
+        self.assertEqual(slots[0]["chat_session_id"], session.pk)
+        self.assertIsNone(slots[1]["chat_session_id"])
+        self.assertNotIn("appointment_id", slots[2])
+
+    def test_active_booking_wins_over_cancellation(self):
+        self.book(9, status=Appointment.Status.CANCELED)
+        rebooked = self.book(9)
+        slots = self.slots(2)
+        self.assertEqual(slots[0]["status"], "booked")
+        self.assertEqual(slots[0]["appointment_id"], rebooked.pk)
+
+    def test_cached_per_day_and_invalidated_by_writes(self):
+        self.assertEqual(self.slots(2)[0]["status"], "free")
+        self.assertEqual(self.slots(1)[0]["status"], "free")  # from the cache
+
+        appointment = self.book(9)
+        self.assertEqual(self.slots(2)[0]["status"], "booked")
+
+        appointment.status = Appointment.Status.COMPLETED
+        appointment.save()
+        self.assertEqual(self.slots(2)[0]["status"], "completed")
+
+    def test_patient_rename_invalidates(self):
+        self.book(9)
+        self.assertEqual(self.slots(2)[0]["patient_name"], "Pat Q Ient")
+
+        self.patient.last_login = timezone.now()
+        self.patient.save(update_fields=["last_login"])
+        self.assertEqual(self.slots(1)[0]["patient_name"], "Pat Q Ient")
+
+        self.patient.middle_name = ""
+        self.patient.save()
+        self.assertEqual(self.slots(2)[0]["patient_name"], "Pat Ient")
+
+    def test_chat_session_creation_invalidates(self):
+        appointment = self.book(9)
+        self.assertIsNone(self.slots(2)[0]["chat_session_id"])
+
+        ten_to_nine = timezone.make_aware(
+            datetime.datetime.combine(self.date, datetime.time(8, 50))
+        )
+        with patch("chat.tasks.timezone.localtime", return_value=ten_to_nine):
+            prepare_upcoming_chats()
+
+        session = ChatSession.objects.get(appointment=appointment)
+        self.assertEqual(self.slots(2)[0]["chat_session_id"], session.pk)
+
+    def test_week_reads_uncached_days_together(self):
+        self.agenda(2)  # caches the first day
+        days = self.agenda(2, days=7)
+        self.assertEqual(len(days), 7)
+        self.assertEqual(days[0]["date"], self.date.isoformat())
+        self.assertEqual(len(days[0]["schedules"]), 1)
+        self.assertEqual([len(d["schedules"]) for d in days[1:]], [0] * 6)
+
+    def test_invalid_parameters(self):
+        for params in ({"date": "tomorrow"}, {"days": "0"}, {"days": "8"}):
+            res = self.client.get(self.url, params)
+            self.assertEqual(res.status_code, 400)
+
+    def test_only_doctors(self):
+        self.client.force_authenticate(user=self.patient)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
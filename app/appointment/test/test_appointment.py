@@ -146,7 +146,7 @@ class AppointmentAPITests(APITestCase):
         # List appointments as the patient.
         response = self.patient_client.get(self.appt_list_url, format="json")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        for appt in response.data:
+        for appt in response.data["results"]:
             self.assertEqual(appt["patient_name"], str(self.patient))
 
     def test_list_appointments_doctor(self):
@@ -156,7 +156,7 @@ class AppointmentAPITests(APITestCase):
         # List appointments as the doctor.
         response = self.doctor_client.get(self.appt_list_url, format="json")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        for appt in response.data:
+        for appt in response.data["results"]:
             self.assertEqual(appt["doctor_name"], str(self.doctor))
 
         def test_retrieve_appointment_authorized(self):
@@ -356,3 +356,58 @@ class AppointmentAPITests(APITestCase):
             )
             self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
             self.assertIn("Selected time slot is not available", str(response.data))
+
+
+class OptimisticBookingTests(APITestCase):
+    def setUp(self):
+        self.doctor = User.objects.create_user(
+            email="doctor@example.com",
+            first_name="Doc",
+            last_name="Tor",
+            password="password123",
+            role="doctor",
+        )
+        self.patient = User.objects.create_user(
+            email="patient@example.com",
+            first_name="Pat",
+            last_name="Ient",
+            password="password123",
+            role="patient",
+        )
+        self.clinic = Clinic.objects.create(name="Test Clinic")
+        self.schedule = DoctorSchedule.objects.create(
+            doctor=self.doctor,
+            clinic=self.clinic,
+            date=date.today() + timedelta(days=1),
+            start_time=time(14, 0),
+            end_time=time(15, 0),
+            slot_duration=15,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.patient)
+        self.url = reverse("appointment:appointment-list")
+
+    def book(self, start_time):
+        return self.client.post(
+            self.url,
+            {"schedule": self.schedule.id, "start_time": start_time},
+            format="json",
+        )
+
+    def test_constraint_violation_maps_to_conflict(self):
+        self.assertEqual(self.book("14:00:00").status_code, status.HTTP_201_CREATED)
+        # Simulate a request that validated before the first booking committed.
+        self.schedule.slots.filter(start_time=time(14, 0)).update(is_booked=False)
+
+        res = self.book("14:00:00")
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(self.schedule.appointments.count(), 1)
+
+    def test_booking_runs_a_single_validation_pass(self):
+        # schedule + slot lookup, then claim, insert and slot sync inside
+        # one savepoint; no user/clinic loads and no model-level re-checks
+        with self.assertNumQueries(7):
+            res = self.book("14:15:00")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
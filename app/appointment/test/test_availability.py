@@ -0,0 +1,241 @@
+"""Tests for the set-based availability endpoints."""
+
+from datetime import date, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from appointment.availability import available_dates
+from appointment.models import Appointment
+from clinic.models import Clinic
+from profiles.models import DoctorProfile
+from schedules.models import DoctorSchedule
+
+User = get_user_model()
+
+
+class AvailableDatesTests(APITestCase):
+    def setUp(self):
+        self.doctor = User.objects.create_user(
+            email="doctor@example.com",
+            first_name="Doc",
+            last_name="Tor",
+            password="password123",
+        )
+        DoctorProfile.objects.create(user=self.doctor)
+        self.clinic = Clinic.objects.create(name="Test Clinic")
+        self.today = date.today()
+        # Three future days; the second one gets fully booked.
+        self.schedules = [
+            DoctorSchedule.objects.create(
+                doctor=self.doctor,
+                clinic=self.clinic,
+                date=self.today + timedelta(days=offset),
+                start_time=time(9, 0),
+                end_time=time(10, 0),
+                slot_duration=30,
+            )
+            for offset in (1, 2, 3)
+        ]
+        self.schedules[1].slots.update(is_booked=True)
+        self.client = APIClient()
+        self.url = reverse("appointment:available-dates")
+
+    def test_available_dates_skips_fully_booked_days(self):
+        dates = available_dates(self.doctor.id, self.clinic.id, "physical")
+
+        self.assertEqual(
+            dates,
+            [self.today + timedelta(days=1), self.today + timedelta(days=3)],
+        )
+
+    def test_available_dates_respects_range(self):
+        dates = available_dates(
+            self.doctor.id,
+            self.clinic.id,
+            "physical",
+            date_from=self.today + timedelta(days=2),
+            date_to=self.today + timedelta(days=2),
+        )
+
+        self.assertEqual(dates, [])
+
+    def test_view_uses_constant_queries(self):
+        params = {
+            "doctor_id": self.doctor.id,
+            "clinic_id": self.clinic.id,
+            "type": "physical",
+        }
+        # clinic lookup + doctor check + one aggregate query
+        with self.assertNumQueries(3):
+            res = self.client.get(self.url, params)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data), 2)
+
+
+class BulkAvailabilityTests(APITestCase):
+    def setUp(self):
+        self.clinic = Clinic.objects.create(name="Test Clinic")
+        self.today = date.today()
+        self.doctors = []
+        for i in range(3):
+            doctor = User.objects.create_user(
+                email=f"doctor{i}@example.com",
+                first_name="Doc",
+                last_name=f"Tor{i}",
+                password="password123",
+            )
+            DoctorProfile.objects.create(user=doctor)
+            for offset in (1, 2):
+                DoctorSchedule.objects.create(
+                    doctor=doctor,
+                    clinic=self.clinic,
+                    date=self.today + timedelta(days=offset),
+                    start_time=time(9, 0),
+                    end_time=time(10, 0),
+                    slot_duration=30,
+                )
+            self.doctors.append(doctor)
+        self.client = APIClient()
+        self.url = reverse("appointment:available-slots-bulk")
+        self.params = {
+            "clinic_id": self.clinic.id,
+            "type": "physical",
+            "start_date": self.today.isoformat(),
+            "end_date": (self.today + timedelta(days=30)).isoformat(),
+        }
+
+    def test_bulk_map_for_all_doctors(self):
+        # clinic check + one slot query, independent of doctor count
+        with self.assertNumQueries(2):
+            res = self.client.get(self.url, self.params)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(res.data), {d.id for d in self.doctors})
+        day = (self.today + timedelta(days=1)).isoformat()
+        slots = res.data[self.doctors[0].id][day]
+        self.assertEqual([s["start_time"] for s in slots], ["09:00:00", "09:30:00"])
+
+    def test_bulk_map_filters_doctors_and_booked_slots(self):
+        schedule = DoctorSchedule.objects.get(
+            doctor=self.doctors[1], date=self.today + timedelta(days=1)
+        )
+        schedule.slots.update(is_booked=True)
+        ids = f"{self.doctors[1].id},{self.doctors[2].id}"
+
+        res = self.client.get(self.url, {**self.params, "doctor_ids": ids})
+
+        self.assertEqual(set(res.data), {self.doctors[1].id, self.doctors[2].id})
+        self.assertEqual(
+            list(res.data[self.doctors[1].id]),
+            [(self.today + timedelta(days=2)).isoformat()],
+        )
+
+    def test_bulk_rejects_long_range(self):
+        params = {
+            **self.params,
+            "end_date": (self.today + timedelta(days=365)).isoformat(),
+        }
+
+        res = self.client.get(self.url, params)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "availability-tests",
+        }
+    }
+)
+class AvailabilityCacheTests(APITestCase):
+    def setUp(self):
+        self.doctor = User.objects.create_user(
+            email="doctor@example.com",
+            first_name="Doc",
+            last_name="Tor",
+            password="password123",
+        )
+        DoctorProfile.objects.create(user=self.doctor)
+        self.patient = User.objects.create_user(
+            email="patient@example.com",
+            first_name="Pat",
+            last_name="Ient",
+            password="password123",
+        )
+        self.clinic = Clinic.objects.create(name="Test Clinic")
+        self.day = date.today() + timedelta(days=1)
+        self.schedule = DoctorSchedule.objects.create(
+            doctor=self.doctor,
+            clinic=self.clinic,
+            date=self.day,
+            start_time=time(9, 0),
+            end_time=time(10, 0),
+            slot_duration=30,
+        )
+        self.client = APIClient()
+        self.params = {
+            "doctor_id": self.doctor.id,
+            "clinic_id": self.clinic.id,
+            "type": "physical",
+        }
+
+    def test_repeat_request_served_from_cache(self):
+        url = reverse("appointment:available-dates")
+        self.client.get(url, self.params)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(url, self.params)
+
+        self.assertEqual(res.data, [self.day.isoformat()])
+
+    def test_booking_invalidates_cached_slots(self):
+        url = reverse("appointment:available-slots")
+        params = {**self.params, "date": self.day.isoformat()}
+        res = self.client.get(url, params)
+        self.assertEqual(len(res.data[0]["available_time_slots"]), 2)
+
+        Appointment.objects.create(
+            patient=self.patient,
+            schedule=self.schedule,
+            start_time=time(9, 0),
+            end_time=time(9, 30),
+        )
+        res = self.client.get(url, params)
+
+        self.assertEqual(res.data[0]["available_time_slots"], ["09:30:00 - 10:00:00"])
+
+    def test_soft_delete_invalidates_cached_dates(self):
+        url = reverse("appointment:available-dates")
+        self.client.get(url, self.params)
+
+        self.schedule.is_active = False
+        self.schedule.save()
+        res = self.client.get(url, self.params)
+
+        self.assertEqual(res.data, [])
+
+    def test_clinic_list_invalidated_by_new_schedule(self):
+        url = reverse("appointment:available-clinics")
+        res = self.client.get(url, {"type": "online"})
+        self.assertEqual(res.data, [])
+
+        DoctorSchedule.objects.create(
+            doctor=self.doctor,
+            clinic=self.clinic,
+            date=self.day,
+            start_time=time(11, 0),
+            end_time=time(12, 0),
+            slot_duration=30,
+            appointment_type="online",
+        )
+        res = self.client.get(url, {"type": "online"})
+
+        self.assertEqual([c["id"] for c in res.data], [self.clinic.id])
@@ -0,0 +1,58 @@
+"""
+Test the appointment management commands.
+"""
+
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import TransactionTestCase
+
+from clinic.models import Clinic
+from schedules.models import DoctorSchedule
+
+User = get_user_model()
+
+
+class BenchmarkBookingCommandTests(TransactionTestCase):
+    """The benchmark spawns threads, so seeded rows must really commit."""
+
+    def test_benchmark_reports_and_cleans_up(self):
+        out = StringIO()
+
+        call_command(
+            "benchmark_booking",
+            clinics=1,
+            doctors=1,
+            days=1,
+            patients=2,
+            iterations=3,
+            seed=1,
+            stdout=out,
+        )
+
+        report = out.getvalue()
+        self.assertIn("p99 ms", report)
+        self.assertIn("6 requests in", report)
+        self.assertFalse(User.objects.exists())
+        self.assertFalse(Clinic.objects.exists())
+        self.assertFalse(DoctorSchedule.all_objects.exists())
+
+    def test_benchmark_keep_leaves_data(self):
+        call_command(
+            "benchmark_booking",
+            clinics=1,
+            doctors=2,
+            days=2,
+            patients=1,
+            iterations=1,
+            keep=True,
+            stdout=StringIO(),
+        )
+
+        self.assertEqual(User.objects.count(), 3)
+        self.assertEqual(DoctorSchedule.all_objects.count(), 4)
+
+    def test_counts_must_be_positive(self):
+        with self.assertRaisesMessage(CommandError, "must be at least 1"):
+            call_command("benchmark_booking", "--patients", "0", stdout=StringIO())
@@ -0,0 +1,113 @@
+"""Tests for batched auto-completion of past appointments."""
+
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from appointment.completion import complete_past_appointments
+from appointment.models import Appointment
+from appointment.signals import appointments_completed
+from appointment.tasks import auto_complete_old_appointments
+from clinic.models import Clinic
+from profiles.models import DoctorProfile
+from schedules.models import DoctorSchedule
+
+User = get_user_model()
+
+
+class AutoCompleteTests(TestCase):
+    def setUp(self):
+        self.doctor = User.objects.create_user(
+            email="doctor@example.com",
+            first_name="Doc",
+            last_name="Tor",
+            password="password123",
+        )
+        DoctorProfile.objects.create(user=self.doctor)
+        self.patient = User.objects.create_user(
+            email="patient@example.com",
+            first_name="Pat",
+            last_name="Ient",
+            password="password123",
+        )
+        self.clinic = Clinic.objects.create(name="Test Clinic")
+        self.now = timezone.localtime()
+        self.past = self.schedule(-2)
+        self.future = self.schedule(2)
+
+    def schedule(self, days):
+        return DoctorSchedule.objects.create(
+            doctor=self.doctor,
+            clinic=self.clinic,
+            date=self.now.date() + datetime.timedelta(days=days),
+            start_time=datetime.time(9, 0),
+            end_time=datetime.time(12, 0),
+            slot_duration=30,
+        )
+
+    def book(self, schedule, hour, minute=0, status=Appointment.Status.CONFIRMED):
+        start = datetime.time(hour, minute)
+        end = (
+            datetime.datetime.combine(schedule.date, start)
+            + datetime.timedelta(minutes=30)
+        ).time()
+        return Appointment.objects.create(
+            patient=self.patient,
+            schedule=schedule,
+            start_time=start,
+            end_time=end,
+            status=status,
+        )
+
+    def test_completes_only_stale_active_appointments(self):
+        stale = [
+            self.book(self.past, 9),
+            self.book(self.past, 10, status=Appointment.Status.PENDING),
+        ]
+        canceled = self.book(self.past, 11, status=Appointment.Status.CANCELED)
+        upcoming = self.book(self.future, 9)
+
+        result = auto_complete_old_appointments()
+
+        self.assertEqual(result, "Auto-completed 2 appointments.")
+        for appt in stale:
+            appt.refresh_from_db()
+            self.assertEqual(appt.status, Appointment.Status.COMPLETED)
+        canceled.refresh_from_db()
+        upcoming.refresh_from_db()
+        self.assertEqual(canceled.status, Appointment.Status.CANCELED)
+        self.assertEqual(upcoming.status, Appointment.Status.CONFIRMED)
+        self.assertFalse(self.past.slots.filter(is_booked=True).exists())
+        self.assertTrue(self.future.slots.get(start_time=datetime.time(9)).is_booked)
+
+    def test_chunks_run_one_hook_each(self):
+        for i in range(5):
+            self.book(self.past, 9 + i // 2, 30 * (i % 2))
+        batches = []
+
+        def receiver(sender, appointment_ids, **kwargs):
+            batches.append(len(appointment_ids))
+
+        appointments_completed.connect(receiver)
+        try:
+            # Per chunk: UPDATE ... RETURNING + slot sync (+ savepoint pair)
+            with self.assertNumQueries(12):
+                count = complete_past_appointments(now=self.now, batch_size=2)
+        finally:
+            appointments_completed.disconnect(receiver)
+
+        self.assertEqual(count, 5)
+        self.assertEqual(batches, [2, 2, 1])
+
+    def test_late_booking_of_an_ended_slot_is_completed(self):
+        complete_past_appointments(now=self.now)
+        # Booked after the previous run, for a slot that had already ended.
+        late = self.book(self.past, 9)
+
+        count = complete_past_appointments(now=self.now)
+
+        self.assertEqual(count, 1)
+        late.refresh_from_db()
+        self.assertEqual(late.status, Appointment.Status.COMPLETED)
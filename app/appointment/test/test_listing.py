@@ -0,0 +1,189 @@
+"""Tests for the values()-based appointment list read path."""
+
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+
+from appointment.models import Appointment
+from appointment.serializers import AppointmentReadSerializer
+from chat.models import ChatSession
+from clinic.models import Clinic
+from profiles.models import DoctorProfile
+from schedules.models import DoctorSchedule
+
+User = get_user_model()
+
+
+class AppointmentListingTests(TestCase):
+    def setUp(self):
+        self.doctor = User.objects.create_user(
+            email="doctor@example.com",
+            first_name="Doc",
+            middle_name="Middle",
+            last_name="Tor",
+            password="password123",
+            role="doctor",
+        )
+        DoctorProfile.objects.create(user=self.doctor)
+        schedule = DoctorSchedule.objects.create(
+            doctor=self.doctor,
+            clinic=Clinic.objects.create(name="Test Clinic"),
+            date=timezone.localdate() + datetime.timedelta(days=1),
+            start_time=datetime.time(9, 0),
+            end_time=datetime.time(12, 0),
+            slot_duration=15,
+            appointment_type="online",
+        )
+        self.appointments = []
+        for i, (start, end) in enumerate(schedule.get_time_slots()):
+            patient = User.objects.create_user(
+                email=f"patient{i}@example.com",
+                first_name="Pat",
+                middle_name="" if i % 2 else None,
+                last_name=f"Ient{i}",
+                password="password123",
+            )
+            self.appointments.append(
+                Appointment.objects.create(
+                    patient=patient,
+                    schedule=schedule,
+                    start_time=start,
+                    end_time=end,
+                    appointment_type="online",
+                )
+            )
+        ChatSession.objects.create(appointment=self.appointments[0])
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.doctor)
+
+    def expected(self):
+        appointments = Appointment.objects.select_related(
+            "doctor", "patient", "clinic", "chat_session"
+        ).order_by("-created_at")
+        return AppointmentReadSerializer(appointments, many=True).data
+
+    def test_doctor_list_query_count_is_constant(self):
+        # IsDoctor's profile check, then the list itself
+        with self.assertNumQueries(2):
+            res = self.client.get(reverse("appointment:doctor-appointments"))
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(len(res.data["results"]), len(self.appointments))
+        self.assertEqual(res.data["results"], self.expected())
+
+    def test_viewset_list_matches_read_serializer(self):
+        with self.assertNumQueries(1):
+            res = self.client.get(reverse("appointment:appointment-list"))
+        self.assertEqual(res.status_code, 200)
+        rows = res.data["results"]
+        self.assertEqual(rows, self.expected())
+        names = {row["doctor_name"] for row in rows}
+        self.assertEqual(names, {"Doc Middle Tor"})
+        sessions = [row["chat_session_id"] for row in rows]
+        self.assertEqual(sessions.count(None), len(self.appointments) - 1)
+
+    def test_missing_doctor_has_no_name(self):
+        appointment = self.appointments[0]
+        Appointment.objects.filter(pk=appointment.pk).update(doctor=None)
+        appointment.refresh_from_db()
+
+        (row,) = Appointment.objects.filter(pk=appointment.pk).listing()
+
+        self.assertIsNone(row["doctor_name"])
+        self.assertEqual(
+            row["doctor_name"],
+            AppointmentReadSerializer(appointment).data["doctor_name"],
+        )
+
+    def test_cursor_pages_cover_the_list_once(self):
+        ids = []
+        url = reverse("appointment:appointment-list") + "?page_size=5"
+        while url:
+            with self.assertNumQueries(1):
+                res = self.client.get(url)
+            self.assertEqual(res.status_code, 200)
+            self.assertNotIn("count", res.data)
+            self.assertLessEqual(len(res.data["results"]), 5)
+            ids += [row["id"] for row in res.data["results"]]
+            url = res.data["next"]
+        self.assertEqual(ids, [row["id"] for row in self.expected()])
+
+
+class AppointmentWindowTests(TestCase):
+    def setUp(self):
+        self.patient = User.objects.create_user(
+            email="patient@example.com",
+            first_name="Pat",
+            last_name="Ient",
+            password="password123",
+        )
+        doctor = User.objects.create_user(
+            email="doctor@example.com",
+            first_name="Doc",
+            last_name="Tor",
+            password="password123",
+            role="doctor",
+        )
+        clinic = Clinic.objects.create(name="Test Clinic")
+        self.today = timezone.localdate()
+        self.by_offset = {}
+        for offset in (-3, -1, 1, 2, 5):
+            schedule = DoctorSchedule.objects.create(
+                doctor=doctor,
+                clinic=clinic,
+                date=self.today + datetime.timedelta(days=offset),
+                start_time=datetime.time(9, 0),
+                end_time=datetime.time(10, 0),
+                slot_duration=30,
+            )
+            # Past schedules do not validate, so fill in the snapshot fields.
+            appointment = Appointment(
+                patient=self.patient,
+                doctor=doctor,
+                clinic=clinic,
+                schedule=schedule,
+                date=schedule.date,
+                start_time=datetime.time(9, 0),
+                end_time=datetime.time(9, 30),
+            )
+            appointment.save(validate=False)
+            self.by_offset[offset] = appointment.pk
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.patient)
+        self.url = reverse("appointment:appointment-list")
+
+    def ids(self, **params):
+        res = self.client.get(self.url, params)
+        self.assertEqual(res.status_code, 200)
+        return [row["id"] for row in res.data["results"]]
+
+    def test_upcoming_soonest_first(self):
+        expected = [self.by_offset[offset] for offset in (1, 2, 5)]
+        self.assertEqual(self.ids(when="upcoming"), expected)
+
+    def test_past_most_recent_first(self):
+        expected = [self.by_offset[offset] for offset in (-1, -3)]
+        self.assertEqual(self.ids(when="past"), expected)
+
+    def test_date_window_is_inclusive(self):
+        window = {
+            "from": (self.today - datetime.timedelta(days=1)).isoformat(),
+            "to": (self.today + datetime.timedelta(days=2)).isoformat(),
+            "when": "upcoming",
+        }
+        expected = [self.by_offset[offset] for offset in (1, 2)]
+        self.assertEqual(self.ids(**window), expected)
+
+    def test_invalid_parameters(self):
+        for params in (
+            {"when": "someday"},
+            {"from": "18-10-2026"},
+            {"from": "2026-10-18", "to": "2026-10-17"},
+        ):
+            res = self.client.get(self.url, params)
+            self.assertEqual(res.status_code, 400)
+            self.assertIn("detail", res.data)
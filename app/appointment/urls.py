@@ -12,6 +12,8 @@ from .views import (
     AvailableDatesView,
     AvailableDoctorsView,
     AvailableTimeSlotsView,
+    BulkAvailabilityView,
+    DoctorAgendaView,
     DoctorAppointmentListView,
 )
 
@@ -29,10 +31,16 @@ urlpatterns = [
     ),
     path("available-dates/", AvailableDatesView.as_view(), name="available-dates"),
     path("available-slots/", AvailableTimeSlotsView.as_view(), name="available-slots"),
+    path(
+        "available-slots/bulk/",
+        BulkAvailabilityView.as_view(),
+        name="available-slots-bulk",
+    ),
     path(
         "doctor/",
         DoctorAppointmentListView.as_view(),
         name="doctor-appointments",
     ),
+    path("doctor/agenda/", DoctorAgendaView.as_view(), name="doctor-agenda"),
     path("", include(router.urls)),
 ]
@@ -4,24 +4,35 @@ Views for the hospital appointment booking system.
 
 import datetime
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.db import transaction
+from django.db.models import Prefetch, Q
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 
 from rest_framework import generics, permissions, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ParseError
+from rest_framework.pagination import CursorPagination
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from clinic.catalog import catalog
 from clinic.models import Clinic
-from clinic.serializers import ClinicSerializer
+from core.conditional import ConditionalGetMixin
+from core.replicas import ReplicaReadMixin
 from profiles.models import DoctorProfile
-from schedules.models import DoctorSchedule
+from schedules.models import DoctorSchedule, ScheduleSlot
 from schedules.serializers import DoctorScheduleSerializer
 
+from . import cache as availability_cache
+from .agenda import MAX_AGENDA_DAYS, doctor_agenda
+from .availability import MAX_RANGE_DAYS, available_dates, free_slot_map
 from .models import Appointment
 from .permissions import IsDoctor
 from .serializers import (
+    AppointmentListSerializer,
     AppointmentReadSerializer,
     AppointmentSerializer,
     DoctorSerializer,
@@ -31,8 +42,30 @@ from .serializers import (
 # from django.utils import timezone
 # from datetime import timedelta
 
+APPOINTMENT_TYPES = ("physical", "online")
 
-class AvailableClinicsView(APIView):
+
+class AvailabilityConditionalMixin(ConditionalGetMixin):
+    """
+    ETag / 304 for the available-* endpoints. The validators follow the
+    availability scope the answer is cached under, and also roll over every
+    AVAILABILITY_CACHE_TIMEOUT seconds, as slots slip into the past.
+    """
+
+    @property
+    def conditional_max_age(self):
+        return settings.AVAILABILITY_CACHE_TIMEOUT
+
+    def get_availability_scope(self, params):
+        """The scope of a well-formed request; None means no validators."""
+        return None
+
+    def get_version_scopes(self):
+        scope = self.get_availability_scope(self.request.query_params)
+        return [scope] if scope else []
+
+
+class AvailableClinicsView(AvailabilityConditionalMixin, ReplicaReadMixin, APIView):
     """
     Returns list of clinics with active schedules for a given appointment type
     Example: /api/appointments/available-clinics/?type=physical
@@ -40,6 +73,11 @@ class AvailableClinicsView(APIView):
 
     permission_classes = [permissions.AllowAny]
 
+    def get_availability_scope(self, params):
+        appointment_type = params.get("type")
+        if appointment_type in APPOINTMENT_TYPES:
+            return availability_cache.type_scope(appointment_type)
+
     def get(self, request):
         appointment_type = request.query_params.get("type")
 
@@ -56,6 +94,13 @@ class AvailableClinicsView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
+        # Serve from the availability cache when possible
+        cache_key, data = availability_cache.lookup(
+            availability_cache.type_scope(appointment_type)
+        )
+        if data is not None:
+            return Response(data)
+
         # Get current date-aware datetime for time comparison
         now = datetime.datetime.now()
 
@@ -69,14 +114,15 @@ class AvailableClinicsView(APIView):
             .distinct()
         )
 
-        # Get unique clinics
-        clinics = Clinic.objects.filter(id__in=clinic_ids)
-        serializer = ClinicSerializer(clinics, many=True)
+        # Pick those clinics from the cached catalog
+        clinic_ids = set(clinic_ids)
+        data = [clinic for clinic in catalog() if clinic["id"] in clinic_ids]
 
-        return Response(serializer.data)
+        availability_cache.store(cache_key, data)
+        return Response(data)
 
 
-class AvailableDoctorsView(APIView):
+class AvailableDoctorsView(AvailabilityConditionalMixin, ReplicaReadMixin, APIView):
     """
     Returns list of doctors with active schedules for given clinic and appointment type
     Example: /api/appointments/available-doctors/?clinic_id=1&type=physical
@@ -84,6 +130,12 @@ class AvailableDoctorsView(APIView):
 
     permission_classes = [permissions.AllowAny]
 
+    def get_availability_scope(self, params):
+        clinic_id = params.get("clinic_id", "")
+        appointment_type = params.get("type")
+        if appointment_type in APPOINTMENT_TYPES and clinic_id.isdigit():
+            return availability_cache.clinic_scope(int(clinic_id), appointment_type)
+
     def get(self, request):
         clinic_id = request.query_params.get("clinic_id")
         appointment_type = request.query_params.get("type")
@@ -101,6 +153,18 @@ class AvailableDoctorsView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
+        if not clinic_id.isdigit():
+            return Response(
+                {"detail": "Invalid clinic ID"}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # Serve from the availability cache when possible
+        cache_key, data = availability_cache.lookup(
+            availability_cache.clinic_scope(int(clinic_id), appointment_type)
+        )
+        if data is not None:
+            return Response(data)
+
         # Validate clinic exists
         try:
             clinic = Clinic.objects.get(pk=clinic_id)
@@ -137,10 +201,11 @@ class AvailableDoctorsView(APIView):
         )
 
         serializer = DoctorSerializer(doctors, many=True)
+        availability_cache.store(cache_key, serializer.data)
         return Response(serializer.data)
 
 
-class AvailableDatesView(APIView):
+class AvailableDatesView(AvailabilityConditionalMixin, ReplicaReadMixin, APIView):
     """
     Returns list of available dates for appointments
     given doctor_id, clinic_id, and appointment_type
@@ -149,6 +214,19 @@ class AvailableDatesView(APIView):
 
     permission_classes = [permissions.AllowAny]
 
+    def get_availability_scope(self, params):
+        doctor_id = params.get("doctor_id", "")
+        clinic_id = params.get("clinic_id", "")
+        appointment_type = params.get("type")
+        if (
+            appointment_type in APPOINTMENT_TYPES
+            and doctor_id.isdigit()
+            and clinic_id.isdigit()
+        ):
+            return availability_cache.doctor_scope(
+                int(doctor_id), int(clinic_id), appointment_type
+            )
+
     def get(self, request):
         doctor_id = request.query_params.get("doctor_id")
         clinic_id = request.query_params.get("clinic_id")
@@ -167,6 +245,25 @@ class AvailableDatesView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
+        if not clinic_id.isdigit():
+            return Response(
+                {"detail": "Invalid clinic ID"}, status=status.HTTP_400_BAD_REQUEST
+            )
+        if not doctor_id.isdigit():
+            return Response(
+                {"detail": "No active doctor found with this ID"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Serve from the availability cache when possible
+        cache_key, data = availability_cache.lookup(
+            availability_cache.doctor_scope(
+                int(doctor_id), int(clinic_id), appointment_type
+            )
+        )
+        if data is not None:
+            return Response(data)
+
         # Validate clinic exists
         try:
             clinic = Clinic.objects.get(pk=clinic_id)
@@ -182,34 +279,14 @@ class AvailableDatesView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Get current datetime for time comparison
-        now = datetime.datetime.now()
+        # Dates with at least one free slot, aggregated in a single query
+        dates = available_dates(doctor_id, clinic.pk, appointment_type)
+        data = [date.isoformat() for date in dates]
+        availability_cache.store(cache_key, data)
+        return Response(data)
 
-        # Get active schedules with available slots
-        schedules = (
-            DoctorSchedule.objects.filter(
-                doctor=doctor_id,
-                clinic=clinic,
-                appointment_type=appointment_type,
-                is_active=True,
-                date__gte=now.date(),
-            )
-            .exclude(date=now.date(), end_time__lte=now.time())
-            .prefetch_related("appointments")
-        )
-
-        # Collect dates with available slots
-        available_dates = []
-        for schedule in schedules:
-            if schedule.get_available_time_slots():
-                available_dates.append(schedule.date)
 
-        # Return unique sorted dates
-        unique_dates = sorted(list(set(available_dates)))
-        return Response([date.isoformat() for date in unique_dates])
-
-
-class AvailableTimeSlotsView(APIView):
+class AvailableTimeSlotsView(AvailabilityConditionalMixin, ReplicaReadMixin, APIView):
     """
     Returns all available schedules (with their available time slots) for a doctor/clinic/date/appointment-type combo.
     GET /api/appointments/available-slots/?doctor_id=1&clinic_id=1&type=physical&date=2025-06-20
@@ -217,6 +294,23 @@ class AvailableTimeSlotsView(APIView):
 
     permission_classes = [permissions.AllowAny]
 
+    def get_availability_scope(self, params):
+        doctor_id = params.get("doctor_id", "")
+        clinic_id = params.get("clinic_id", "")
+        appointment_type = params.get("type")
+        try:
+            date_obj = datetime.datetime.strptime(params.get("date", ""), "%Y-%m-%d")
+        except ValueError:
+            return None
+        if (
+            appointment_type in APPOINTMENT_TYPES
+            and doctor_id.isdigit()
+            and clinic_id.isdigit()
+        ):
+            return availability_cache.day_scope(
+                int(doctor_id), int(clinic_id), appointment_type, date_obj.date()
+            )
+
     def get(self, request):
         # Parse and validate parameters
         doctor_id = request.query_params.get("doctor_id")
@@ -249,6 +343,25 @@ class AvailableTimeSlotsView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
+        if not clinic_id.isdigit():
+            return Response(
+                {"detail": "Invalid clinic ID"}, status=status.HTTP_400_BAD_REQUEST
+            )
+        if not doctor_id.isdigit():
+            return Response(
+                {"detail": "No active doctor found with this ID"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Serve from the availability cache when possible
+        cache_key, data = availability_cache.lookup(
+            availability_cache.day_scope(
+                int(doctor_id), int(clinic_id), appointment_type, date_obj
+            )
+        )
+        if data is not None:
+            return Response(data, status=status.HTTP_200_OK)
+
         # Validate clinic exists
         try:
             clinic = Clinic.objects.get(pk=clinic_id)
@@ -281,14 +394,104 @@ class AvailableTimeSlotsView(APIView):
                 is_active=True,
                 **time_filter,
             )
-            .prefetch_related("appointments")
+            .prefetch_related(
+                Prefetch(
+                    "slots",
+                    queryset=ScheduleSlot.objects.filter(is_booked=False),
+                    to_attr="free_slots",
+                )
+            )
             .order_by("start_time")
         )
 
         serializer = DoctorScheduleSerializer(schedules, many=True)
+        availability_cache.store(cache_key, serializer.data)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
+class BulkAvailabilityView(AvailabilityConditionalMixin, ReplicaReadMixin, APIView):
+    """
+    Returns every free slot in a date range for many doctors at once,
+    as a doctor_id -> date -> slots map, in a fixed number of queries.
+    GET /api/appointment/available-slots/bulk/?clinic_id=1&type=physical
+        &start_date=2025-06-01&end_date=2025-06-30&doctor_ids=3,7
+    """
+
+    permission_classes = [permissions.AllowAny]
+
+    def get_availability_scope(self, params):
+        # Every doctor-day at the clinic bumps the clinic scope.
+        clinic_id = params.get("clinic_id", "")
+        appointment_type = params.get("type")
+        if appointment_type in APPOINTMENT_TYPES and clinic_id.isdigit():
+            return availability_cache.clinic_scope(int(clinic_id), appointment_type)
+
+    def get(self, request):
+        clinic_id = request.query_params.get("clinic_id")
+        appointment_type = request.query_params.get("type")
+        start_str = request.query_params.get("start_date")
+        end_str = request.query_params.get("end_date")
+        doctor_ids_str = request.query_params.get("doctor_ids", "")
+
+        # Validate required parameters
+        if not all([clinic_id, appointment_type, start_str, end_str]):
+            return Response(
+                {
+                    "detail": "Missing required parameters: clinic_id, type, start_date, end_date"
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if appointment_type not in ["physical", "online"]:
+            return Response(
+                {"detail": "Invalid appointment type. Use 'physical' or 'online'"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Validate date range
+        try:
+            start_date = datetime.datetime.strptime(start_str, "%Y-%m-%d").date()
+            end_date = datetime.datetime.strptime(end_str, "%Y-%m-%d").date()
+        except ValueError:
+            return Response(
+                {"detail": "Invalid date format. Use YYYY-MM-DD"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if start_date > end_date:
+            return Response(
+                {"detail": "start_date must be before or equal to end_date."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if (end_date - start_date).days >= MAX_RANGE_DAYS:
+            return Response(
+                {"detail": f"Date range cannot exceed {MAX_RANGE_DAYS} days."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Validate optional comma-separated doctor IDs
+        doctor_ids = [d.strip() for d in doctor_ids_str.split(",") if d.strip()]
+        if not all(d.isdigit() for d in doctor_ids):
+            return Response(
+                {"detail": "doctor_ids must be a comma-separated list of IDs"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Validate clinic exists
+        if not clinic_id.isdigit() or not Clinic.objects.filter(pk=clinic_id).exists():
+            return Response(
+                {"detail": "Invalid clinic ID"}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        slot_map = free_slot_map(
+            clinic_id,
+            appointment_type,
+            start_date,
+            end_date,
+            doctor_ids=[int(d) for d in doctor_ids],
+        )
+        return Response(slot_map, status=status.HTTP_200_OK)
+
+
 class AppointmentPermission(permissions.BasePermission):
     """
     Object-level permission: only the patient or the doctor associated with the appointment can access it.
@@ -298,7 +501,89 @@ class AppointmentPermission(permissions.BasePermission):
         return obj.patient == request.user or obj.doctor == request.user
 
 
-class AppointmentViewSet(viewsets.ModelViewSet):
+class AppointmentCursorPagination(CursorPagination):
+    """
+    Keyset pages for the appointment lists: no COUNT, and an old page of a
+    long history costs the same as the first one. The ordering comes from
+    the view (see AppointmentListMixin.get_list_ordering).
+    """
+
+    page_size = 50
+    ordering = ("-created_at", "-id")
+    page_size_query_param = "page_size"
+    max_page_size = 200
+
+    def get_ordering(self, request, queryset, view):
+        return view.get_list_ordering()
+
+
+class AppointmentListMixin:
+    """
+    Query parameters shared by the appointment lists:
+      ?status=<status>&appointment_type=<type>
+      ?from=YYYY-MM-DD&to=YYYY-MM-DD  (appointment date, inclusive)
+      ?when=upcoming  soonest first, from now on
+      ?when=past      most recent first, before now
+    Without ?when the newest bookings come first.
+    """
+
+    pagination_class = AppointmentCursorPagination
+
+    # Served by the (doctor|patient, date, start_time) and
+    # (doctor|patient, -created_at) indexes.
+    LIST_ORDERINGS = {
+        None: ("-created_at", "-id"),
+        "upcoming": ("date", "start_time", "id"),
+        "past": ("-date", "-start_time", "-id"),
+    }
+
+    def get_when(self):
+        when = self.request.query_params.get("when") or None
+        if when not in self.LIST_ORDERINGS:
+            raise ParseError("Invalid when. Use 'upcoming' or 'past'")
+        return when
+
+    def get_list_ordering(self):
+        return self.LIST_ORDERINGS[self.get_when()]
+
+    def get_date_param(self, name):
+        value = self.request.query_params.get(name)
+        if not value:
+            return None
+        try:
+            return datetime.datetime.strptime(value, "%Y-%m-%d").date()
+        except ValueError:
+            raise ParseError("Invalid date format. Use YYYY-MM-DD")
+
+    def filter_appointments(self, qs):
+        params = self.request.query_params
+        status_filter = params.get("status")
+        if status_filter:
+            qs = qs.filter(status__iexact=status_filter)
+        appointment_type_filter = params.get("appointment_type")
+        if appointment_type_filter:
+            qs = qs.filter(appointment_type__iexact=appointment_type_filter)
+
+        date_from = self.get_date_param("from")
+        date_to = self.get_date_param("to")
+        if date_from and date_to and date_from > date_to:
+            raise ParseError("from must be before or equal to to.")
+        if date_from:
+            qs = qs.filter(date__gte=date_from)
+        if date_to:
+            qs = qs.filter(date__lte=date_to)
+
+        when = self.get_when()
+        if when is not None:
+            now = timezone.localtime()
+            later = Q(date__gt=now.date()) | Q(
+                date=now.date(), start_time__gte=now.time()
+            )
+            qs = qs.filter(later if when == "upcoming" else ~later)
+        return qs
+
+
+class AppointmentViewSet(AppointmentListMixin, viewsets.ModelViewSet):
     """
     Provides CRUD endpoints for appointments plus custom actions for canceling and rescheduling.
     """
@@ -310,9 +595,7 @@ class AppointmentViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         user = self.request.user
-        qs = Appointment.objects.all().select_related(
-            "schedule", "doctor", "clinic", "patient"
-        )
+        qs = Appointment.objects.all()
         # Filter by role: patients see only their appointments; doctors see assigned appointments.
         if hasattr(user, "role"):
             if user.role == "patient":
@@ -322,14 +605,8 @@ class AppointmentViewSet(viewsets.ModelViewSet):
         else:
             qs = qs.none()
 
-        # Allow filtering via query parameters.
-        status_filter = self.request.query_params.get("status")
-        if status_filter:
-            qs = qs.filter(status__iexact=status_filter)
-        appointment_type_filter = self.request.query_params.get("appointment_type")
-        if appointment_type_filter:
-            qs = qs.filter(appointment_type__iexact=appointment_type_filter)
-        return qs.order_by("-created_at")
+        # Only list reads the queryset; get_object() has its own lookup.
+        return self.filter_appointments(qs).listing()
 
     def get_object(self):
         # Retrieve the object from the full set, then check permissions.
@@ -342,17 +619,12 @@ class AppointmentViewSet(viewsets.ModelViewSet):
 
     def get_serializer_class(self):
         # Use the read serializer for GET requests.
+        if self.action == "list":
+            return AppointmentListSerializer
         if self.request.method in ["GET"]:
             return AppointmentReadSerializer
         return AppointmentSerializer
 
-    def perform_create(self, serializer):
-        with transaction.atomic():
-            schedule = serializer.validated_data["schedule"]
-            # Lock the schedule to prevent race conditions.
-            DoctorSchedule.objects.select_for_update().get(pk=schedule.pk)
-            serializer.save()
-
     @action(detail=True, methods=["post"], url_path="cancel")
     def cancel(self, request, pk=None):
         """
@@ -441,10 +713,8 @@ class AppointmentViewSet(viewsets.ModelViewSet):
         new_end_time = serializer.validated_data["new_end_time"]
 
         with transaction.atomic():
-            # Lock both the original and new schedules to avoid race conditions.
-            DoctorSchedule.objects.select_for_update().filter(
-                pk__in=[original_appointment.schedule.pk, new_schedule.pk]
-            )
+            # No schedule locks: the new slot is claimed row-by-row and a
+            # concurrent booking of it surfaces as a 409 from the serializer.
             # Create the new appointment using our AppointmentSerializer (which auto-populates snapshot fields).
             new_data = {
                 "schedule": new_schedule.pk,
@@ -467,28 +737,51 @@ class AppointmentViewSet(viewsets.ModelViewSet):
         return Response(response_data, status=status.HTTP_200_OK)
 
 
-class DoctorAppointmentListView(generics.ListAPIView):
+class DoctorAppointmentListView(AppointmentListMixin, generics.ListAPIView):
     """
     GET /api/appointments/doctor-list/
     Returns appointments where request.user is the assigned doctor.
-    Supports ?status=<status>&appointment_type=<type> like the main ViewSet.
+    Supports the same filters and cursor pages as the main ViewSet.
     """
 
-    serializer_class = AppointmentReadSerializer
+    serializer_class = AppointmentListSerializer
     permission_classes = [permissions.IsAuthenticated, IsDoctor]
 
     def get_queryset(self):
-        qs = (
-            Appointment.objects.filter(doctor=self.request.user)
-            .select_related("patient", "clinic", "schedule")
-            .order_by("-created_at")
-        )
-        status_filter = self.request.query_params.get("status")
-        if status_filter:
-            qs = qs.filter(status__iexact=status_filter)
+        qs = Appointment.objects.filter(doctor=self.request.user)
+        return self.filter_appointments(qs).listing()
 
-        appt_type = self.request.query_params.get("appointment_type")
-        if appt_type:
-            qs = qs.filter(appointment_type__iexact=appt_type)
 
-        return qs
+class DoctorAgendaView(APIView):
+    """
+    GET /api/appointment/doctor/agenda/?date=YYYY-MM-DD&days=N
+    The requesting doctor's day-sheet: every schedule on `date` (default
+    today) and the following days-1 days (at most MAX_AGENDA_DAYS), each
+    with its slots marked free, booked, canceled or completed, and the
+    patient and chat session of the appointment in it.
+    """
+
+    permission_classes = [permissions.IsAuthenticated, IsDoctor]
+
+    def get(self, request):
+        date_str = request.query_params.get("date")
+        days_str = request.query_params.get("days", "1")
+
+        if date_str:
+            try:
+                date_from = datetime.datetime.strptime(date_str, "%Y-%m-%d").date()
+            except ValueError:
+                return Response(
+                    {"detail": "Invalid date format. Use YYYY-MM-DD"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+        else:
+            date_from = timezone.localdate()
+
+        if not days_str.isdigit() or not 1 <= int(days_str) <= MAX_AGENDA_DAYS:
+            return Response(
+                {"detail": f"days must be between 1 and {MAX_AGENDA_DAYS}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        return Response(doctor_agenda(request.user.pk, date_from, int(days_str)))
@@ -0,0 +1,132 @@
+"""
+Connection-scoped auth for chat WebSockets.
+
+A connect needs two things: the user behind the JWT and the participants
+(doctor, patient) of the session. Both are cached in Redis for a short
+TTL, the user under the token's JTI and the participants under the
+session ID, and read back in one MGET, so a reconnect storm after a
+deploy does not reach Postgres. Whatever is missing is loaded with a
+single query and written back. Only positive results are cached: a
+session created a moment later, or a user re-activated, is picked up on
+the next try.
+
+Session entries are dropped when the session is closed or purged
+(forget_sessions); user entries simply expire. A cache that cannot be
+reached falls back to the database.
+"""
+
+import json
+import logging
+
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Subquery
+
+from channels.db import database_sync_to_async
+from rest_framework_simplejwt.settings import api_settings
+
+from chat import buffer as chat_buffer  # shares the buffer's Redis
+from chat.models import ChatSession
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+AUTH_CACHE_TIMEOUT = 60  # seconds
+USER_FIELDS = ["id", "email", "first_name", "last_name", "role", "is_active"]
+
+
+def user_key(jti):
+    return f"chat:auth:user:{jti}"
+
+
+def session_key(session_id):
+    return f"chat:auth:session:{session_id}"
+
+
+def build_user(data):
+    """A User instance built from cached fields, without a query."""
+    fields = [f.attname for f in User._meta.concrete_fields if f.attname in data]
+    return User.from_db(DEFAULT_DB_ALIAS, fields, [data[f] for f in fields])
+
+
+@database_sync_to_async
+def load(user_id, session_id, need_user=True, need_session=True):
+    """
+    Fetch whatever is missing from the cache in one query.
+    Returns (user_data, participants); either may be None.
+    """
+    session = ChatSession.objects.filter(pk=session_id)
+    if not need_user:
+        row = session.values_list(
+            "appointment__doctor_id", "appointment__patient_id"
+        ).first()
+        return None, list(row) if row else None
+
+    users = User.objects.filter(pk=user_id, is_active=True).values(*USER_FIELDS)
+    if need_session:
+        users = users.annotate(
+            session_doctor_id=Subquery(session.values("appointment__doctor_id")),
+            session_patient_id=Subquery(session.values("appointment__patient_id")),
+        )
+    row = users.first()
+    if row is None:
+        return None, None
+    doctor_id = row.pop("session_doctor_id", None)
+    patient_id = row.pop("session_patient_id", None)
+    return row, [doctor_id, patient_id] if doctor_id is not None else None
+
+
+async def resolve(validated_token, session_id):
+    """
+    Resolve a connect to (user, participants). user is None when the token
+    is missing or its user is unknown or inactive; participants is the
+    [doctor_id, patient_id] pair, or None when the session does not exist.
+    """
+    if validated_token is None:
+        return None, None
+    user_id = validated_token[api_settings.USER_ID_CLAIM]
+    keys = [user_key(validated_token[api_settings.JTI_CLAIM]), session_key(session_id)]
+
+    client = chat_buffer.get_async_client()
+    try:
+        cached = await client.mget(keys)
+    except Exception:
+        logger.warning("Chat auth cache unavailable", exc_info=True)
+        cached = [None, None]
+    user_data, participants = (json.loads(v) if v else None for v in cached)
+
+    if user_data is None or participants is None:
+        loaded = await load(
+            user_id,
+            session_id,
+            need_user=user_data is None,
+            need_session=participants is None,
+        )
+        fresh = {}
+        if user_data is None and loaded[0] is not None:
+            user_data = fresh[keys[0]] = loaded[0]
+        if participants is None and loaded[1] is not None:
+            participants = fresh[keys[1]] = loaded[1]
+        if fresh:
+            try:
+                async with client.pipeline(transaction=False) as pipe:
+                    for key, value in fresh.items():
+                        pipe.set(key, json.dumps(value), ex=AUTH_CACHE_TIMEOUT)
+                    await pipe.execute()
+            except Exception:
+                logger.warning("Could not cache chat auth", exc_info=True)
+
+    if user_data is None:
+        return None, participants
+    return build_user(user_data), participants
+
+
+def forget_sessions(session_ids):
+    """Drop cached participants of closed or purged sessions."""
+    if not session_ids:
+        return
+    try:
+        chat_buffer.get_client().delete(*[session_key(pk) for pk in session_ids])
+    except Exception:
+        logger.warning("Could not invalidate chat auth cache", exc_info=True)
@@ -0,0 +1,262 @@
+"""
+Write-behind buffer for chat messages (settings.CHAT_WRITE_BEHIND).
+
+The consumer appends each message to a Redis stream and broadcasts it
+straight away; flush() copies stream entries into ChatMessage in batches
+from a Celery beat task. A message's primary key is derived from its
+stream entry ID, so it keeps the same ID before and after the flush:
+re-flushing an entry is a no-op and the backlog can merge the stream and
+the table by ID without losing or repeating messages.
+
+Every message is written twice, atomically and under the same entry ID:
+to the global stream, which is flush()'s queue, and to its session's
+stream, which is what backlog reads (pending()) scan. Both are capped at
+CHAT_BUFFER_MAXLEN entries, so a stalled flush cannot grow Redis without
+bound. Rows the database rejects, and entries whose ID does not fit a
+message ID, are moved to a dead-letter stream instead of blocking the
+queue.
+"""
+
+import asyncio
+import datetime
+import logging
+import weakref
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+
+import redis
+import redis.asyncio
+
+from chat.models import ChatMessage, ChatSession
+from chat.serializers import ChatMessageSerializer
+
+logger = logging.getLogger(__name__)
+
+STREAM_KEY = "chat:messages"
+FLUSH_BATCH_SIZE = 500
+# Stream IDs are "<ms>-<seq>"; pack them into one bigint primary key.
+SEQ_BITS = 16
+
+# Append to the global stream, then to the session's stream under the
+# same ID. Both run in one script, so per-session IDs stay increasing.
+APPEND = """
+local id = redis.call('XADD', KEYS[1], 'MAXLEN', '~', ARGV[1], '*', unpack(ARGV, 2))
+redis.call('XADD', KEYS[2], 'MAXLEN', '~', ARGV[1], id, unpack(ARGV, 2))
+return id
+"""
+
+# Drop flushed entries from a session's stream, and the stream once empty.
+TRIM_SESSION = """
+redis.call('XDEL', KEYS[1], unpack(ARGV))
+if redis.call('XLEN', KEYS[1]) == 0 then
+    redis.call('DEL', KEYS[1])
+end
+return 1
+"""
+
+_client = None
+_async_clients = weakref.WeakKeyDictionary()  # event loop -> client
+
+
+def session_key(session_id):
+    return f"{STREAM_KEY}:session:{session_id}"
+
+
+def dead_letter_key():
+    return f"{STREAM_KEY}:dead"
+
+
+def entry_to_pk(entry_id):
+    ms, seq = (int(part) for part in entry_id.split("-"))
+    if seq >= 1 << SEQ_BITS:
+        # Would spill into the millisecond bits and collide with a later ID.
+        raise ValueError(f"Stream entry {entry_id} does not fit a message ID")
+    return (ms << SEQ_BITS) | seq
+
+
+def pk_to_entry(pk):
+    return f"{pk >> SEQ_BITS}-{pk & ((1 << SEQ_BITS) - 1)}"
+
+
+def get_client():
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(
+            settings.CHAT_BUFFER_REDIS_URL, decode_responses=True
+        )
+    return _client
+
+
+def get_async_client():
+    # redis.asyncio connections are bound to the loop that opened them.
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = redis.asyncio.Redis.from_url(
+            settings.CHAT_BUFFER_REDIS_URL, decode_responses=True
+        )
+        _async_clients[loop] = client
+    return client
+
+
+def to_message(entry_id, fields):
+    """Build an unsaved ChatMessage from a stream entry."""
+    return ChatMessage(
+        id=entry_to_pk(entry_id),
+        session_id=int(fields["session"]),
+        sender_id=int(fields["sender"]),
+        body=fields["body"],
+        sent_at=datetime.datetime.fromisoformat(fields["sent_at"]),
+    )
+
+
+async def append(session_id, sender_id, body):
+    """
+    Buffer one message and return its serialized payload, ready to be
+    broadcast. No database access happens here.
+    """
+    fields = {
+        "session": session_id,
+        "sender": sender_id,
+        "body": body,
+        "sent_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+    }
+    client = get_async_client()
+    entry_id = await client.register_script(APPEND)(
+        keys=[STREAM_KEY, session_key(session_id)],
+        args=[settings.CHAT_BUFFER_MAXLEN, *_flatten(fields)],
+    )
+    return ChatMessageSerializer(to_message(entry_id, fields)).data
+
+
+def _flatten(fields):
+    return [item for pair in fields.items() for item in pair]
+
+
+def pending(session_id, after=None):
+    """Buffered (not yet flushed) messages of a session, oldest first."""
+    start = "-" if after is None else f"({pk_to_entry(after)}"
+    messages = []
+    for entry_id, fields in get_client().xrange(session_key(session_id), start, "+"):
+        try:
+            messages.append(to_message(entry_id, fields))
+        except ValueError:
+            continue  # dead-lettered by the next flush
+    return messages
+
+
+async def latest_pending(session_id):
+    """ID of a session's newest buffered message, or 0."""
+    entries = await get_async_client().xrevrange(
+        session_key(session_id), "+", "-", count=1
+    )
+    if not entries:
+        return 0
+    try:
+        return entry_to_pk(entries[0][0])
+    except ValueError:  # the newest ID its millisecond can still encode
+        return entry_to_pk(f"{entries[0][0].split('-')[0]}-{(1 << SEQ_BITS) - 1}")
+
+
+def flush(batch_size=FLUSH_BATCH_SIZE):
+    """
+    Move buffered messages into ChatMessage, oldest first, in batches.
+    Entries are deleted from the streams only after their batch is stored,
+    so a crash in between just repeats an idempotent insert. Messages of
+    sessions that were purged meanwhile are dropped.
+    Returns the number of stream entries processed.
+    """
+    client = get_client()
+    total = 0
+    while True:
+        entries = client.xrange(STREAM_KEY, "-", "+", count=batch_size)
+        if not entries:
+            break
+        messages = []
+        for entry_id, fields in entries:
+            try:
+                messages.append(to_message(entry_id, fields))
+            except ValueError as exc:
+                dead_letter(entry_id, fields, exc)
+        live = set(
+            ChatSession.objects.filter(
+                pk__in={m.session_id for m in messages}
+            ).values_list("pk", flat=True)
+        )
+        store([m for m in messages if m.session_id in live], dict(entries))
+        trim(client, entries)
+        total += len(entries)
+        if len(entries) < batch_size:
+            break
+    return total
+
+
+def store(messages, fields):
+    """
+    Insert one batch. If the database rejects it (e.g. a sender deleted
+    since the message was sent), insert row by row and move the rows that
+    still fail to the dead-letter stream, so one bad row cannot hold up
+    the rest of the queue.
+    """
+    if not messages:
+        return
+    try:
+        insert(messages)
+        return
+    except IntegrityError:
+        logger.warning("Chat buffer batch rejected; storing row by row")
+    for message in messages:
+        try:
+            insert([message])
+        except IntegrityError as exc:
+            entry_id = pk_to_entry(message.pk)
+            dead_letter(entry_id, fields[entry_id], exc)
+
+
+def dead_letter(entry_id, fields, error):
+    """Park an entry that cannot be stored, with the reason, for inspection."""
+    logger.error("Dead-lettering chat message %s: %s", entry_id, error)
+    get_client().xadd(
+        dead_letter_key(),
+        {**fields, "entry": entry_id, "error": str(error)},
+        maxlen=settings.CHAT_BUFFER_MAXLEN,
+        approximate=True,
+    )
+
+
+def insert(messages):
+    with transaction.atomic():
+        stored = ChatMessage.objects.bulk_create(messages, ignore_conflicts=True)
+        # Foreign keys are checked at commit; check them here instead, so a
+        # bad row fails this block rather than the caller's transaction.
+        connection.check_constraints()
+        if stored:
+            bump_sequence(max(m.pk for m in stored))
+
+
+def trim(client, entries):
+    """Delete processed entries from the global and the session streams."""
+    by_session = {}
+    for entry_id, fields in entries:
+        by_session.setdefault(fields["session"], []).append(entry_id)
+    trim_session = client.register_script(TRIM_SESSION)
+    with client.pipeline() as pipe:
+        pipe.xdel(STREAM_KEY, *[entry_id for entry_id, _ in entries])
+        for session_id, entry_ids in by_session.items():
+            trim_session(keys=[session_key(session_id)], args=entry_ids, client=pipe)
+        pipe.execute()
+
+
+def bump_sequence(pk):
+    """
+    Keep the table's ID sequence ahead of flushed stream IDs, so messages
+    saved directly (write-behind off) still sort after buffered ones.
+    """
+    table = ChatMessage._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT setval(seq, GREATEST(%s, COALESCE(pg_sequence_last_value(seq), 0))) "
+            "FROM (SELECT pg_get_serial_sequence(%s, 'id')::regclass AS seq) s",
+            [pk, table],
+        )
@@ -1,55 +1,214 @@
+import asyncio
+import time
+
+from django.conf import settings
+from django.db.models import Max
+
 from channels.generic.websocket import AsyncJsonWebsocketConsumer
 
-from chat.models import ChatMessage, ChatSession
+from chat import auth as chat_auth
+from chat import buffer as chat_buffer
+from chat import presence
+from chat.models import ChatMessage
 from chat.serializers import ChatMessageSerializer
 
+# Read receipts arriving within this many seconds go out as one event.
+RECEIPT_DELAY = 1.0
+# A connection forwards at most one "typing" event per interval.
+TYPING_INTERVAL = 2.0
+
 
 class ChatConsumer(AsyncJsonWebsocketConsumer):
     """
     WebSocket endpoint:
         wss://<host>/ws/chat/<session_id>/?token=<JWT>
+
+    Client → server:
+        {"body": "..."}                          send a message
+        {"type": "typing"}                       the user is typing
+        {"type": "read", "message_id": <id>}     messages up to <id> were read
+    Server → client:
+        {"id": ..., "sender_id": ..., "body": ..., "sent_at": ...}
+        {"type": "presence", "user_id": <id>, "online": true|false}
+        {"type": "typing", "user_id": <id>}
+        {"type": "read", "user_id": <id>, "message_id": <id>}
+
+    Presence and typing go through the channel layer only. Read receipts
+    are coalesced per connection (RECEIPT_DELAY) and the last-read cursor
+    is kept in Redis, so nothing here writes to the database. A receipt
+    never moves a cursor past the session's newest message.
     """
 
+    joined = False
+    last_typing = 0.0
+    pending_read = None
+    receipt_task = None
+    # Newest message ID this connection knows exists in the session.
+    latest_message = 0
+
     async def connect(self):
         self.session_id = self.scope["url_route"]["kwargs"]["session_id"]
-        self.user = self.scope.get("user")
+        # User and participants come from one cache read (or one query).
+        self.user, participants = await chat_auth.resolve(
+            self.scope.get("jwt"), self.session_id
+        )
+        self.scope["user"] = self.user
 
         # ─── Guard clauses ────────────────────────────────────────────────
         if not self.user or not self.user.is_authenticated:
             await self.close(code=4001)  # unauthenticated
             return
 
-        try:
-            self.session = await self.get_session()
-        except ChatSession.DoesNotExist:
+        if participants is None:
             await self.close(code=4004)  # not found
             return
 
-        if not await self.is_participant():
+        if self.user.pk not in participants:
             await self.close(code=4003)  # forbidden
             return
 
         # ─── Accept and join group ────────────────────────────────────────
         await self.channel_layer.group_add(self.group_name, self.channel_name)
         await self.accept()
+        self.joined = True
+
+        # Catch up on read receipts, then announce ourselves; peers that
+        # are already here answer with their own presence.
+        for user_id, message_id in (
+            await presence.read_cursors(self.session_id)
+        ).items():
+            await self.send_json(
+                {"type": "read", "user_id": user_id, "message_id": message_id}
+            )
+        await self.announce(online=True, reply_to=self.channel_name)
 
     # ------------------------------------------------------------------ #
 
     async def receive_json(self, content, **kwargs):
+        kind = content.get("type", "message")
+        if kind == "typing":
+            await self.typing()
+        elif kind == "read":
+            await self.read(content.get("message_id"))
+        elif kind == "message":
+            await self.send_message(content)
+
+    async def send_message(self, content):
         body = content.get("body", "").strip()
         if not body:
             return
-        msg = await self.save_message(body=body)
-        payload = ChatMessageSerializer(msg).data
+        if settings.CHAT_WRITE_BEHIND:
+            # Broadcast now; the flush task persists it to Postgres later.
+            payload = await chat_buffer.append(self.session_id, self.user.pk, body)
+        else:
+            msg = await self.save_message(body=body)
+            payload = ChatMessageSerializer(msg).data
 
         await self.channel_layer.group_send(
             self.group_name, {"type": "chat.message", "payload": payload}
         )
 
     async def chat_message(self, event):
+        self.latest_message = max(self.latest_message, event["payload"]["id"])
         await self.send_json(event["payload"])
 
+    async def typing(self):
+        now = time.monotonic()
+        if now - self.last_typing < TYPING_INTERVAL:
+            return
+        self.last_typing = now
+        await self.channel_layer.group_send(
+            self.group_name, {"type": "chat.typing", "user_id": self.user.pk}
+        )
+
+    async def read(self, message_id):
+        if type(message_id) is not int or message_id <= 0:
+            return
+        if self.pending_read is None or message_id > self.pending_read:
+            self.pending_read = message_id
+        if self.receipt_task is None:
+            self.receipt_task = asyncio.create_task(self.send_receipt_later())
+
+    async def send_receipt_later(self):
+        await asyncio.sleep(RECEIPT_DELAY)
+        self.receipt_task = None
+        await self.send_receipt()
+
+    async def send_receipt(self):
+        """Store the newest read position and broadcast it once."""
+        message_id, self.pending_read = self.pending_read, None
+        if message_id is None:
+            return
+        if message_id > self.latest_message:
+            # Ahead of every message seen on this socket: look up the real
+            # newest one, and read no further than that.
+            self.latest_message = max(
+                await self.stored_latest_message(),
+                await chat_buffer.latest_pending(self.session_id),
+            )
+            message_id = min(message_id, self.latest_message)
+            if message_id <= 0:
+                return
+        if await presence.advance_read_cursor(
+            self.session_id, self.user.pk, message_id
+        ):
+            await self.channel_layer.group_send(
+                self.group_name,
+                {
+                    "type": "chat.read",
+                    "user_id": self.user.pk,
+                    "message_id": message_id,
+                },
+            )
+
+    async def announce(self, online, reply_to=None):
+        await self.channel_layer.group_send(
+            self.group_name,
+            {
+                "type": "chat.presence",
+                "user_id": self.user.pk,
+                "online": online,
+                "channel": self.channel_name,
+                "reply_to": reply_to,
+            },
+        )
+
+    async def chat_presence(self, event):
+        if event["user_id"] == self.user.pk:
+            if not event["online"] and event.get("channel") != self.channel_name:
+                # Another tab of ours went away; we are still here.
+                await self.announce(online=True)
+            return
+        await self.send_json(
+            {"type": "presence", "user_id": event["user_id"], "online": event["online"]}
+        )
+        if event.get("reply_to"):
+            # A peer just joined: tell it we are here, to it alone.
+            await self.channel_layer.send(
+                event["reply_to"],
+                {"type": "chat.presence", "user_id": self.user.pk, "online": True},
+            )
+
+    async def chat_typing(self, event):
+        if event["user_id"] != self.user.pk:
+            await self.send_json({"type": "typing", "user_id": event["user_id"]})
+
+    async def chat_read(self, event):
+        await self.send_json(
+            {
+                "type": "read",
+                "user_id": event["user_id"],
+                "message_id": event["message_id"],
+            }
+        )
+
     async def disconnect(self, code):
+        if self.joined:
+            if self.receipt_task is not None:
+                self.receipt_task.cancel()
+                self.receipt_task = None
+            await self.send_receipt()
+            await self.announce(online=False)
         await self.channel_layer.group_discard(self.group_name, self.channel_name)
 
     async def chat_force_close(self, event):
@@ -68,20 +227,16 @@ class ChatConsumer(AsyncJsonWebsocketConsumer):
     from asgiref.sync import sync_to_async as _dsa
 
     @_dsa
-    def get_session(self):
-        return ChatSession.objects.select_related(
-            "appointment__doctor", "appointment__patient"
-        ).get(pk=self.session_id)
-
-    @_dsa
-    def is_participant(self):
-        a = self.session.appointment
-        return self.user.pk in (a.doctor_id, a.patient_id)
+    def stored_latest_message(self):
+        latest = ChatMessage.objects.filter(session_id=self.session_id).aggregate(
+            latest=Max("pk")
+        )["latest"]
+        return latest or 0
 
     @_dsa
     def save_message(self, body: str):
         return ChatMessage.objects.create(
-            session=self.session,
-            sender=self.user,
+            session_id=self.session_id,
+            sender_id=self.user.pk,
             body=body,
         )
@@ -3,29 +3,20 @@ Lightweight JWT authentication for Django Channels.
 Works with DRF SimpleJWT tokens passed as:
   • ?token=<JWT>      (query string)   OR
   • Authorization: Bearer <JWT>        (header)
+
+Only the signature and expiry are checked here (no DB access); the
+validated token is left in scope["jwt"] and the consumer resolves the
+user together with the chat session (see chat.auth).
 """
 
 from urllib.parse import parse_qs
 
-from django.contrib.auth import get_user_model
-
-from channels.db import database_sync_to_async
 from channels.middleware import BaseMiddleware
 from rest_framework_simplejwt.authentication import JWTAuthentication
 
-User = get_user_model()
 jwt_auth = JWTAuthentication()
 
 
-@database_sync_to_async
-def get_user(validated_token):
-    try:
-        user = jwt_auth.get_user(validated_token)
-        return user if user.is_active else None
-    except Exception:
-        return None
-
-
 class JWTAuthMiddleware(BaseMiddleware):
     async def __call__(self, scope, receive, send):
         headers = dict(scope.get("headers", []))
@@ -41,13 +32,12 @@ class JWTAuthMiddleware(BaseMiddleware):
             query_string = scope.get("query_string", b"").decode()
             token = parse_qs(query_string).get("token", [None])[0]
 
+        scope["jwt"] = None
         if token:
             try:
-                validated = jwt_auth.get_validated_token(token)
-                scope["user"] = await get_user(validated)
+                scope["jwt"] = jwt_auth.get_validated_token(token)
             except Exception:
-                scope["user"] = None
-        else:
-            scope["user"] = None
+                pass
+        scope["user"] = None  # set by the consumer once resolved
 
         return await super().__call__(scope, receive, send)
@@ -0,0 +1,45 @@
+# Generated by Django 5.1.15 on 2026-10-18 15:00
+
+import datetime
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_expires_at(apps, schema_editor):
+    """Persist the purge deadline for sessions created before the field."""
+    ChatSession = apps.get_model("chat", "ChatSession")
+    tz = timezone.get_current_timezone()
+    sessions = ChatSession.objects.select_related("appointment")
+    for session in sessions.iterator(chunk_size=500):
+        if session.closed_by_id:
+            session.expires_at = session.closed_at or timezone.now()
+        else:
+            appt = session.appointment
+            start_dt = datetime.datetime.combine(appt.date, appt.start_time, tzinfo=tz)
+            end_dt = datetime.datetime.combine(appt.date, appt.end_time, tzinfo=tz)
+            session.expires_at = start_dt + (end_dt - start_dt) * 2.5
+        session.save(update_fields=["expires_at"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointment', '0005_appointment_active_end_idx'),
+        ('chat', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatsession',
+            name='expires_at',
+            field=models.DateTimeField(blank=True, help_text='When the purge task deletes the session; set on creation and moved to now on manual close.', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='chatsession',
+            index=models.Index(fields=['expires_at'], name='chat_chatse_expires_6ad6bc_idx'),
+        ),
+        migrations.RunPython(backfill_expires_at, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,5 @@
+import datetime
+
 from django.contrib.auth import get_user_model
 from django.db import models
 from django.utils import timezone
@@ -6,6 +8,9 @@ from appointment.models import Appointment
 
 User = get_user_model()
 
+# Sessions are purged once start + EXPIRY_FACTOR × slot duration has passed.
+EXPIRY_FACTOR = 2.5
+
 
 class ChatSession(models.Model):
     """
@@ -31,11 +36,18 @@ class ChatSession(models.Model):
         related_name="closed_chat_sessions",
         help_text="If set, the doctor manually closed the chat.",
     )
+    expires_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When the purge task deletes the session; "
+        "set on creation and moved to now on manual close.",
+    )
 
     class Meta:
         indexes = [
             models.Index(fields=["opened_at"]),
             models.Index(fields=["closed_at"]),
+            models.Index(fields=["expires_at"]),
         ]
         verbose_name = "Chat session"
         verbose_name_plural = "Chat sessions"
@@ -43,6 +55,22 @@ class ChatSession(models.Model):
     def __str__(self) -> str:
         return f"ChatSession<{self.pk}> / appt {self.appointment_id}"
 
+    def save(self, *args, **kwargs):
+        if self.expires_at is None and self.appointment_id:
+            appt = self.appointment
+            self.expires_at = self.deadline_for(
+                appt.date, appt.start_time, appt.end_time
+            )
+        super().save(*args, **kwargs)
+
+    @staticmethod
+    def deadline_for(date, start_time, end_time):
+        """Purge deadline for an appointment slot: start + 2.5 × duration."""
+        tz = timezone.get_current_timezone()
+        start_dt = datetime.datetime.combine(date, start_time, tzinfo=tz)
+        end_dt = datetime.datetime.combine(date, end_time, tzinfo=tz)
+        return start_dt + (end_dt - start_dt) * EXPIRY_FACTOR
+
     # Convenience helpers -------------------------------------------------
     @property
     def is_open(self) -> bool:
@@ -55,7 +83,8 @@ class ChatSession(models.Model):
     def mark_closed(self, by: User | None = None):
         self.closed_at = timezone.now()
         self.closed_by = by
-        self.save(update_fields=["closed_at", "closed_by"])
+        self.expires_at = self.closed_at  # purge right away
+        self.save(update_fields=["closed_at", "closed_by", "expires_at"])
 
 
 class ChatMessage(models.Model):
@@ -68,7 +97,8 @@ class ChatMessage(models.Model):
     )
     sender = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
     body = models.TextField()
-    sent_at = models.DateTimeField(auto_now_add=True)
+    # Not auto_now_add: buffered messages keep the time they were sent.
+    sent_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
         ordering = ["sent_at"]
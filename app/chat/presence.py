@@ -0,0 +1,46 @@
+"""
+Last-read cursors for chat read receipts, kept in Redis only.
+
+Each session has one hash, participant ID -> ID of the newest message
+that participant has read. Cursors only move forward, and the hash
+expires on its own a day after the last receipt, well after the session
+itself is purged. Presence and typing are not stored anywhere; they
+travel over the channel layer only (see ChatConsumer).
+"""
+
+from chat import buffer as chat_buffer  # shares the buffer's Redis
+
+READ_CURSOR_TIMEOUT = 60 * 60 * 24
+
+# Message IDs exceed a Lua double's precision, so compare them as
+# decimal strings: longer is larger, equal lengths compare lexically.
+ADVANCE_CURSOR = """
+local current = redis.call('HGET', KEYS[1], ARGV[1])
+if current and (#current > #ARGV[2]
+        or (#current == #ARGV[2] and current >= ARGV[2])) then
+    return 0
+end
+redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+return 1
+"""
+
+
+def read_key(session_id):
+    return f"chat:read:{session_id}"
+
+
+async def advance_read_cursor(session_id, user_id, message_id):
+    """Move a participant's cursor to message_id; False if it was ahead."""
+    script = chat_buffer.get_async_client().register_script(ADVANCE_CURSOR)
+    moved = await script(
+        keys=[read_key(session_id)],
+        args=[user_id, int(message_id), READ_CURSOR_TIMEOUT],
+    )
+    return bool(moved)
+
+
+async def read_cursors(session_id):
+    """{participant ID: last read message ID} for one session."""
+    cursors = await chat_buffer.get_async_client().hgetall(read_key(session_id))
+    return {int(user_id): int(message_id) for user_id, message_id in cursors.items()}
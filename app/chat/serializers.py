@@ -4,7 +4,7 @@ from chat.models import ChatMessage
 
 
 class ChatMessageSerializer(serializers.ModelSerializer):
-    sender_id = serializers.IntegerField(source="sender.pk", read_only=True)
+    sender_id = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = ChatMessage
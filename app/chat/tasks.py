@@ -1,12 +1,19 @@
 import datetime
+import logging
 
+from django.db.models import Q
 from django.utils import timezone
 
 from celery import shared_task
 
+from appointment import cache as availability_cache
 from appointment.models import Appointment
+from chat import auth as chat_auth
+from chat import buffer as chat_buffer
 from chat.models import ChatSession
 
+logger = logging.getLogger(__name__)
+
 
 @shared_task
 def prepare_upcoming_chats():
@@ -14,73 +21,93 @@ def prepare_upcoming_chats():
     Every minute:
       • Find all *online* appointments that will start within the next 15 min
       • Skip those that already have a ChatSession
-      • Create ChatSession rows idempotently
+      • Create ChatSession rows idempotently, in one INSERT
+    Returns the number of candidate appointments.
     """
     now = timezone.localtime()
     threshold = now + datetime.timedelta(minutes=15)
 
-    # 1) fetch candidate appointments in a single, index-friendly query
-    appts = Appointment.objects.filter(
-        appointment_type="online",
-        status__in=[Appointment.Status.CONFIRMED, Appointment.Status.PENDING],
-        chat_session__isnull=True,  # ✨ no session yet
-        date__gte=now.date(),  # today or later
-    ).select_related("doctor", "patient")
-
-    created = 0
-    for appt in appts:
-        # Build full start-datetime in local tz
-        start_dt = datetime.datetime.combine(
-            appt.date, appt.start_time, tzinfo=now.tzinfo
+    # 1) only the 15-minute window is read, via the (date, start_time) index,
+    #    so the work per tick does not grow with how far ahead people book
+    if threshold.date() == now.date():
+        window = Q(date=now.date(), start_time__range=(now.time(), threshold.time()))
+    else:  # window crosses midnight
+        window = Q(date=now.date(), start_time__gte=now.time()) | Q(
+            date=threshold.date(), start_time__lte=threshold.time()
         )
-        # If within the next 15 min, make/ensure a session
-        if now <= start_dt <= threshold:
-            _, is_new = ChatSession.objects.get_or_create(appointment=appt)
-            if is_new:
-                created += 1
+    appts = list(
+        Appointment.objects.filter(
+            window,
+            appointment_type="online",
+            status__in=[Appointment.Status.CONFIRMED, Appointment.Status.PENDING],
+            chat_session__isnull=True,  # ✨ no session yet
+        ).values_list("pk", "doctor_id", "date", "start_time", "end_time")
+    )
 
-    if created:
-        print(f"[prepare_upcoming_chats] Created {created} sessions at {now:%F %T}")
+    # 2) a racing worker may have created some already; skip those rows
+    if not appts:
+        return 0
+    ChatSession.objects.bulk_create(
+        [
+            ChatSession(
+                appointment_id=pk,
+                expires_at=ChatSession.deadline_for(date, start, end),
+            )
+            for pk, _, date, start, end in appts
+        ],
+        ignore_conflicts=True,
+    )
+    # The doctor agenda shows each appointment's chat session.
+    availability_cache.invalidate(
+        availability_cache.agenda_scope(doctor_id, date)
+        for _, doctor_id, date, _, _ in appts
+    )
+    # ignore_conflicts hides which rows a racing worker already created,
+    # so this is the number of candidates, not of sessions created.
+    logger.info("Prepared chat sessions for %d candidates at %s", len(appts), now)
+    return len(appts)
 
 
-END_GRACE = datetime.timedelta(seconds=0)  # delete immediately
+# Upper bound on the sessions removed by a single DELETE.
+PURGE_BATCH_SIZE = 1000
 
 
 @shared_task
 def auto_close_and_purge():
     """
-    • Delete sessions whose scheduled slot ended ≥ 2.5 × duration ago.
-    • Delete sessions the doctor has manually closed.
-    Runs every 5 minutes (Beat).
+    Delete every session whose expires_at has passed:
+      • start + 2.5 × duration, persisted when the session is created
+      • now, when the doctor closed it manually
+    Each DELETE is capped at PURGE_BATCH_SIZE rows and driven by the
+    expires_at index, so a tick costs O(expired), not O(all sessions).
+    Purged sessions are dropped from the WebSocket auth cache and from
+    the cached doctor agendas as well.
+    Runs every 100 seconds (Beat).
     """
-    now = timezone.localtime()
-    sessions = ChatSession.objects.select_related("appointment").only(
-        "id",
-        "closed_at",
-        "closed_by",
-        "appointment__date",
-        "appointment__start_time",
-        "appointment__end_time",
+    expired = ChatSession.objects.filter(expires_at__lte=timezone.now()).values_list(
+        "pk", "appointment__doctor_id", "appointment__date"
     )
-
-    doomed = []
-    for s in sessions:
-        appt = s.appointment
-        # 1) Manual close  → purge right away
-        if s.closed_by_id:
-            doomed.append(s.pk)
-            continue
-
-        # 2) Time-based close  → start + 2.5 × duration
-        start_dt = datetime.datetime.combine(
-            appt.date, appt.start_time, tzinfo=now.tzinfo
+    purged = 0
+    while True:
+        rows = list(expired[:PURGE_BATCH_SIZE])
+        batch = [pk for pk, _, _ in rows]
+        _, deleted = ChatSession.objects.filter(pk__in=batch).delete()
+        chat_auth.forget_sessions(batch)
+        availability_cache.invalidate(
+            availability_cache.agenda_scope(doctor_id, date)
+            for _, doctor_id, date in rows
         )
-        end_dt = datetime.datetime.combine(appt.date, appt.end_time, tzinfo=now.tzinfo)
-        duration = end_dt - start_dt
-        limit_dt = start_dt + duration * 2.5
+        count = deleted.get(ChatSession._meta.label, 0)
+        purged += count
+        if count < PURGE_BATCH_SIZE:
+            break
+    return purged
 
-        if now >= limit_dt:
-            doomed.append(s.pk)
 
-    if doomed:
-        ChatSession.objects.filter(pk__in=doomed).delete()
+@shared_task
+def flush_chat_buffer():
+    """
+    Persist write-behind chat messages from the Redis stream in batches.
+    Runs every few seconds (Beat); a no-op when the stream is empty.
+    """
+    return chat_buffer.flush()
@@ -0,0 +1,140 @@
+"""Tests for the cached WebSocket auth resolver (needs Redis)."""
+
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+
+from asgiref.sync import async_to_sync
+from rest_framework_simplejwt.tokens import AccessToken
+
+from appointment.models import Appointment
+from chat import auth as chat_auth
+from chat import buffer as chat_buffer
+from chat.models import ChatSession
+from chat.tasks import auto_close_and_purge
+from clinic.models import Clinic
+from profiles.models import DoctorProfile
+from schedules.models import DoctorSchedule
+
+User = get_user_model()
+
+
+class ResolveTests(TransactionTestCase):
+    # database_sync_to_async closes the connection between calls, which a
+    # TestCase transaction does not survive.
+
+    def setUp(self):
+        self.doctor = User.objects.create_user(
+            email="doctor@example.com",
+            first_name="Doc",
+            last_name="Tor",
+            password="password123",
+        )
+        DoctorProfile.objects.create(user=self.doctor)
+        self.patient = User.objects.create_user(
+            email="patient@example.com",
+            first_name="Pat",
+            last_name="Ient",
+            password="password123",
+        )
+        schedule = DoctorSchedule.objects.create(
+            doctor=self.doctor,
+            clinic=Clinic.objects.create(name="Test Clinic"),
+            date=timezone.localdate() + datetime.timedelta(days=1),
+            start_time=datetime.time(9, 0),
+            end_time=datetime.time(10, 0),
+            slot_duration=30,
+            appointment_type="online",
+        )
+        appt = Appointment.objects.create(
+            patient=self.patient,
+            schedule=schedule,
+            start_time=datetime.time(9, 0),
+            end_time=datetime.time(9, 30),
+            appointment_type="online",
+        )
+        self.session = ChatSession.objects.create(appointment=appt)
+        self.token = AccessToken.for_user(self.patient)
+        self.addCleanup(self.forget)
+
+    def forget(self):
+        chat_buffer.get_client().delete(
+            chat_auth.user_key(self.token["jti"]),
+            chat_auth.session_key(self.session.pk),
+        )
+
+    def resolve(self, token=None, session_id=None):
+        return async_to_sync(chat_auth.resolve)(
+            token or self.token, session_id or self.session.pk
+        )
+
+    def test_cold_connect_is_one_query_then_cached(self):
+        with self.assertNumQueries(1):
+            user, participants = self.resolve()
+        with self.assertNumQueries(0):
+            cached_user, cached_participants = self.resolve()
+
+        self.assertEqual(participants, [self.doctor.pk, self.patient.pk])
+        self.assertEqual(cached_participants, participants)
+        self.assertEqual(cached_user.pk, self.patient.pk)
+        self.assertEqual(cached_user.email, "patient@example.com")
+        self.assertTrue(cached_user.is_authenticated)
+
+    def test_new_token_reuses_cached_session(self):
+        self.resolve()
+        other = AccessToken.for_user(self.doctor)
+        self.addCleanup(
+            chat_buffer.get_client().delete, chat_auth.user_key(other["jti"])
+        )
+
+        # only the user lookup is left
+        with self.assertNumQueries(1):
+            user, participants = self.resolve(token=other)
+
+        self.assertEqual(user.pk, self.doctor.pk)
+        self.assertEqual(participants, [self.doctor.pk, self.patient.pk])
+
+    def test_missing_session_and_inactive_user_are_not_cached(self):
+        missing = self.session.pk + 1000
+        self.assertIsNone(self.resolve(session_id=missing)[1])
+        self.patient.is_active = False
+        self.patient.save(update_fields=["is_active"])
+        token = AccessToken.for_user(self.patient)
+
+        self.assertEqual(self.resolve(token=token), (None, None))
+        self.assertEqual(
+            chat_buffer.get_client().exists(
+                chat_auth.session_key(missing), chat_auth.user_key(token["jti"])
+            ),
+            0,
+        )
+
+    @override_settings(
+        CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+    )
+    def test_close_drops_cached_participants(self):
+        self.resolve()
+        client = APIClient()
+        client.force_authenticate(user=self.doctor)
+
+        res = client.post(
+            reverse("chat:chat-close", kwargs={"session_id": self.session.pk})
+        )
+
+        self.assertEqual(res.status_code, 204)
+
+        self.assertIsNone(self.resolve()[1])
+
+    def test_purge_drops_cached_participants(self):
+        self.resolve()
+        self.session.expires_at = timezone.now() - datetime.timedelta(minutes=1)
+        self.session.save(update_fields=["expires_at"])
+
+        auto_close_and_purge()
+
+        self.assertIsNone(self.resolve()[1])
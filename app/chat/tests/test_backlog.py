@@ -0,0 +1,114 @@
+"""Tests for the cursor-paginated and streamed message backlog."""
+
+import datetime
+import json
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+
+from appointment.models import Appointment
+from chat.models import ChatMessage, ChatSession
+from clinic.models import Clinic
+from profiles.models import DoctorProfile
+from schedules.models import DoctorSchedule
+
+User = get_user_model()
+
+
+class BacklogTests(TestCase):
+    def setUp(self):
+        self.doctor = User.objects.create_user(
+            email="doctor@example.com",
+            first_name="Doc",
+            last_name="Tor",
+            password="password123",
+        )
+        DoctorProfile.objects.create(user=self.doctor)
+        self.patient = User.objects.create_user(
+            email="patient@example.com",
+            first_name="Pat",
+            last_name="Ient",
+            password="password123",
+        )
+        schedule = DoctorSchedule.objects.create(
+            doctor=self.doctor,
+            clinic=Clinic.objects.create(name="Test Clinic"),
+            date=timezone.localdate() + datetime.timedelta(days=1),
+            start_time=datetime.time(9, 0),
+            end_time=datetime.time(10, 0),
+            slot_duration=30,
+            appointment_type="online",
+        )
+        appt = Appointment.objects.create(
+            patient=self.patient,
+            schedule=schedule,
+            start_time=datetime.time(9, 0),
+            end_time=datetime.time(9, 30),
+            appointment_type="online",
+        )
+        self.session = ChatSession.objects.create(appointment=appt)
+        start = timezone.now() - datetime.timedelta(hours=1)
+        self.messages = ChatMessage.objects.bulk_create(
+            ChatMessage(
+                session=self.session,
+                sender=self.patient if i % 2 else self.doctor,
+                body=f"message {i}",
+                sent_at=start + datetime.timedelta(seconds=i),
+            )
+            for i in range(7)
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.patient)
+
+    def url(self, name):
+        return reverse(
+            f"chat:chat-messages-{name}", kwargs={"session_id": self.session.pk}
+        )
+
+    def test_cursor_pages_without_count(self):
+        ids = []
+        url = self.url("backlog") + "?page_size=3"
+        while url:
+            # session + permission check, then one keyset read
+            with self.assertNumQueries(2):
+                res = self.client.get(url)
+            self.assertEqual(res.status_code, 200)
+            self.assertNotIn("count", res.data)
+            ids += [m["id"] for m in res.data["results"]]
+            url = res.data["next"]
+
+        self.assertEqual(ids, [m.pk for m in self.messages])
+        self.assertEqual(
+            res.data["results"][-1],
+            {
+                "id": self.messages[-1].pk,
+                "sender_id": self.doctor.pk,
+                "body": "message 6",
+                "sent_at": res.data["results"][-1]["sent_at"],
+            },
+        )
+
+    def test_stream_returns_full_history_as_ndjson(self):
+        res = self.client.get(self.url("stream"))
+
+        self.assertEqual(res["Content-Type"], "application/x-ndjson")
+        lines = b"".join(res.streaming_content).decode().splitlines()
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual([r["id"] for r in rows], [m.pk for m in self.messages])
+        self.assertEqual(rows[1]["sender_id"], self.patient.pk)
+
+    def test_non_participant_is_rejected(self):
+        stranger = User.objects.create_user(
+            email="stranger@example.com",
+            first_name="Str",
+            last_name="Anger",
+            password="password123",
+        )
+        self.client.force_authenticate(user=stranger)
+
+        for name in ("list", "backlog", "stream"):
+            self.assertEqual(self.client.get(self.url(name)).status_code, 403)
@@ -0,0 +1,278 @@
+"""Tests for write-behind chat message persistence (needs Redis)."""
+
+import datetime
+import json
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import AsyncClient, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+
+from asgiref.sync import async_to_sync
+from rest_framework_simplejwt.tokens import AccessToken
+
+from appointment.models import Appointment
+from chat import buffer as chat_buffer
+from chat.models import ChatMessage, ChatSession
+from clinic.models import Clinic
+from profiles.models import DoctorProfile
+from schedules.models import DoctorSchedule
+
+User = get_user_model()
+
+TEST_STREAM = "test:chat:messages"
+
+
+@override_settings(CHAT_WRITE_BEHIND=True)
+@patch("chat.buffer.STREAM_KEY", TEST_STREAM)
+class WriteBehindTests(TestCase):
+    def setUp(self):
+        self.doctor = User.objects.create_user(
+            email="doctor@example.com",
+            first_name="Doc",
+            last_name="Tor",
+            password="password123",
+        )
+        DoctorProfile.objects.create(user=self.doctor)
+        self.patient = User.objects.create_user(
+            email="patient@example.com",
+            first_name="Pat",
+            last_name="Ient",
+            password="password123",
+        )
+        schedule = DoctorSchedule.objects.create(
+            doctor=self.doctor,
+            clinic=Clinic.objects.create(name="Test Clinic"),
+            date=timezone.localdate() + datetime.timedelta(days=1),
+            start_time=datetime.time(9, 0),
+            end_time=datetime.time(10, 0),
+            slot_duration=30,
+            appointment_type="online",
+        )
+        appt = Appointment.objects.create(
+            patient=self.patient,
+            schedule=schedule,
+            start_time=datetime.time(9, 0),
+            end_time=datetime.time(9, 30),
+            appointment_type="online",
+        )
+        self.session = ChatSession.objects.create(appointment=appt)
+        self.clear_streams()
+        self.addCleanup(self.clear_streams)
+
+    def clear_streams(self):
+        client = chat_buffer.get_client()
+        keys = list(client.scan_iter(f"{TEST_STREAM}*"))
+        if keys:
+            client.delete(*keys)
+
+    def append(self, body):
+        return async_to_sync(chat_buffer.append)(self.session.pk, self.patient.pk, body)
+
+    def test_append_returns_payload_without_touching_db(self):
+        with self.assertNumQueries(0):
+            payload = self.append("hello")
+
+        self.assertEqual(payload["body"], "hello")
+        self.assertEqual(payload["sender_id"], self.patient.pk)
+        self.assertEqual(
+            [m.pk for m in chat_buffer.pending(self.session.pk)], [payload["id"]]
+        )
+        self.assertFalse(ChatMessage.objects.exists())
+
+    def test_flush_keeps_ids_and_is_idempotent(self):
+        first = self.append("one")
+        second = self.append("two")
+
+        self.assertEqual(chat_buffer.flush(), 2)
+        self.assertEqual(chat_buffer.flush(), 0)
+
+        stored = list(ChatMessage.objects.values_list("pk", "body"))
+        self.assertEqual(stored, [(first["id"], "one"), (second["id"], "two")])
+        self.assertEqual(chat_buffer.pending(self.session.pk), [])
+
+    def test_sessions_are_buffered_apart(self):
+        other = self.session.pk + 1
+        async_to_sync(chat_buffer.append)(other, self.patient.pk, "elsewhere")
+        mine = self.append("mine")
+
+        pending = chat_buffer.pending(self.session.pk)
+
+        self.assertEqual([m.pk for m in pending], [mine["id"]])
+        client = chat_buffer.get_client()
+        self.assertEqual(client.xlen(chat_buffer.session_key(self.session.pk)), 1)
+        chat_buffer.flush()
+        self.assertFalse(client.exists(chat_buffer.session_key(self.session.pk)))
+        self.assertFalse(client.exists(chat_buffer.session_key(other)))
+
+    def test_rejected_rows_are_dead_lettered(self):
+        good = self.append("good")
+        async_to_sync(chat_buffer.append)(self.session.pk, 999999, "no sender")
+
+        self.assertEqual(chat_buffer.flush(), 2)
+        self.assertEqual(chat_buffer.flush(), 0)
+
+        stored = list(ChatMessage.objects.values_list("pk", flat=True))
+        self.assertEqual(stored, [good["id"]])
+        ((_, dead),) = chat_buffer.get_client().xrange(chat_buffer.dead_letter_key())
+        self.assertEqual(dead["body"], "no sender")
+
+    def test_entries_beyond_the_seq_bits_are_dead_lettered(self):
+        with self.assertRaises(ValueError):
+            chat_buffer.entry_to_pk("1-65536")
+        fields = {
+            "session": self.session.pk,
+            "sender": self.patient.pk,
+            "body": "too many this millisecond",
+            "sent_at": timezone.now().isoformat(),
+        }
+        client = chat_buffer.get_client()
+        client.xadd(TEST_STREAM, fields, id="1-65536")
+        client.xadd(chat_buffer.session_key(self.session.pk), fields, id="1-65536")
+        good = self.append("good")
+
+        self.assertEqual(
+            [m.pk for m in chat_buffer.pending(self.session.pk)], [good["id"]]
+        )
+        self.assertEqual(chat_buffer.flush(), 2)
+
+        stored = list(ChatMessage.objects.values_list("pk", flat=True))
+        self.assertEqual(stored, [good["id"]])
+        ((_, dead),) = client.xrange(chat_buffer.dead_letter_key())
+        self.assertEqual(dead["entry"], "1-65536")
+
+    def test_flush_drops_messages_of_purged_sessions(self):
+        self.append("bye")
+        self.session.delete()
+
+        self.assertEqual(chat_buffer.flush(), 1)
+
+        self.assertFalse(ChatMessage.objects.exists())
+
+    def test_backlog_merges_table_and_stream(self):
+        stored = ChatMessage.objects.create(
+            session=self.session, sender=self.patient, body="stored"
+        )
+        flushed = self.append("flushed")
+        buffered = self.append("buffered")
+        # Simulate a flush that stored a row but has not trimmed the stream.
+        ChatMessage.objects.bulk_create(
+            [
+                chat_buffer.to_message(
+                    chat_buffer.pk_to_entry(flushed["id"]),
+                    {
+                        "session": self.session.pk,
+                        "sender": self.patient.pk,
+                        "body": "flushed",
+                        "sent_at": flushed["sent_at"],
+                    },
+                )
+            ]
+        )
+        client = APIClient()
+        client.force_authenticate(user=self.doctor)
+
+        res = client.get(
+            reverse("chat:chat-messages-list", kwargs={"session_id": self.session.pk})
+        )
+
+        ids = [m["id"] for m in res.data["results"]]
+        self.assertEqual(ids, [stored.pk, flushed["id"], buffered["id"]])
+        self.assertEqual(res.data["count"], 3)
+
+        res = client.get(
+            reverse("chat:chat-messages-list", kwargs={"session_id": self.session.pk}),
+            {"after": flushed["id"]},
+        )
+
+        self.assertEqual([m["id"] for m in res.data["results"]], [buffered["id"]])
+
+    def test_flush_between_buffer_and_table_reads_loses_nothing(self):
+        message = self.append("racing")
+        read_pending = chat_buffer.pending
+
+        def pending_then_flush(*args, **kwargs):
+            pending = read_pending(*args, **kwargs)
+            chat_buffer.flush()
+            return pending
+
+        client = APIClient()
+        client.force_authenticate(user=self.doctor)
+        with patch("chat.buffer.pending", pending_then_flush):
+            res = client.get(
+                reverse(
+                    "chat:chat-messages-list", kwargs={"session_id": self.session.pk}
+                )
+            )
+
+        self.assertEqual([m["id"] for m in res.data["results"]], [message["id"]])
+        self.assertEqual(res.data["count"], 1)
+
+    def test_backlog_survives_a_flush_between_reads(self):
+        message = self.append("racing")
+        read_pending = chat_buffer.pending
+
+        def pending_then_flush(*args, **kwargs):
+            pending = read_pending(*args, **kwargs)
+            chat_buffer.flush()
+            return pending
+
+        client = APIClient()
+        client.force_authenticate(user=self.doctor)
+        with patch("chat.buffer.pending", pending_then_flush):
+            res = client.get(
+                reverse(
+                    "chat:chat-messages-backlog", kwargs={"session_id": self.session.pk}
+                )
+            )
+
+        self.assertEqual([m["id"] for m in res.data["results"]], [message["id"]])
+
+    def test_direct_saves_sort_after_flushed_messages(self):
+        buffered = self.append("buffered")
+        chat_buffer.flush()
+
+        direct = ChatMessage.objects.create(
+            session=self.session, sender=self.doctor, body="direct"
+        )
+
+        self.assertGreater(direct.pk, buffered["id"])
+
+    def test_cursor_backlog_and_stream_include_buffered_once(self):
+        stored = ChatMessage.objects.create(
+            session=self.session, sender=self.patient, body="stored"
+        )
+        buffered = self.append("buffered")
+        client = APIClient()
+        client.force_authenticate(user=self.doctor)
+        kwargs = {"session_id": self.session.pk}
+
+        res = client.get(reverse("chat:chat-messages-backlog", kwargs=kwargs))
+        streamed = client.get(reverse("chat:chat-messages-stream", kwargs=kwargs))
+
+        expected = [stored.pk, buffered["id"]]
+        self.assertEqual([m["id"] for m in res.data["results"]], expected)
+        lines = b"".join(streamed.streaming_content).splitlines()
+        self.assertEqual([json.loads(line)["id"] for line in lines], expected)
+
+    async def test_stream_is_async_under_asgi(self):
+        stored = await ChatMessage.objects.acreate(
+            session=self.session, sender=self.patient, body="stored"
+        )
+        buffered = await chat_buffer.append(self.session.pk, self.patient.pk, "new")
+        token = AccessToken.for_user(self.doctor)
+
+        res = await AsyncClient().get(
+            reverse(
+                "chat:chat-messages-stream", kwargs={"session_id": self.session.pk}
+            ),
+            headers={"Authorization": f"Bearer {token}"},
+        )
+
+        self.assertTrue(res.is_async)
+        lines = b"".join([chunk async for chunk in res.streaming_content])
+        ids = [json.loads(line)["id"] for line in lines.splitlines()]
+        self.assertEqual(ids, [stored.pk, buffered["id"]])
@@ -0,0 +1,191 @@
+"""Tests for presence, typing and read receipts on the chat socket (needs Redis)."""
+
+import datetime
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TransactionTestCase, override_settings
+from django.urls import path
+from django.utils import timezone
+
+from asgiref.sync import async_to_sync
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from rest_framework_simplejwt.tokens import AccessToken
+
+from appointment.models import Appointment
+from chat import auth as chat_auth
+from chat import buffer as chat_buffer
+from chat import presence
+from chat.consumers import RECEIPT_DELAY, ChatConsumer
+from chat.middleware import JWTAuthMiddleware
+from chat.models import ChatMessage, ChatSession
+from clinic.models import Clinic
+from profiles.models import DoctorProfile
+from schedules.models import DoctorSchedule
+
+User = get_user_model()
+# Beyond any message ID, including ones packed from buffer stream IDs.
+AHEAD = 2**62
+
+application = JWTAuthMiddleware(
+    URLRouter([path("ws/chat/<int:session_id>/", ChatConsumer.as_asgi())])
+)
+
+
+@override_settings(
+    CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+)
+@patch("chat.consumers.RECEIPT_DELAY", 0.05)
+class ChatConsumerEventsTests(TransactionTestCase):
+    def setUp(self):
+        self.doctor = User.objects.create_user(
+            email="doctor@example.com",
+            first_name="Doc",
+            last_name="Tor",
+            password="password123",
+        )
+        DoctorProfile.objects.create(user=self.doctor)
+        self.patient = User.objects.create_user(
+            email="patient@example.com",
+            first_name="Pat",
+            last_name="Ient",
+            password="password123",
+        )
+        schedule = DoctorSchedule.objects.create(
+            doctor=self.doctor,
+            clinic=Clinic.objects.create(name="Test Clinic"),
+            date=timezone.localdate() + datetime.timedelta(days=1),
+            start_time=datetime.time(9, 0),
+            end_time=datetime.time(10, 0),
+            slot_duration=30,
+            appointment_type="online",
+        )
+        appt = Appointment.objects.create(
+            patient=self.patient,
+            schedule=schedule,
+            start_time=datetime.time(9, 0),
+            end_time=datetime.time(9, 30),
+            appointment_type="online",
+        )
+        self.session = ChatSession.objects.create(appointment=appt)
+        self.tokens = {}
+        self.addCleanup(self.cleanup)
+
+    def cleanup(self):
+        chat_buffer.get_client().delete(
+            presence.read_key(self.session.pk),
+            chat_auth.session_key(self.session.pk),
+            *[chat_auth.user_key(t["jti"]) for t in self.tokens.values()],
+        )
+
+    async def connect(self, user):
+        token = self.tokens.setdefault(user.pk, AccessToken.for_user(user))
+        socket = WebsocketCommunicator(
+            application, f"/ws/chat/{self.session.pk}/?token={token}"
+        )
+        connected, _ = await socket.connect()
+        self.assertTrue(connected)
+        return socket
+
+    def test_presence_and_typing(self):
+        async def scenario():
+            doctor = await self.connect(self.doctor)
+            patient = await self.connect(self.patient)
+
+            joined = {"type": "presence", "user_id": self.patient.pk, "online": True}
+            self.assertEqual(await doctor.receive_json_from(), joined)
+            # the doctor answers the newcomer directly
+            self.assertEqual(
+                await patient.receive_json_from(),
+                {"type": "presence", "user_id": self.doctor.pk, "online": True},
+            )
+
+            await patient.send_json_to({"type": "typing"})
+            await patient.send_json_to({"type": "typing"})  # throttled
+            self.assertEqual(
+                await doctor.receive_json_from(),
+                {"type": "typing", "user_id": self.patient.pk},
+            )
+            self.assertTrue(await doctor.receive_nothing())
+            self.assertTrue(await patient.receive_nothing())
+
+            await patient.disconnect()
+            self.assertEqual(
+                await doctor.receive_json_from(), {**joined, "online": False}
+            )
+            await doctor.disconnect()
+
+        async_to_sync(scenario)()
+
+    def test_read_receipts_are_coalesced_and_replayed(self):
+        first, second, third = [
+            ChatMessage.objects.create(
+                session=self.session, sender=self.doctor, body=body
+            ).pk
+            for body in ("one", "two", "three")
+        ]
+
+        async def scenario():
+            doctor = await self.connect(self.doctor)
+            patient = await self.connect(self.patient)
+            await doctor.receive_json_from()  # patient online
+
+            for message_id in (first, third, second):
+                await patient.send_json_to({"type": "read", "message_id": message_id})
+
+            receipt = {"type": "read", "user_id": self.patient.pk, "message_id": third}
+            self.assertEqual(await doctor.receive_json_from(), receipt)
+            self.assertTrue(await doctor.receive_nothing(0.2))
+            await patient.disconnect()
+            await doctor.disconnect()
+
+            # A later connection starts from the stored cursor.
+            again = await self.connect(self.doctor)
+            self.assertEqual(await again.receive_json_from(), receipt)
+            await again.disconnect()
+
+        async_to_sync(scenario)()
+
+        self.assertEqual(
+            async_to_sync(presence.read_cursors)(self.session.pk),
+            {self.patient.pk: third},
+        )
+        # cursors never move backwards, even across connections
+        advance = async_to_sync(presence.advance_read_cursor)
+        self.assertFalse(advance(self.session.pk, self.patient.pk, first))
+        self.assertTrue(advance(self.session.pk, self.patient.pk, third + 1))
+
+    def test_read_receipt_stops_at_the_newest_message(self):
+        async def scenario():
+            doctor = await self.connect(self.doctor)
+            patient = await self.connect(self.patient)
+            await doctor.receive_json_from()  # patient online
+            await patient.receive_json_from()  # doctor online
+
+            # Nothing to read yet: no cursor, no receipt.
+            await patient.send_json_to({"type": "read", "message_id": AHEAD})
+            self.assertTrue(await doctor.receive_nothing(RECEIPT_DELAY + 0.2))
+
+            await doctor.send_json_to({"body": "hello"})
+            message = await patient.receive_json_from()
+            await doctor.receive_json_from()  # own message echoed
+            await patient.send_json_to({"type": "read", "message_id": AHEAD})
+
+            self.assertEqual(
+                await doctor.receive_json_from(),
+                {
+                    "type": "read",
+                    "user_id": self.patient.pk,
+                    "message_id": message["id"],
+                },
+            )
+            await patient.disconnect()
+            await doctor.disconnect()
+
+        async_to_sync(scenario)()
+
+        self.assertEqual(
+            async_to_sync(presence.read_cursors)(self.session.pk),
+            {self.patient.pk: ChatMessage.objects.get().pk},
+        )
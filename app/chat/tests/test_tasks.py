@@ -0,0 +1,192 @@
+"""Tests for the chat Celery tasks."""
+
+import datetime
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from appointment.models import Appointment
+from chat.models import ChatMessage, ChatSession
+from chat.tasks import auto_close_and_purge, prepare_upcoming_chats
+from clinic.models import Clinic
+from profiles.models import DoctorProfile
+from schedules.models import DoctorSchedule
+
+User = get_user_model()
+
+
+class PrepareUpcomingChatsTests(TestCase):
+    def setUp(self):
+        self.doctor = User.objects.create_user(
+            email="doctor@example.com",
+            first_name="Doc",
+            last_name="Tor",
+            password="password123",
+        )
+        DoctorProfile.objects.create(user=self.doctor)
+        self.patient = User.objects.create_user(
+            email="patient@example.com",
+            first_name="Pat",
+            last_name="Ient",
+            password="password123",
+        )
+        self.clinic = Clinic.objects.create(name="Test Clinic")
+        self.day = timezone.localdate() + datetime.timedelta(days=1)
+        self.schedule = DoctorSchedule.objects.create(
+            doctor=self.doctor,
+            clinic=self.clinic,
+            date=self.day,
+            start_time=datetime.time(9, 0),
+            end_time=datetime.time(12, 0),
+            slot_duration=30,
+            appointment_type="online",
+        )
+
+    def book(self, hour, minute):
+        start = datetime.time(hour, minute)
+        end = (
+            datetime.datetime.combine(self.day, start) + datetime.timedelta(minutes=30)
+        ).time()
+        return Appointment.objects.create(
+            patient=self.patient,
+            schedule=self.schedule,
+            start_time=start,
+            end_time=end,
+            appointment_type="online",
+            status=Appointment.Status.CONFIRMED,
+        )
+
+    def run_at(self, hour, minute):
+        now = timezone.make_aware(
+            datetime.datetime.combine(self.day, datetime.time(hour, minute))
+        )
+        with patch("chat.tasks.timezone.localtime", return_value=now):
+            return prepare_upcoming_chats()
+
+    def test_creates_sessions_only_inside_window(self):
+        soon = self.book(9, 0)
+        later = self.book(9, 30)
+
+        # window read + one INSERT
+        with self.assertNumQueries(2):
+            self.assertEqual(self.run_at(8, 50), 1)
+        self.assertEqual(self.run_at(8, 50), 0)
+
+        session = ChatSession.objects.get(appointment=soon)
+        self.assertEqual(
+            timezone.localtime(session.expires_at).time(), datetime.time(10, 15)
+        )
+        self.assertFalse(ChatSession.objects.filter(appointment=later).exists())
+
+    def test_rerun_is_idempotent(self):
+        appt = self.book(10, 0)
+
+        self.run_at(9, 50)
+        self.run_at(9, 52)
+
+        self.assertEqual(ChatSession.objects.filter(appointment=appt).count(), 1)
+
+    def test_window_crossing_midnight(self):
+        next_day = DoctorSchedule.objects.create(
+            doctor=self.doctor,
+            clinic=self.clinic,
+            date=self.day + datetime.timedelta(days=1),
+            start_time=datetime.time(0, 0),
+            end_time=datetime.time(1, 0),
+            slot_duration=30,
+            appointment_type="online",
+        )
+        appt = Appointment.objects.create(
+            patient=self.patient,
+            schedule=next_day,
+            start_time=datetime.time(0, 0),
+            end_time=datetime.time(0, 30),
+            appointment_type="online",
+            status=Appointment.Status.CONFIRMED,
+        )
+
+        self.run_at(23, 50)
+
+        self.assertTrue(ChatSession.objects.filter(appointment=appt).exists())
+
+
+class AutoCloseAndPurgeTests(TestCase):
+    def setUp(self):
+        doctor = User.objects.create_user(
+            email="doctor@example.com",
+            first_name="Doc",
+            last_name="Tor",
+            password="password123",
+        )
+        DoctorProfile.objects.create(user=doctor)
+        self.doctor = doctor
+        self.patient = User.objects.create_user(
+            email="patient@example.com",
+            first_name="Pat",
+            last_name="Ient",
+            password="password123",
+        )
+        self.schedule = DoctorSchedule.objects.create(
+            doctor=doctor,
+            clinic=Clinic.objects.create(name="Test Clinic"),
+            date=timezone.localdate(),
+            start_time=datetime.time(0, 0),
+            end_time=datetime.time(23, 0),
+            slot_duration=60,
+            appointment_type="online",
+        )
+
+    def session(self, hour):
+        appt = Appointment.objects.create(
+            patient=self.patient,
+            schedule=self.schedule,
+            start_time=datetime.time(hour, 0),
+            end_time=datetime.time(hour + 1, 0),
+            appointment_type="online",
+            status=Appointment.Status.CONFIRMED,
+        )
+        return ChatSession.objects.create(appointment=appt)
+
+    def test_purges_expired_and_closed_sessions(self):
+        now = timezone.localtime()
+        expired = self.session(0)
+        expired.expires_at = now - datetime.timedelta(minutes=1)
+        expired.save(update_fields=["expires_at"])
+        ChatMessage.objects.create(session=expired, sender=self.patient, body="hi")
+        closed = self.session(1)
+        closed.expires_at = now + datetime.timedelta(hours=1)
+        closed.save(update_fields=["expires_at"])
+        closed.mark_closed(by=self.doctor)
+        active = self.session(2)
+        active.expires_at = now + datetime.timedelta(hours=1)
+        active.save(update_fields=["expires_at"])
+
+        purged = auto_close_and_purge()
+
+        self.assertEqual(purged, 2)
+        self.assertEqual(list(ChatSession.objects.all()), [active])
+        self.assertFalse(ChatMessage.objects.exists())
+
+    def test_deadline_is_start_plus_two_and_a_half_durations(self):
+        session = self.session(3)
+
+        self.assertEqual(
+            timezone.localtime(session.expires_at).time(), datetime.time(5, 30)
+        )
+
+    @patch("chat.tasks.PURGE_BATCH_SIZE", 2)
+    def test_deletes_in_capped_batches(self):
+        past = timezone.now() - datetime.timedelta(minutes=1)
+        for hour in range(5):
+            session = self.session(hour)
+            session.expires_at = past
+            session.save(update_fields=["expires_at"])
+
+        # per batch: pick ids, collect sessions, delete messages, delete sessions
+        with self.assertNumQueries(12):
+            purged = auto_close_and_purge()
+
+        self.assertEqual(purged, 5)
+        self.assertFalse(ChatSession.objects.exists())
@@ -1,16 +1,24 @@
 # chats/views.py
 
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 
 from rest_framework import mixins, status, viewsets
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.decorators import action
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from asgiref.sync import async_to_sync
 from channels.layers import get_channel_layer
 
+from appointment import cache as availability_cache
+from chat import auth as chat_auth
+from chat import buffer as chat_buffer
 from chat.models import ChatMessage, ChatSession
 from chat.permissions import IsChatParticipant
 from chat.serializers import ChatMessageSerializer
@@ -22,15 +30,40 @@ class BacklogPagination(PageNumberPagination):
     page_size_query_param = "page_size"  # let clients request smaller bursts
 
 
+class BacklogCursorPagination(CursorPagination):
+    """
+    Keyset pages over the (session, sent_at) index: no COUNT, and a page
+    deep in a busy session's history costs the same as the first one.
+    """
+
+    page_size = 50
+    ordering = ("sent_at", "id")
+    page_size_query_param = "page_size"
+    max_page_size = 500
+
+
+# The only columns ChatMessageSerializer reads.
+MESSAGE_FIELDS = ("id", "sender_id", "body", "sent_at")
+STREAM_CHUNK_SIZE = 500
+
+
 class MessageViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
     """
     /api/chats/{session_id}/messages/?after=<last_id>&page=<n>
+    /api/chats/{session_id}/messages/backlog?cursor=<cursor>
+    /api/chats/{session_id}/messages/stream        (NDJSON)
     """
 
     serializer_class = ChatMessageSerializer
     permission_classes = [IsAuthenticated, IsChatParticipant]
     pagination_class = BacklogPagination
 
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        # Messages are listed, never fetched one by one, so the participant
+        # check runs against the session up front.
+        self.check_object_permissions(request, self.get_object())
+
     def get_queryset(self):
         session_id = self.kwargs["session_id"]
         after = self.request.query_params.get("after")
@@ -39,12 +72,106 @@ class MessageViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
         if after and after.isdigit():
             qs = qs.filter(pk__gt=int(after))
 
-        return qs.select_related("sender").order_by("id")
+        return qs.values(*MESSAGE_FIELDS).order_by("id")
+
+    def list(self, request, *args, **kwargs):
+        buffered = []
+        if settings.CHAT_WRITE_BEHIND:
+            # Read the buffer before the table: an entry flushed in between
+            # is then found on at least one side, and de-duplicated by ID.
+            after = self.request.query_params.get("after")
+            buffered = self.buffered(int(after) if after and after.isdigit() else None)
+        response = super().list(request, *args, **kwargs)
+        if buffered and response.data.get("next") is None:
+            # Last page: append messages still waiting in the write-behind
+            # buffer. Buffered IDs are newer than every stored one.
+            results = response.data["results"]
+            buffered = self.unlisted(buffered, results)
+            results.extend(self.get_serializer(buffered, many=True).data)
+            response.data["count"] += len(buffered)
+        return response
+
+    @action(detail=False, pagination_class=BacklogCursorPagination)
+    def backlog(self, request, session_id=None):
+        """Cursor-paginated history, oldest first."""
+        # Buffer first, then the table (see list()).
+        buffered = self.buffered() if settings.CHAT_WRITE_BEHIND else []
+        page = self.paginate_queryset(
+            ChatMessage.objects.filter(session_id=session_id).values(*MESSAGE_FIELDS)
+        )
+        results = list(self.get_serializer(page, many=True).data)
+        if buffered and not self.paginator.has_next:
+            buffered = self.unlisted(buffered, results)
+            results.extend(self.get_serializer(buffered, many=True).data)
+        return self.get_paginated_response(results)
+
+    @action(detail=False)
+    def stream(self, request, session_id=None):
+        """
+        The whole history as NDJSON, one message per line, read through a
+        server-side cursor so memory stays flat however long it is. Under
+        ASGI the body is an async iterator: Django would otherwise collect
+        a sync one into a list before sending the first byte.
+        """
+        # Read the buffer first: an entry flushed while the table is being
+        # read then shows up once, from whichever side has it.
+        buffered = self.buffered() if settings.CHAT_WRITE_BEHIND else []
+        skip = {m.pk for m in buffered}
+        rows = (
+            ChatMessage.objects.filter(session_id=session_id)
+            .values(*MESSAGE_FIELDS)
+            .order_by("sent_at", "id")
+        )
+        serializer = self.get_serializer()
+        renderer = JSONRenderer()
+
+        def line(message):
+            return renderer.render(serializer.to_representation(message)) + b"\n"
+
+        def lines():
+            for row in rows.iterator(chunk_size=STREAM_CHUNK_SIZE):
+                if row["id"] not in skip:
+                    yield line(row)
+            for message in buffered:
+                yield line(message)
+
+        async def alines():
+            async for row in rows.aiterator(chunk_size=STREAM_CHUNK_SIZE):
+                if row["id"] not in skip:
+                    yield line(row)
+            for message in buffered:
+                yield line(message)
+
+        content = alines() if isinstance(request._request, ASGIRequest) else lines()
+        return StreamingHttpResponse(content, content_type="application/x-ndjson")
+
+    def buffered(self, after=None):
+        """
+        Messages still waiting in the write-behind buffer. Entries flushed
+        but not yet trimmed from the stream are skipped by ID.
+        """
+        pending = chat_buffer.pending(self.kwargs["session_id"], after=after)
+        if not pending:
+            return []
+        stored = set(
+            ChatMessage.objects.filter(pk__in=[m.pk for m in pending]).values_list(
+                "pk", flat=True
+            )
+        )
+        return [m for m in pending if m.pk not in stored]
+
+    @staticmethod
+    def unlisted(buffered, results):
+        """Buffered messages whose ID is not already among results."""
+        listed = {message["id"] for message in results}
+        return [m for m in buffered if m.pk not in listed]
 
     # attach ChatSession to check permission
     def get_object(self):
-        session_id = self.kwargs["session_id"]
-        return ChatSession.objects.get(pk=session_id)
+        return get_object_or_404(
+            ChatSession.objects.select_related("appointment"),
+            pk=self.kwargs["session_id"],
+        )
 
 
 class CloseChatAPIView(APIView):
@@ -74,6 +201,14 @@ class CloseChatAPIView(APIView):
 
         # Delete the session row (cascades to ChatMessage)
         session.delete()
+        chat_auth.forget_sessions([session_id])
+        availability_cache.invalidate(
+            [
+                availability_cache.agenda_scope(
+                    session.appointment.doctor_id, session.appointment.date
+                )
+            ]
+        )
 
         # Return 204 — session is gone
         return Response(status=status.HTTP_204_NO_CONTENT)
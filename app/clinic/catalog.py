@@ -0,0 +1,77 @@
+"""
+The clinic catalog: every clinic, serialized once per version.
+
+The catalog is versioned by the clinic collection stamp (core.conditional),
+which every Clinic save or delete bumps. Readers check that one stamp and
+reuse the serialized list held in this process, then the copy in Redis,
+and only rebuild it from the database when both belong to an older
+version. Nothing is recomputed at write time. Logos are not part of it;
+see ClinicListSerializer.
+"""
+
+import logging
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+from core import conditional
+
+from .models import Clinic
+from .serializers import ClinicListSerializer
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_local = (None, None)  # (version, catalog) of this process
+
+
+def catalog_key(version):
+    return f"clinic:catalog:v{version}"
+
+
+def build():
+    # Always from the primary: the result is cached under the new version,
+    # which a lagging replica may not have caught up with yet.
+    clinics = Clinic.objects.using(DEFAULT_DB_ALIAS).order_by("id")
+    return [dict(row) for row in ClinicListSerializer(clinics, many=True).data]
+
+
+def catalog():
+    """Serialized clinics, as a list of dicts ordered by ID. Do not mutate."""
+    global _local
+    scope = conditional.collection_scope(Clinic)
+    try:
+        version = conditional.versions([scope])[scope]
+    except Exception:
+        logger.warning("Clinic catalog version unavailable", exc_info=True)
+        return build()
+
+    local_version, clinics = _local
+    if local_version == version:
+        return clinics
+
+    key = catalog_key(version)
+    try:
+        clinics = cache.get(key)
+    except Exception:
+        logger.warning("Clinic catalog cache unavailable", exc_info=True)
+        clinics = None
+    if clinics is None:
+        clinics = build()
+        try:
+            cache.set(key, clinics, settings.CLINIC_CATALOG_TIMEOUT)
+        except Exception:
+            logger.warning("Could not cache the clinic catalog", exc_info=True)
+
+    with _lock:
+        _local = (version, clinics)
+    return clinics
+
+
+def forget():
+    """Drop this process's copy (tests)."""
+    global _local
+    with _lock:
+        _local = (None, None)
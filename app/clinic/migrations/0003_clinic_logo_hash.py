@@ -0,0 +1,29 @@
+# Generated by Django 5.1.15 on 2026-10-18 15:53
+
+import hashlib
+
+from django.db import migrations, models
+
+
+def backfill_logo_hash(apps, schema_editor):
+    """Content-address the logos of clinics saved before the field."""
+    Clinic = apps.get_model("clinic", "Clinic")
+    for clinic in Clinic.objects.exclude(logo__isnull=True).exclude(logo=""):
+        clinic.logo_hash = hashlib.sha256(clinic.logo.encode()).hexdigest()
+        clinic.save(update_fields=["logo_hash"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clinic', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='clinic',
+            name='logo_hash',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=64),
+        ),
+        migrations.RunPython(backfill_logo_hash, migrations.RunPython.noop),
+    ]
@@ -1,11 +1,18 @@
 """Models for the clinic app."""
 
+import hashlib
+
 from django.contrib.auth import get_user_model
 from django.db import models
 
 User = get_user_model()
 
 
+def logo_hash(logo):
+    """SHA-256 of the logo markup or URL; empty without a logo."""
+    return hashlib.sha256(logo.encode()).hexdigest() if logo else ""
+
+
 class Clinic(models.Model):
     """Model for Clinic"""
 
@@ -23,6 +30,10 @@ class Clinic(models.Model):
         null=True,
         help_text="Store the SVG markup or image URL for the clinic logo.",
     )
+    # Content address of the logo, served by clinic.views.clinic_logo.
+    logo_hash = models.CharField(
+        max_length=64, blank=True, default="", editable=False, db_index=True
+    )
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -37,4 +48,8 @@ class Clinic(models.Model):
         """Auto-fill Arabic name with English name if empty"""
         if not self.name_ar.strip():  # Check for empty/whitespace
             self.name_ar = self.name
+        self.logo_hash = logo_hash(self.logo)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "logo" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "logo_hash"}
         super().save(*args, **kwargs)
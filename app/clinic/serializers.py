@@ -1,5 +1,7 @@
 """Serializers for the Clinic model."""
 
+from django.urls import reverse
+
 from rest_framework import serializers
 
 from .models import Clinic
@@ -8,8 +10,12 @@ from .models import Clinic
 class ClinicSerializer(serializers.ModelSerializer):
     """
     Serializer for Clinic objects.
+    Besides the logo itself, reads carry its hash and the URL it is served
+    from (clinic.views.clinic_logo).
     """
 
+    logo_url = serializers.SerializerMethodField()
+
     class Meta:
         model = Clinic
         fields = [
@@ -18,13 +24,28 @@ class ClinicSerializer(serializers.ModelSerializer):
             "name_ar",
             "description",
             "logo",
+            "logo_hash",
+            "logo_url",
             "created_at",
             "updated_at",
             "last_modified_by",
         ]
         read_only_fields = [
             "id",
+            "logo_hash",
             "created_at",
             "updated_at",
             "last_modified_by",  # Auto-populated
         ]
+
+    def get_logo_url(self, obj):
+        if not obj.logo_hash:
+            return None
+        return reverse("clinic:clinic-logo", kwargs={"logo_hash": obj.logo_hash})
+
+
+class ClinicListSerializer(ClinicSerializer):
+    """Clinic rows of the catalog: the logo by address only, so lists stay small."""
+
+    class Meta(ClinicSerializer.Meta):
+        fields = [f for f in ClinicSerializer.Meta.fields if f != "logo"]
@@ -0,0 +1,14 @@
+"""Version stamp of the clinic catalog for conditional GETs."""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core import conditional
+
+from .models import Clinic
+
+
+@receiver(post_save, sender=Clinic)
+@receiver(post_delete, sender=Clinic)
+def bump_clinic_version(sender, instance, **kwargs):
+    conditional.bump([conditional.collection_scope(Clinic)])
@@ -0,0 +1,144 @@
+"""Tests for the cached clinic catalog and content-addressed logos."""
+
+import hashlib
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from clinic import catalog
+from clinic.models import Clinic
+
+User = get_user_model()
+CLINICS_URL = reverse("clinic:clinic-list")
+SVG = '<svg xmlns="http://www.w3.org/2000/svg"><circle r="4"/></svg>'
+
+
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "catalog-tests",
+        }
+    }
+)
+class ClinicCatalogTests(TestCase):
+    def setUp(self):
+        catalog.forget()
+        self.addCleanup(catalog.forget)
+        self.addCleanup(cache.clear)
+        self.clinic = Clinic.objects.create(name="Test Clinic", logo=SVG)
+        self.client = APIClient()
+
+    def test_list_carries_logo_address_not_markup(self):
+        res = self.client.get(CLINICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        (row,) = res.data
+        self.assertNotIn("logo", row)
+        self.assertEqual(row["logo_hash"], hashlib.sha256(SVG.encode()).hexdigest())
+        self.assertEqual(row["logo_url"], f"/api/clinic/logos/{row['logo_hash']}/")
+
+    def test_catalog_is_reused_until_a_clinic_changes(self):
+        self.assertEqual(len(catalog.catalog()), 1)
+        with self.assertNumQueries(0):
+            catalog.catalog()  # this process's copy
+        catalog.forget()
+        with self.assertNumQueries(0):
+            catalog.catalog()  # the shared copy
+
+        Clinic.objects.create(name="Second Clinic")
+        with self.assertNumQueries(1):
+            names = [clinic["name"] for clinic in catalog.catalog()]
+        self.assertEqual(names, ["Test Clinic", "Second Clinic"])
+
+    def test_logo_change_moves_its_address(self):
+        old_hash = self.clinic.logo_hash
+        self.clinic.logo = SVG.replace('r="4"', 'r="5"')
+        self.clinic.save()
+
+        (row,) = self.client.get(CLINICS_URL).data
+        self.assertNotEqual(row["logo_hash"], old_hash)
+        self.assertEqual(row["logo_hash"], self.clinic.logo_hash)
+
+    def test_staff_can_set_logo(self):
+        staff = User.objects.create_user(
+            email="staff@example.com",
+            first_name="Sta",
+            last_name="Ff",
+            password="password123",
+            is_staff=True,
+        )
+        self.client.force_authenticate(user=staff)
+        res = self.client.post(CLINICS_URL, {"name": "New Clinic", "logo": SVG})
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data["logo"], SVG)
+        self.assertEqual(res.data["logo_hash"], self.clinic.logo_hash)
+
+    def test_detail_keeps_the_logo(self):
+        res = self.client.get(
+            reverse("clinic:clinic-detail", kwargs={"pk": self.clinic.pk})
+        )
+        self.assertEqual(res.data["logo"], SVG)
+        self.assertEqual(res.data["logo_hash"], self.clinic.logo_hash)
+
+    def test_update_fields_save_keeps_hash_in_step(self):
+        self.clinic.logo = SVG.replace('r="4"', 'r="6"')
+        self.clinic.save(update_fields=["logo"])
+
+        self.clinic.refresh_from_db()
+        self.assertEqual(
+            self.clinic.logo_hash, hashlib.sha256(self.clinic.logo.encode()).hexdigest()
+        )
+
+
+class ClinicLogoTests(TestCase):
+    def setUp(self):
+        self.clinic = Clinic.objects.create(name="Test Clinic", logo=SVG)
+        self.url = reverse(
+            "clinic:clinic-logo", kwargs={"logo_hash": self.clinic.logo_hash}
+        )
+
+    def test_serves_svg_with_long_lived_headers(self):
+        res = self.client.get(self.url)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Content-Type"], "image/svg+xml")
+        self.assertEqual(res.content.decode(), SVG)
+        self.assertIn("immutable", res["Cache-Control"])
+        self.assertIn("max-age=31536000", res["Cache-Control"])
+        self.assertIn("default-src 'none'", res["Content-Security-Policy"])
+
+    def test_revalidation_skips_the_database(self):
+        etag = self.client.get(self.url)["ETag"]
+        with self.assertNumQueries(0):
+            res = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_url_logo_redirects(self):
+        clinic = Clinic.objects.create(
+            name="Other Clinic", logo="https://cdn.example.com/logo.png"
+        )
+        res = self.client.get(
+            reverse("clinic:clinic-logo", kwargs={"logo_hash": clinic.logo_hash})
+        )
+        self.assertEqual(res.status_code, status.HTTP_302_FOUND)
+        self.assertEqual(res["Location"], "https://cdn.example.com/logo.png")
+
+    def test_only_web_urls_redirect(self):
+        for logo in ("javascript:alert(1)", "data:image/png;base64,AAAA", "/x.png"):
+            clinic = Clinic.objects.create(name=logo, logo=logo)
+            res = self.client.get(
+                reverse("clinic:clinic-logo", kwargs={"logo_hash": clinic.logo_hash})
+            )
+            self.assertEqual(res.status_code, 404)
+            self.assertNotIn("immutable", res.get("Cache-Control", ""))
+
+    def test_unknown_hash(self):
+        url = reverse("clinic:clinic-logo", kwargs={"logo_hash": "0" * 64})
+        self.assertEqual(self.client.get(url).status_code, 404)
@@ -4,7 +4,7 @@ from django.urls import include, path
 
 from rest_framework.routers import DefaultRouter
 
-from .views import ClinicViewSet
+from .views import ClinicViewSet, clinic_logo
 
 app_name = "clinic"
 
@@ -12,5 +12,6 @@ router = DefaultRouter()
 router.register("", ClinicViewSet, basename="clinic")
 
 urlpatterns = [
+    path("logos/<str:logo_hash>/", clinic_logo, name="clinic-logo"),
     path("", include(router.urls)),
 ]
@@ -1,7 +1,19 @@
 """ViewSet for Clinic model."""
 
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseRedirect
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import require_safe
+
 from rest_framework import permissions, viewsets
+from rest_framework.response import Response
+
+from core.conditional import ConditionalGetMixin, collection_scope
+from core.replicas import ReplicaReadMixin
 
+from .catalog import catalog
 from .models import Clinic
 from .serializers import ClinicSerializer
 
@@ -13,7 +25,7 @@ class IsStaffOrReadOnly(permissions.BasePermission):
         return bool(request.user and request.user.is_staff)
 
 
-class ClinicViewSet(viewsets.ModelViewSet):
+class ClinicViewSet(ConditionalGetMixin, ReplicaReadMixin, viewsets.ModelViewSet):
     """Manage clinics in the database
     - List all clinics
     - Create a clinic
@@ -26,6 +38,12 @@ class ClinicViewSet(viewsets.ModelViewSet):
     serializer_class = ClinicSerializer
     permission_classes = [IsStaffOrReadOnly]
 
+    def get_version_scopes(self):
+        return [collection_scope(Clinic)]
+
+    def list(self, request, *args, **kwargs):
+        return Response(catalog())
+
     def perform_create(self, serializer):
         """Track user who created/modified"""
         serializer.save(last_modified_by=self.request.user)
@@ -33,3 +51,39 @@ class ClinicViewSet(viewsets.ModelViewSet):
     def perform_update(self, serializer):
         """Track user who last modified"""
         serializer.save(last_modified_by=self.request.user)
+
+
+@require_safe
+def clinic_logo(request, logo_hash):
+    """
+    GET /api/clinic/logos/<hash>/
+    A clinic logo by content address. A changed logo gets a new hash and
+    URL, so responses may be cached for as long as clients like.
+    """
+    etag = f'"{logo_hash}"'
+    if request.headers.get("If-None-Match") == etag:
+        response = HttpResponse(status=304)
+    else:
+        logo = (
+            Clinic.objects.filter(logo_hash=logo_hash)
+            .values_list("logo", flat=True)
+            .first()
+        )
+        if not logo:
+            raise Http404("No such logo.")
+        if logo.lstrip().startswith("<"):
+            response = HttpResponse(logo, content_type="image/svg+xml")
+            # Inline SVG may carry scripts; never run them from our origin.
+            response.headers["Content-Security-Policy"] = (
+                "default-src 'none'; style-src 'unsafe-inline'"
+            )
+            response.headers["X-Content-Type-Options"] = "nosniff"
+        elif urlsplit(logo.strip()).scheme in ("http", "https"):
+            response = HttpResponseRedirect(logo.strip())  # an image URL
+        else:
+            raise Http404("No such logo.")
+    response.headers["ETag"] = etag
+    patch_cache_control(
+        response, public=True, max_age=settings.CLINIC_LOGO_MAX_AGE, immutable=True
+    )
+    return response
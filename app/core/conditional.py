@@ -0,0 +1,125 @@
+"""
+Conditional GET (ETag) for public read endpoints.
+
+Every resource collection has a version stamp in the cache: the time, in
+nanoseconds, of the last write to it, bumped by signals (bump()). The
+availability scopes of appointment.cache are stamps of the same kind.
+Views that add ConditionalGetMixin name the stamps their answer depends
+on and the ETag is derived from them. A GET whose If-None-Match still
+matches gets a 304 straight from initial(), before the view runs its
+query or serializer. No Last-Modified is sent: at HTTP's one-second
+precision, a client revalidating with If-Modified-Since alone would get
+a stale 304 after a write within the same second as its last read.
+
+A stamp the cache has lost starts over at the current time, which only
+costs clients one full response. If the cache cannot be reached, no
+validators are sent and every request is answered in full.
+"""
+
+import hashlib
+import logging
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import get_conditional_response, patch_cache_control
+
+logger = logging.getLogger(__name__)
+
+
+def collection_scope(model):
+    """Stamp of every row of a model, e.g. for list and detail endpoints."""
+    return f"collection:{model._meta.label_lower}"
+
+
+def versions(scopes):
+    """{scope: version stamp}, starting missing stamps at the current time."""
+    stamps = cache.get_many(scopes)
+    for scope in scopes:
+        if scope not in stamps:
+            version = time.time_ns()
+            if not cache.add(scope, version, timeout=None):
+                version = cache.get(scope, version)
+            stamps[scope] = version
+    return stamps
+
+
+def bump(scopes):
+    """Move the given stamps to now, immediately and again after commit."""
+    scopes = set(scopes)
+
+    def set_stamps():
+        try:
+            cache.set_many({scope: time.time_ns() for scope in scopes}, timeout=None)
+        except Exception:
+            logger.warning("Could not bump version stamps %s", scopes, exc_info=True)
+
+    set_stamps()
+    transaction.on_commit(set_stamps)
+
+
+class NotModified(Exception):
+    """Carries a 304 (or 412) response out of initial()."""
+
+    def __init__(self, response):
+        self.response = response
+
+
+class ConditionalGetMixin:
+    """
+    DRF view mixin: an ETag on GET/HEAD, and 304 for clients whose copy
+    is still current. Views list the stamps their answer depends on in
+    get_version_scopes().
+    """
+
+    # For answers that also go stale with the clock (e.g. slots that are
+    # now in the past): validators change at least this often, in seconds.
+    conditional_max_age = None
+
+    def get_version_scopes(self):
+        """Stamps of the current request's answer; empty means no validators."""
+        return []
+
+    def get_etag(self, request):
+        """The ETag of this request's answer, or None."""
+        scopes = sorted(self.get_version_scopes())
+        if not scopes:
+            return None
+        try:
+            stamps = versions(scopes)
+        except Exception:
+            logger.warning("Version stamps unavailable", exc_info=True)
+            return None
+        parts = [request.get_full_path(), request.accepted_media_type]
+        parts += [f"{scope}={stamps[scope]}" for scope in scopes]
+        if self.conditional_max_age:
+            window = int(time.time() // self.conditional_max_age)
+            parts.append(f"window={window}")
+        digest = hashlib.sha1("|".join(parts).encode()).hexdigest()
+        return f'W/"{digest}"'
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self._etag = None
+        if request.method not in ("GET", "HEAD"):
+            return
+        self._etag = self.get_etag(request)
+        if self._etag is None:
+            return
+        response = get_conditional_response(request, etag=self._etag)
+        if response is not None:
+            raise NotModified(response)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        etag = getattr(self, "_etag", None)
+        if etag and response.status_code in (200, 304):
+            response.headers["ETag"] = etag
+            # Cacheable, but check back every time: the 304 is cheap.
+            patch_cache_control(response, no_cache=True)
+        return response
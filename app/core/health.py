@@ -0,0 +1,116 @@
+"""
+Readiness checks for the load balancer.
+
+Each dependency (Postgres, the Redis cache, the channel layer and the
+Celery broker) is probed in its own thread, all at once, and given
+HEALTH_CHECK_TIMEOUT seconds. The combined answer is kept in process
+memory for HEALTH_CHECK_CACHE_SECONDS, not in Redis, which may be the
+thing that is down, so frequent probes cost one dictionary lookup. A
+check still hanging from an earlier probe is reported as timed out
+rather than started again.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+
+from app import celery_app
+
+
+def check_database():
+    connection = connections["default"]
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+    finally:
+        connection.close()  # back to the pool; this thread is not a request
+
+
+def check_cache():
+    cache.get("health:probe")
+
+
+async def _channel_roundtrip():
+    layer = get_channel_layer()
+    channel = await layer.new_channel()
+    await layer.send(channel, {"type": "health.ping"})
+    await layer.receive(channel)
+
+
+def check_channel_layer():
+    async_to_sync(_channel_roundtrip)()
+
+
+def check_broker():
+    with celery_app.connection_for_write() as connection:
+        connection.ensure_connection(max_retries=1)
+
+
+CHECKS = {
+    "database": check_database,
+    "cache": check_cache,
+    "channel_layer": check_channel_layer,
+    "broker": check_broker,
+}
+
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="readiness")
+_lock = threading.Lock()
+_running = {}  # name -> future of a check that has not finished yet
+_last = None  # (monotonic time, result)
+
+
+def _timed(check):
+    started = time.perf_counter()
+    check()
+    return round((time.perf_counter() - started) * 1000, 2)
+
+
+def run_checks():
+    """Probe every dependency in parallel; return {name: status}."""
+    futures = {}
+    for name, check in CHECKS.items():
+        future = _running.get(name)
+        if future is None or future.done():
+            future = _running[name] = _executor.submit(_timed, check)
+        futures[name] = future
+    wait(futures.values(), timeout=settings.HEALTH_CHECK_TIMEOUT)
+
+    results = {}
+    for name, future in futures.items():
+        if not future.done():
+            results[name] = {"ok": False, "error": "timeout"}
+        elif future.exception() is not None:
+            results[name] = {"ok": False, "error": type(future.exception()).__name__}
+        else:
+            results[name] = {"ok": True, "latency_ms": future.result()}
+    return results
+
+
+def readiness():
+    """
+    Return (ready, checks, age_seconds), reusing a recent result. Only one
+    thread refreshes it; the others wait for that refresh.
+    """
+    global _last
+    with _lock:
+        now = time.monotonic()
+        if _last is None or now - _last[0] >= settings.HEALTH_CHECK_CACHE_SECONDS:
+            _last = (now, run_checks())
+        checked_at, checks = _last
+    ready = all(status["ok"] for status in checks.values())
+    return ready, checks, round(time.monotonic() - checked_at, 3)
+
+
+def forget():
+    """Drop the cached result and stop waiting on hung checks (tests)."""
+    global _last
+    with _lock:
+        _last = None
+        _running.clear()
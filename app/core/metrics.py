@@ -0,0 +1,196 @@
+"""
+Per-view request metrics (settings.METRICS_ENABLED).
+
+RequestMetricsMiddleware samples METRICS_SAMPLE_RATE of the requests and
+records, per view: total latency, SQL query count and SQL time. DRF views
+that add MetricsMixin also report the time spent in their serializers.
+Everything goes into fixed-bucket histograms in process memory, so a
+sample costs a few additions under a lock. core.views.metrics shows them
+to admins; each worker process reports only its own requests.
+"""
+
+import bisect
+import contextlib
+import contextvars
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.db import connections
+
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+
+
+class Histogram:
+    """Counts per bucket (upper bound inclusive) plus count, sum and max."""
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # the last bucket is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th observation."""
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.max
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "mean": round(self.sum / self.count, 3) if self.count else 0,
+            "max": round(self.max, 3),
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "buckets": {
+                **{str(b): c for b, c in zip(self.bounds, self.counts)},
+                "+Inf": self.counts[-1],
+            },
+        }
+
+
+class ViewMetrics:
+    def __init__(self):
+        self.latency_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.sql_queries = Histogram(QUERY_BUCKETS)
+        self.sql_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.serializer_ms = Histogram(LATENCY_BUCKETS_MS)
+
+    def snapshot(self):
+        return {
+            name: histogram.snapshot()
+            for name, histogram in vars(self).items()
+            if histogram.count
+        }
+
+
+class Sample:
+    """Measurements of one sampled request."""
+
+    def __init__(self):
+        self.sql_queries = 0
+        self.sql_seconds = 0.0
+        self.serializer_seconds = 0.0
+        self.serializing = False
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_queries += 1
+            self.sql_seconds += time.perf_counter() - started
+
+
+_lock = threading.Lock()
+_views = {}
+_current = contextvars.ContextVar("metrics_sample", default=None)
+
+
+def record(view, latency, sample):
+    """Add one sampled request (durations in seconds) to the histograms."""
+    with _lock:
+        metrics = _views.get(view)
+        if metrics is None:
+            metrics = _views[view] = ViewMetrics()
+        metrics.latency_ms.observe(latency * 1000)
+        metrics.sql_queries.observe(sample.sql_queries)
+        metrics.sql_ms.observe(sample.sql_seconds * 1000)
+        if sample.serializer_seconds:
+            metrics.serializer_ms.observe(sample.serializer_seconds * 1000)
+
+
+def snapshot():
+    with _lock:
+        return {view: metrics.snapshot() for view, metrics in sorted(_views.items())}
+
+
+def reset():
+    with _lock:
+        _views.clear()
+
+
+class RequestMetricsMiddleware:
+    """Time a sample of requests and count their SQL, per resolved view."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if (
+            not settings.METRICS_ENABLED
+            or random.random() >= settings.METRICS_SAMPLE_RATE
+        ):
+            return self.get_response(request)
+
+        sample = Sample()
+        token = _current.set(sample)
+        started = time.perf_counter()
+        try:
+            with contextlib.ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(sample))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        match = request.resolver_match
+        view = (match.view_name or match.route) if match else "<unresolved>"
+        record(view, time.perf_counter() - started, sample)
+        return response
+
+
+_timed_serializers = {}
+
+
+def timed(serializer_class):
+    """A subclass of serializer_class that reports its to_representation time."""
+    timed_class = _timed_serializers.get(serializer_class)
+    if timed_class is None:
+
+        def to_representation(self, instance):
+            sample = _current.get()
+            if sample is None or sample.serializing:  # not sampled, or nested
+                return super(timed_class, self).to_representation(instance)
+            sample.serializing = True
+            started = time.perf_counter()
+            try:
+                return super(timed_class, self).to_representation(instance)
+            finally:
+                sample.serializing = False
+                sample.serializer_seconds += time.perf_counter() - started
+
+        timed_class = type(
+            serializer_class.__name__,
+            (serializer_class,),
+            {
+                "__module__": serializer_class.__module__,
+                "to_representation": to_representation,
+            },
+        )
+        _timed_serializers[serializer_class] = timed_class
+    return timed_class
+
+
+class MetricsMixin:
+    """DRF view mixin: add serializer time to sampled requests' metrics."""
+
+    def get_serializer_class(self):
+        serializer_class = super().get_serializer_class()
+        if _current.get() is None:
+            return serializer_class
+        return timed(serializer_class)
@@ -0,0 +1,113 @@
+"""
+Read-replica routing for public, read-heavy endpoints.
+
+Views that opt in with ReplicaReadMixin run their safe-method requests
+with reads routed to the "replica" database alias (settings.DB_REPLICA_HOST).
+Everything else, including every write and any view that does not opt
+in, stays on the primary.
+
+A user who just wrote (any successful unsafe request, e.g. a booking) is
+pinned to the primary for DB_REPLICA_PIN_SECONDS, so they never read a
+replica that has not caught up with their own change yet.
+"""
+
+import contextvars
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+
+from rest_framework.permissions import SAFE_METHODS
+
+logger = logging.getLogger(__name__)
+
+REPLICA = "replica"
+
+_reading = contextvars.ContextVar("replica_reads", default=False)
+
+
+def enabled():
+    return REPLICA in settings.DATABASES
+
+
+def reading():
+    """True while the current request reads from the replica."""
+    return _reading.get() and enabled()
+
+
+def pin_key(user_id):
+    return f"db:pin:{user_id}"
+
+
+def pin_primary(user):
+    """Keep this user's reads on the primary for a little while."""
+    try:
+        cache.set(pin_key(user.pk), 1, settings.DB_REPLICA_PIN_SECONDS)
+    except Exception:
+        logger.warning("Could not pin user %s to the primary", user.pk, exc_info=True)
+
+
+def is_pinned(user):
+    if not user or not user.is_authenticated:
+        return False
+    try:
+        return cache.get(pin_key(user.pk)) is not None
+    except Exception:
+        # Unknown: stay on the primary, which is never stale.
+        return True
+
+
+class ReplicaRouter:
+    """Send reads to the replica inside use_replica(); writes to default."""
+
+    def db_for_read(self, model, **hints):
+        return REPLICA if reading() else None
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != REPLICA
+
+
+class ReplicaReadMixin:
+    """
+    DRF view mixin: serve GET/HEAD/OPTIONS from the replica unless the
+    requesting user is pinned to the primary.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if enabled() and request.method in SAFE_METHODS and not is_pinned(request.user):
+            self._replica_token = _reading.set(True)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, "_replica_token", None)
+        if token is not None:
+            _reading.reset(token)
+            self._replica_token = None
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class PrimaryPinMiddleware:
+    """Pin users to the primary after a successful write."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (
+            enabled()
+            and request.method not in SAFE_METHODS
+            and response.status_code < 400
+        ):
+            # DRF copies the token-authenticated user onto the HttpRequest.
+            user = getattr(request, "user", None)
+            if user is not None and user.is_authenticated:
+                pin_primary(user)
+        return response
@@ -8,7 +8,7 @@ from django.core.management import call_command
 from django.db.utils import OperationalError
 from django.test import SimpleTestCase
 
-from psycopg2 import OperationalError as Psycopg2OpError
+from psycopg import OperationalError as PsycopgOpError
 
 
 @patch("core.management.commands.wait_for_db.Command.check")
@@ -27,7 +27,7 @@ class CommandTests(SimpleTestCase):
     def test_wait_for_db_delay(self, patched_sleep, patched_check):
         """Test waiting for database when getting OperationalError."""
         patched_check.side_effect = (
-            [Psycopg2OpError] * 2 + [OperationalError] * 3 + [True]
+            [PsycopgOpError] * 2 + [OperationalError] * 3 + [True]
         )
 
         call_command("wait_for_db")
@@ -0,0 +1,148 @@
+"""
+Tests for ETag conditional GETs on public read endpoints.
+"""
+
+import datetime
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from appointment.models import Appointment
+from clinic.models import Clinic
+from profiles.models import DoctorProfile
+from schedules.models import DoctorSchedule
+
+User = get_user_model()
+CLINICS_URL = reverse("clinic:clinic-list")
+
+
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "conditional-tests",
+        }
+    }
+)
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        self.clinic = Clinic.objects.create(name="Test Clinic")
+        self.client = APIClient()
+
+    def tearDown(self):
+        cache.clear()
+
+    def revalidate(self, url, response, **params):
+        return self.client.get(url, params, HTTP_IF_NONE_MATCH=response["ETag"])
+
+    def test_unchanged_collection_is_304_without_queries(self):
+        first = self.client.get(CLINICS_URL)
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertIn("ETag", first)
+        self.assertNotIn("Last-Modified", first)
+        self.assertIn("no-cache", first["Cache-Control"])
+
+        with self.assertNumQueries(0):
+            res = self.revalidate(CLINICS_URL, first)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res["ETag"], first["ETag"])
+        self.assertEqual(res.content, b"")
+
+    def test_if_modified_since_alone_is_answered_in_full(self):
+        # A same-second write would slip past a date-based check.
+        self.client.get(CLINICS_URL)
+        res = self.client.get(
+            CLINICS_URL, HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 60)
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_write_changes_the_etag(self):
+        first = self.client.get(CLINICS_URL)
+        self.clinic.name = "Renamed Clinic"
+        self.clinic.save()
+
+        res = self.revalidate(CLINICS_URL, first)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res["ETag"], first["ETag"])
+        self.assertEqual(res.data[0]["name"], "Renamed Clinic")
+
+    def test_each_url_has_its_own_etag(self):
+        detail = reverse("clinic:clinic-detail", kwargs={"pk": self.clinic.pk})
+        listing = self.client.get(CLINICS_URL)
+        res = self.revalidate(detail, listing)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_doctor_name_change_invalidates_profiles(self):
+        doctor = User.objects.create_user(
+            email="doctor@example.com",
+            first_name="Doc",
+            last_name="Tor",
+            password="password123",
+        )
+        DoctorProfile.objects.create(user=doctor)
+        url = reverse("profiles:doctor-profile-list")
+        first = self.client.get(url)
+        self.assertEqual(self.revalidate(url, first).status_code, 304)
+
+        doctor.refresh_from_db()
+        doctor.last_name = "Renamed"
+        doctor.save()
+        self.assertEqual(self.revalidate(url, first).status_code, 200)
+
+    def test_availability_follows_bookings(self):
+        doctor = User.objects.create_user(
+            email="doctor@example.com",
+            first_name="Doc",
+            last_name="Tor",
+            password="password123",
+        )
+        DoctorProfile.objects.create(user=doctor)
+        patient = User.objects.create_user(
+            email="patient@example.com",
+            first_name="Pat",
+            last_name="Ient",
+            password="password123",
+        )
+        schedule = DoctorSchedule.objects.create(
+            doctor=doctor,
+            clinic=self.clinic,
+            date=timezone.localdate() + datetime.timedelta(days=1),
+            start_time=datetime.time(9, 0),
+            end_time=datetime.time(9, 30),
+            slot_duration=30,
+        )
+        url = reverse("appointment:available-dates")
+        params = {
+            "doctor_id": doctor.pk,
+            "clinic_id": self.clinic.pk,
+            "type": "physical",
+        }
+        first = self.client.get(url, params)
+        self.assertEqual(first.data, [schedule.date.isoformat()])
+
+        with self.assertNumQueries(0):
+            res = self.revalidate(url, first, **params)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        Appointment.objects.create(
+            patient=patient,
+            schedule=schedule,
+            start_time=datetime.time(9, 0),
+            end_time=datetime.time(9, 30),
+        )
+        res = self.revalidate(url, first, **params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, [])
+
+    def test_bad_request_has_no_validators(self):
+        res = self.client.get(reverse("appointment:available-clinics"))
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertNotIn("ETag", res)
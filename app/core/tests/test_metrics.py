@@ -0,0 +1,95 @@
+"""
+Tests for the request metrics middleware and endpoint.
+"""
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from clinic.models import Clinic
+from clinic.serializers import ClinicSerializer
+from core import metrics
+
+User = get_user_model()
+METRICS_URL = reverse("metrics")
+
+
+@override_settings(METRICS_ENABLED=True, METRICS_SAMPLE_RATE=1.0)
+class MetricsTests(TestCase):
+    """Test per-view metrics collection."""
+
+    def setUp(self):
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+        self.admin = User.objects.create_user(
+            email="admin@example.com",
+            first_name="Ad",
+            last_name="Min",
+            password="password123",
+            is_staff=True,
+        )
+        self.client = APIClient()
+
+    def test_records_latency_and_sql_per_view(self):
+        Clinic.objects.create(name="Test Clinic")
+        self.client.get(reverse("health-check"))
+        self.client.get(reverse("health-check"))
+        self.client.get(reverse("clinic:clinic-list"))
+
+        self.client.force_authenticate(user=self.admin)
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        views = res.data["views"]
+        self.assertEqual(views["health-check"]["latency_ms"]["count"], 2)
+        self.assertEqual(views["health-check"]["sql_queries"]["max"], 0)
+        self.assertEqual(views["clinic:clinic-list"]["sql_queries"]["max"], 1)
+        self.assertIn("sql_ms", views["clinic:clinic-list"])
+
+    @override_settings(METRICS_SAMPLE_RATE=0.0)
+    def test_unsampled_requests_are_not_recorded(self):
+        self.client.get(reverse("health-check"))
+
+        self.assertEqual(metrics.snapshot(), {})
+
+    def test_endpoint_is_admin_only(self):
+        patient = User.objects.create_user(
+            email="patient@example.com",
+            first_name="Pat",
+            last_name="Ient",
+            password="password123",
+        )
+        self.client.force_authenticate(user=patient)
+
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_timed_serializer_reports_to_sample(self):
+        clinic = Clinic.objects.create(name="Test Clinic")
+        sample = metrics.Sample()
+        token = metrics._current.set(sample)
+        try:
+            data = metrics.timed(ClinicSerializer)(clinic).data
+        finally:
+            metrics._current.reset(token)
+
+        self.assertEqual(data["name"], "Test Clinic")
+        self.assertGreater(sample.serializer_seconds, 0)
+
+
+class HistogramTests(SimpleTestCase):
+    """Test the fixed-bucket histogram."""
+
+    def test_quantiles_are_bucket_upper_bounds(self):
+        histogram = metrics.Histogram((1, 10, 100))
+        for value in (0.5, 3, 7, 50, 500):
+            histogram.observe(value)
+
+        snap = histogram.snapshot()
+        self.assertEqual(snap["p50"], 10)
+        self.assertEqual(snap["p99"], 500)
+        self.assertEqual(snap["buckets"], {"1": 1, "10": 2, "100": 1, "+Inf": 1})
@@ -0,0 +1,83 @@
+"""
+Tests for the liveness and readiness endpoints.
+"""
+
+import time
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import health
+
+READY_URL = reverse("health-ready")
+
+
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "readiness-tests",
+        }
+    },
+    CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}},
+    HEALTH_CHECK_TIMEOUT=0.2,
+)
+class ReadinessTests(TestCase):
+    """Test the readiness probe."""
+
+    def setUp(self):
+        health.forget()
+        self.addCleanup(health.forget)
+        self.client = APIClient()
+
+    def test_reports_latency_per_dependency(self):
+        checks = {**health.CHECKS, "broker": lambda: None}
+        with patch.dict(health.CHECKS, checks, clear=True):
+            res = self.client.get(READY_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.data["ready"])
+        self.assertEqual(
+            set(res.data["checks"]), {"database", "cache", "channel_layer", "broker"}
+        )
+        for check in res.data["checks"].values():
+            self.assertTrue(check["ok"])
+            self.assertGreaterEqual(check["latency_ms"], 0)
+
+    def test_failing_or_slow_dependency_is_not_ready(self):
+        def down():
+            raise ConnectionError("refused")
+
+        checks = {"cache": down, "broker": lambda: time.sleep(0.5)}
+        started = time.monotonic()
+        with patch.dict(health.CHECKS, checks, clear=True):
+            res = self.client.get(READY_URL)
+
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(
+            res.data["checks"],
+            {
+                "cache": {"ok": False, "error": "ConnectionError"},
+                "broker": {"ok": False, "error": "timeout"},
+            },
+        )
+
+    def test_result_is_reused_between_probes(self):
+        calls = []
+        with patch.dict(health.CHECKS, {"cache": lambda: calls.append(1)}, clear=True):
+            self.client.get(READY_URL)
+            res = self.client.get(READY_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(calls), 1)
+
+    def test_liveness_touches_nothing(self):
+        with self.assertNumQueries(0):
+            res = self.client.get(reverse("health-live"))
+
+        self.assertEqual(res.data, {"healthy": True})
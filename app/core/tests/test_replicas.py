@@ -0,0 +1,102 @@
+"""
+Tests for read-replica routing and primary pinning.
+"""
+
+from unittest.mock import patch
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from clinic.models import Clinic
+from core.replicas import REPLICA, ReplicaRouter, is_pinned
+
+User = get_user_model()
+CLINICS_URL = reverse("clinic:clinic-list")
+
+
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "replica-tests",
+        }
+    }
+)
+class ReplicaRoutingTests(TestCase):
+    """Test which database public reads are routed to."""
+
+    def setUp(self):
+        # Point the replica alias at the test connection, as a MIRROR would.
+        # (connections.settings is settings.DATABASES itself.)
+        databases = patch.dict(
+            settings.DATABASES, {REPLICA: settings.DATABASES["default"]}
+        )
+        databases.start()
+        self.addCleanup(databases.stop)
+        connections[REPLICA] = connections["default"]
+        self.addCleanup(connections.__delitem__, REPLICA)
+
+        self.staff = User.objects.create_user(
+            email="staff@example.com",
+            first_name="St",
+            last_name="Aff",
+            password="password123",
+            is_staff=True,
+        )
+        self.client = APIClient()
+
+    def get_routed(self, url=CLINICS_URL):
+        """GET a clinic URL; return (response, aliases chosen for reads)."""
+        routed = []
+        db_for_read = ReplicaRouter.db_for_read
+
+        def spy(router, model, **hints):
+            routed.append(db_for_read(router, model, **hints))
+            return routed[-1]
+
+        with patch.object(ReplicaRouter, "db_for_read", spy):
+            res = self.client.get(url)
+        return res, routed
+
+    def test_anonymous_reads_use_replica(self):
+        # The list is served from the clinic catalog, which is built on
+        # the primary; a single clinic is read through the router.
+        clinic = Clinic.objects.create(name="Test Clinic")
+        res, routed = self.get_routed(
+            reverse("clinic:clinic-detail", kwargs={"pk": clinic.pk})
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn(REPLICA, routed)
+
+    def test_user_is_pinned_to_primary_after_write(self):
+        self.client.force_authenticate(user=self.staff)
+
+        res = self.client.post(CLINICS_URL, {"name": "New Clinic"})
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        detail = reverse("clinic:clinic-detail", kwargs={"pk": res.data["id"]})
+        res, routed = self.get_routed(detail)
+        self.assertTrue(is_pinned(self.staff))
+        self.assertNotIn(REPLICA, routed)
+        self.assertEqual(res.data["name"], "New Clinic")
+
+    def test_failed_write_does_not_pin(self):
+        self.client.force_authenticate(user=self.staff)
+
+        res = self.client.post(CLINICS_URL, {})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(is_pinned(self.staff))
+
+    def test_writes_stay_on_primary(self):
+        router = ReplicaRouter()
+
+        self.assertEqual(router.db_for_write(User), "default")
+        self.assertFalse(router.allow_migrate(REPLICA, "user"))
@@ -2,11 +2,53 @@
 Core views for app.
 """
 
-from rest_framework.decorators import api_view
+import os
+
+from django.conf import settings
+
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny, IsAdminUser
 from rest_framework.response import Response
 
+from core import health
+from core import metrics as request_metrics
+
 
 @api_view(["GET"])
 def health_check(request):
-    """Returns successful response."""
+    """Returns successful response (liveness: touches no dependency)."""
     return Response({"healthy": True})
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def readiness(request):
+    """
+    Readiness: database, cache, channel layer and broker, probed in
+    parallel and reused for a few seconds. 503 if any of them is down.
+    """
+    ready, checks, age = health.readiness()
+    return Response(
+        {"ready": ready, "age_seconds": age, "checks": checks},
+        status=200 if ready else 503,
+    )
+
+
+@api_view(["GET", "DELETE"])
+@permission_classes([IsAdminUser])
+def metrics(request):
+    """
+    Per-view latency and SQL histograms of this worker process.
+    DELETE clears them.
+    """
+    if request.method == "DELETE":
+        request_metrics.reset()
+        return Response(status=204)
+    return Response(
+        {
+            "enabled": settings.METRICS_ENABLED,
+            "sample_rate": settings.METRICS_SAMPLE_RATE,
+            "pid": os.getpid(),
+            "views": request_metrics.snapshot(),
+        }
+    )
@@ -5,6 +5,7 @@ Views for the delivery API.
 from rest_framework import generics, permissions, status, viewsets
 from rest_framework.response import Response
 
+from core.metrics import MetricsMixin
 from delivery.serializers import DeliveryRequestSerializer
 
 from .models import Address, DeliveryRequest, PatientProfile
@@ -47,7 +48,7 @@ class ManageDeliveryView(generics.UpdateAPIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class ListDeliveryView(generics.ListAPIView):
+class ListDeliveryView(MetricsMixin, generics.ListAPIView):
     """List all deliveries."""
 
     serializer_class = DeliveryRequestSerializer
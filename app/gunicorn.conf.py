@@ -0,0 +1,23 @@
+"""
+Gunicorn settings for the scaled deployment (docker compose --profile scale).
+
+Both tiers pre-fork WEB_CONCURRENCY workers (default: one per core):
+    http: gunicorn app.wsgi
+    ws:   gunicorn app.asgi:application -k app.workers.ChannelsWorker
+
+On SIGTERM a WebSocket worker stops accepting, closes its sockets with
+1012 (service restart) and gives consumers up to GRACEFUL_TIMEOUT seconds
+to leave their groups, so clients reconnect to a live worker and the
+groups in the channel layer carry on.
+"""
+
+import multiprocessing
+import os
+
+bind = "0.0.0.0:8000"
+workers = int(os.environ.get("WEB_CONCURRENCY") or multiprocessing.cpu_count())
+# Only used by the HTTP tier: sync workers become threaded (gthread).
+threads = int(os.environ.get("GUNICORN_THREADS") or 4)
+graceful_timeout = int(os.environ.get("GRACEFUL_TIMEOUT") or 30)
+timeout = 60
+accesslog = "-"
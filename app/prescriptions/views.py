@@ -5,6 +5,7 @@ Views for the records API.
 from rest_framework import generics, status
 from rest_framework.response import Response
 
+from core.metrics import MetricsMixin
 from prescriptions.serializers import PrescriptionRecordSerializer
 
 from .models import PatientProfile, PrescriptionRecord
@@ -41,7 +42,7 @@ class ManageRecordView(generics.UpdateAPIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class ListPatientRecordsView(generics.ListAPIView):
+class ListPatientRecordsView(MetricsMixin, generics.ListAPIView):
     """
     List all records for a specific patient (given by patient_id in the URL).
     """
@@ -2,9 +2,11 @@ import logging
 
 from django.apps import apps
 from django.contrib.auth import get_user_model
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
+from core import conditional
+
 from .models import DoctorProfile, PatientProfile
 
 logger = logging.getLogger(__name__)
@@ -52,3 +54,17 @@ def mark_user_as_doctor(sender, instance, created, **kwargs):
     if created and getattr(instance.user, "role", None) != "doctor":
         instance.user.role = "doctor"
         instance.user.save(update_fields=["role"])
+
+
+@receiver(post_save, sender=DoctorProfile)
+@receiver(post_delete, sender=DoctorProfile)
+def bump_doctor_profiles_version(sender, instance, **kwargs):
+    """Doctor profiles changed: clients' cached copies are stale."""
+    conditional.bump([conditional.collection_scope(DoctorProfile)])
+
+
+@receiver(post_save, sender=User)
+def bump_doctor_name_version(sender, instance, created, **kwargs):
+    """Doctor profiles embed the doctor's name."""
+    if not created and instance.role == "doctor":
+        conditional.bump([conditional.collection_scope(DoctorProfile)])
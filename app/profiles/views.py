@@ -4,6 +4,9 @@ from rest_framework import generics, permissions, status, viewsets
 from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 
+from core.conditional import ConditionalGetMixin, collection_scope
+from core.replicas import ReplicaReadMixin
+
 from .models import DoctorProfile, PatientProfile
 from .serializers import DoctorProfileSerializer, PatientProfileSerializer
 
@@ -34,7 +37,9 @@ class AdminPatientProfileViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = [IsAdminUser]
 
 
-class DoctorProfileViewSet(viewsets.ModelViewSet):
+class DoctorProfileViewSet(
+    ConditionalGetMixin, ReplicaReadMixin, viewsets.ModelViewSet
+):
     """
     ViewSet for DoctorProfile:
       - GET requests (list and retrieve) are public.
@@ -53,6 +58,9 @@ class DoctorProfileViewSet(viewsets.ModelViewSet):
         # All other methods require the user to be an admin.
         return [IsAdminUser()]
 
+    def get_version_scopes(self):
+        return [collection_scope(DoctorProfile)]
+
     def perform_create(self, serializer):
         serializer.save()
 
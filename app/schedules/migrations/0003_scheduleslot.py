@@ -0,0 +1,65 @@
+# Generated by Django 5.1.15 on 2026-10-18 14:35
+
+import datetime
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_slots(apps, schema_editor):
+    """Materialize slot rows for schedules created before ScheduleSlot."""
+    DoctorSchedule = apps.get_model("schedules", "DoctorSchedule")
+    ScheduleSlot = apps.get_model("schedules", "ScheduleSlot")
+    Appointment = apps.get_model("appointment", "Appointment")
+
+    booked = set(
+        Appointment.objects.filter(status__in=["pending", "confirmed"]).values_list(
+            "schedule_id", "start_time"
+        )
+    )
+    batch = []
+    for schedule in DoctorSchedule.objects.iterator(chunk_size=500):
+        current = datetime.datetime.combine(schedule.date, schedule.start_time)
+        end = datetime.datetime.combine(schedule.date, schedule.end_time)
+        delta = datetime.timedelta(minutes=schedule.slot_duration)
+        while current + delta <= end:
+            batch.append(
+                ScheduleSlot(
+                    schedule_id=schedule.pk,
+                    start_time=current.time(),
+                    end_time=(current + delta).time(),
+                    is_booked=(schedule.pk, current.time()) in booked,
+                )
+            )
+            current += delta
+        if len(batch) >= 5000:
+            ScheduleSlot.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    ScheduleSlot.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointment', '0003_initial'),
+        ('schedules', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduleSlot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_time', models.TimeField()),
+                ('end_time', models.TimeField()),
+                ('is_booked', models.BooleanField(default=False)),
+                ('schedule', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='slots', to='schedules.doctorschedule')),
+            ],
+            options={
+                'ordering': ['schedule', 'start_time'],
+                'indexes': [models.Index(fields=['schedule', 'is_booked'], name='schedules_s_schedul_6d8a8b_idx')],
+                'constraints': [models.UniqueConstraint(fields=('schedule', 'start_time'), name='unique_schedule_slot')],
+            },
+        ),
+        migrations.RunPython(backfill_slots, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.15 on 2026-10-18 14:45
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedules', '0003_scheduleslot'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='scheduleslot',
+            options={'ordering': ['schedule_id', 'start_time']},
+        ),
+    ]
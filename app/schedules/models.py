@@ -4,7 +4,8 @@ import datetime
 
 from django.conf import settings
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import connection, models, transaction
+from django.db.models import Exists, OuterRef
 
 from clinic.models import Clinic
 
@@ -94,6 +95,55 @@ class DoctorSchedule(models.Model):
         if overlapping.exists():
             raise ValidationError("Overlapping schedule exists")
 
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        # One transaction, so the post_save cache bump that runs on commit
+        # comes after the slot rows are in line, and a reader can never
+        # cache the old slot set under the new version.
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+            self.sync_slots(adding=adding)
+
+    def sync_slots(self, adding=False):
+        """
+        Keep the materialized ScheduleSlot rows in line with the schedule's
+        current time window. Booked slots are never dropped.
+        """
+        if adding:
+            ScheduleSlot.objects.bulk_create(ScheduleSlot.build_for(self))
+            return
+
+        from appointment.models import Appointment  # Local import (circular)
+
+        wanted = self.get_time_slots()
+        wanted_set = set(wanted)
+        stale_ids = [
+            pk
+            for pk, start, end in self.slots.filter(is_booked=False).values_list(
+                "pk", "start_time", "end_time"
+            )
+            if (start, end) not in wanted_set
+        ]
+        if stale_ids:
+            ScheduleSlot.objects.filter(pk__in=stale_ids).delete()
+
+        ScheduleSlot.objects.bulk_create(
+            ScheduleSlot.build_for(self, wanted), ignore_conflicts=True
+        )
+        # Re-derive the booked flag for rows that were just (re)created.
+        self.slots.filter(is_booked=False).filter(
+            Exists(
+                Appointment.objects.filter(
+                    schedule=OuterRef("schedule"),
+                    start_time=OuterRef("start_time"),
+                    status__in=[
+                        Appointment.Status.PENDING,
+                        Appointment.Status.CONFIRMED,
+                    ],
+                )
+            )
+        ).update(is_booked=True)
+
     def get_time_slots(self):
         slots = []
         current_dt = datetime.datetime.combine(self.date, self.start_time)
@@ -110,16 +160,94 @@ class DoctorSchedule(models.Model):
 
     def get_available_time_slots(self):
         """
-        Return only the free slots for this schedule where no pending or confirmed appointment exists.
+        Return only the free slots for this schedule, read from the
+        materialized ScheduleSlot rows. Honors a `free_slots` prefetch.
         """
-        from appointment.models import (  # ✅ Local import to avoid circular import
-            Appointment,
+        free_slots = getattr(self, "free_slots", None)
+        if free_slots is None:
+            free_slots = self.slots.filter(is_booked=False)
+        return [(slot.start_time, slot.end_time) for slot in free_slots]
+
+
+class ScheduleSlotQuerySet(models.QuerySet):
+    def claim(self, schedule, start_time):
+        """
+        Mark a free slot as booked with a single conditional UPDATE.
+        Returns False if the slot does not exist or was already taken.
+        """
+        return bool(
+            self.filter(
+                schedule=schedule, start_time=start_time, is_booked=False
+            ).update(is_booked=True)
         )
 
-        all_slots = self.get_time_slots()
-        blocking_statuses = [Appointment.Status.PENDING, Appointment.Status.CONFIRMED]
-        booked_slots = [
-            (appt.start_time, appt.end_time)
-            for appt in self.appointments.filter(status__in=blocking_statuses)
+    def create_for(self, schedules):
+        """
+        Materialize the slot rows for freshly created schedules with one
+        INSERT ... SELECT over generate_series, so large rosters do not pay
+        for building a model instance per slot. Mirrors get_time_slots():
+        partial trailing slots are skipped.
+        """
+        schedule_ids = [schedule.pk for schedule in schedules]
+        if not schedule_ids:
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {self.model._meta.db_table}
+                    (schedule_id, start_time, end_time, is_booked)
+                SELECT s.id, t::time, (t + s.step)::time, FALSE
+                FROM (
+                    SELECT id, date, start_time, end_time,
+                           make_interval(mins => slot_duration) AS step
+                    FROM {DoctorSchedule._meta.db_table}
+                    WHERE id = ANY(%s)
+                ) s
+                CROSS JOIN LATERAL generate_series(
+                    s.date + s.start_time,
+                    s.date + s.end_time - s.step,
+                    s.step
+                ) AS t
+                """,
+                [schedule_ids],
+            )
+
+
+class ScheduleSlot(models.Model):
+    """
+    One bookable slot of a DoctorSchedule, materialized when the schedule
+    is saved so availability is an indexed lookup instead of a Python loop.
+    """
+
+    objects = ScheduleSlotQuerySet.as_manager()
+
+    schedule = models.ForeignKey(
+        DoctorSchedule, on_delete=models.CASCADE, related_name="slots"
+    )
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+    is_booked = models.BooleanField(default=False)
+
+    class Meta:
+        ordering = ["schedule_id", "start_time"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["schedule", "start_time"], name="unique_schedule_slot"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["schedule", "is_booked"]),
+        ]
+
+    def __str__(self):
+        return f"Slot {self.start_time}-{self.end_time} of schedule {self.schedule_id}"
+
+    @classmethod
+    def build_for(cls, schedule, time_slots=None):
+        """Return unsaved slot rows for a schedule's time window."""
+        if time_slots is None:
+            time_slots = schedule.get_time_slots()
+        return [
+            cls(schedule=schedule, start_time=start, end_time=end)
+            for start, end in time_slots
         ]
-        return [slot for slot in all_slots if slot not in booked_slots]
@@ -0,0 +1,183 @@
+"""
+Roster import: many recurring schedule rules for many doctors and clinics.
+
+Rules are validated against each other and against the existing schedules
+in a fixed number of queries (doctors, clinics, one overlap scan) and then
+applied with batched inserts inside a single transaction.
+"""
+
+import csv
+import datetime
+import io
+from collections import defaultdict
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+from appointment import cache as availability_cache
+from clinic.models import Clinic
+from schedules.models import DoctorSchedule, ScheduleSlot
+from schedules.serializers import RosterRuleSerializer
+
+# Upper bound on the schedules a single import may expand to.
+MAX_SCHEDULES = 20000
+BATCH_SIZE = 1000
+
+
+def parse_csv(upload):
+    """
+    Read roster rules from an uploaded CSV file with a header row.
+    Weekdays may be written as "MWF", "M W F" or "M,W,F".
+    """
+    text = upload.read().decode("utf-8-sig")
+    rows = []
+    for row in csv.DictReader(io.StringIO(text)):
+        row = {key.strip(): (value or "").strip() for key, value in row.items() if key}
+        if "weekdays" in row:
+            row["weekdays"] = [c for c in row["weekdays"] if c.isalpha()]
+        rows.append(row)
+    return rows
+
+
+def plan_roster(rows):
+    """
+    Validate roster rules and expand them into unsaved DoctorSchedule rows.
+    Returns (schedules, errors); errors is a list of {"row", "errors"} dicts
+    with rows numbered from 1, and schedules is only usable if it is empty.
+    """
+    errors = defaultdict(lambda: defaultdict(list))
+
+    rules = []
+    for number, row in enumerate(rows, start=1):
+        serializer = RosterRuleSerializer(data=row)
+        if serializer.is_valid():
+            rules.append((number, serializer.validated_data))
+        else:
+            for field, messages in serializer.errors.items():
+                errors[number][field].extend(str(m) for m in messages)
+
+    doctor_ids = {rule["doctor"] for _, rule in rules}
+    clinic_ids = {rule["clinic"] for _, rule in rules}
+    doctors = set(
+        get_user_model()
+        .objects.filter(pk__in=doctor_ids, doctor_profile__isnull=False)
+        .values_list("pk", flat=True)
+    )
+    clinics = set(Clinic.objects.filter(pk__in=clinic_ids).values_list("pk", flat=True))
+
+    now = datetime.datetime.now()
+    planned = []  # (row number, schedule)
+    for number, rule in rules:
+        if rule["doctor"] not in doctors:
+            errors[number]["doctor"].append(
+                f'Invalid pk "{rule["doctor"]}" - object does not exist.'
+            )
+        if rule["clinic"] not in clinics:
+            errors[number]["clinic"].append(
+                f'Invalid pk "{rule["clinic"]}" - object does not exist.'
+            )
+        if number in errors:
+            continue
+
+        day = rule["start_date"]
+        while day <= rule["end_date"]:
+            if day.weekday() in rule["weekdays"]:
+                if datetime.datetime.combine(day, rule["end_time"]) < now:
+                    errors[number]["non_field_errors"].append(
+                        f"Cannot create schedule in the past ({day})."
+                    )
+                    break
+                planned.append(
+                    (
+                        number,
+                        DoctorSchedule(
+                            doctor_id=rule["doctor"],
+                            clinic_id=rule["clinic"],
+                            date=day,
+                            start_time=rule["start_time"],
+                            end_time=rule["end_time"],
+                            slot_duration=rule["slot_duration"],
+                            appointment_type=rule["appointment_type"],
+                        ),
+                    )
+                )
+            day += datetime.timedelta(days=1)
+
+    if len(planned) > MAX_SCHEDULES:
+        return [], [
+            {
+                "row": None,
+                "errors": {
+                    "non_field_errors": [
+                        f"Roster expands to {len(planned)} schedules; "
+                        f"the limit is {MAX_SCHEDULES}."
+                    ]
+                },
+            }
+        ]
+
+    for number, message in find_overlaps(planned):
+        if message not in errors[number]["non_field_errors"]:
+            errors[number]["non_field_errors"].append(message)
+
+    if errors:
+        return [], [
+            {"row": number, "errors": dict(errors[number])} for number in sorted(errors)
+        ]
+    return [schedule for _, schedule in planned], []
+
+
+def find_overlaps(planned):
+    """
+    Yield (row number, message) for every planned schedule that overlaps an
+    existing schedule or another planned one for the same doctor and date.
+    Existing schedules are read in one query over the roster's date span.
+    """
+    if not planned:
+        return
+
+    intervals = defaultdict(list)  # (doctor, date) -> [(start, end, row)]
+    for number, schedule in planned:
+        intervals[(schedule.doctor_id, schedule.date)].append(
+            (schedule.start_time, schedule.end_time, number)
+        )
+
+    dates = [schedule.date for _, schedule in planned]
+    existing = DoctorSchedule.all_objects.filter(
+        doctor_id__in={schedule.doctor_id for _, schedule in planned},
+        date__range=(min(dates), max(dates)),
+    ).values_list("doctor_id", "date", "start_time", "end_time")
+    for doctor_id, day, start, end in existing:
+        if (doctor_id, day) in intervals:
+            intervals[(doctor_id, day)].append((start, end, None))
+
+    # Sweep each doctor-day in start order, comparing every interval with
+    # the one that reaches furthest so far.
+    for (_, day), items in intervals.items():
+        items.sort(key=lambda item: (item[0], item[1]))
+        reach = None
+        for start, end, number in items:
+            if reach is not None and start < reach[1]:
+                other = reach[2]
+                for row, peer in ((number, other), (other, number)):
+                    if row is None:
+                        continue
+                    if peer is None:
+                        yield row, f"Overlaps an existing schedule on {day}."
+                    else:
+                        yield row, f"Overlaps row {peer} on {day}."
+            if reach is None or end > reach[1]:
+                reach = (start, end, number)
+
+
+def apply_roster(schedules, user=None):
+    """Insert planned schedules and their slot rows in one transaction."""
+    for schedule in schedules:
+        schedule.last_modified_by = user
+    with transaction.atomic():
+        created = DoctorSchedule.all_objects.bulk_create(
+            schedules, batch_size=BATCH_SIZE
+        )
+        ScheduleSlot.objects.create_for(created)
+        availability_cache.invalidate_schedules(created)
+    return created
@@ -4,11 +4,13 @@ import datetime
 
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
+from django.db import transaction
 
 from rest_framework import serializers
 
+from appointment import cache as availability_cache
 from clinic.models import Clinic
-from schedules.models import DoctorSchedule
+from schedules.models import DoctorSchedule, ScheduleSlot
 
 
 class WeekdayField(serializers.CharField):
@@ -151,31 +153,62 @@ class RepeatedDoctorScheduleSerializer(serializers.Serializer):
         return data
 
     def create(self, validated_data):
-        """Handle bulk creation with proper time validation"""
-        schedules = []
+        """
+        Handle bulk creation with the same rules as DoctorSchedule.clean(),
+        checked in one overlap query instead of one per day.
+        """
+        start_time = validated_data["start_time"]
+        end_time = validated_data["end_time"]
+        dates = []
         current_date = validated_data["start_date"]
-
         while current_date <= validated_data["end_date"]:
             if current_date.weekday() in validated_data["weekdays"]:
-                # Create temporary instance for validation
-                temp_schedule = DoctorSchedule(
+                dates.append(current_date)
+            current_date += datetime.timedelta(days=1)
+
+        # Every new schedule shares one time window, so the overlap test
+        # reduces to "does this date already have a clashing schedule".
+        taken = set(
+            DoctorSchedule.all_objects.filter(
+                doctor=validated_data["doctor"],
+                date__range=(validated_data["start_date"], validated_data["end_date"]),
+                start_time__lt=end_time,
+                end_time__gt=start_time,
+            ).values_list("date", flat=True)
+        )
+
+        now = datetime.datetime.now()
+        schedules = []
+        for day in dates:
+            if datetime.datetime.combine(day, end_time) < now:
+                raise ValidationError("Cannot create schedule in the past")
+            if day in taken:
+                raise ValidationError("Overlapping schedule exists")
+            schedules.append(
+                DoctorSchedule(
                     doctor=validated_data["doctor"],
                     clinic=validated_data["clinic"],
-                    date=current_date,
-                    start_time=validated_data["start_time"],
-                    end_time=validated_data["end_time"],
+                    date=day,
+                    start_time=start_time,
+                    end_time=end_time,
                     slot_duration=validated_data["slot_duration"],
                     appointment_type=validated_data["appointment_type"],
                 )
+            )
 
-                try:
-                    # Validate against model constraints
-                    temp_schedule.full_clean()
-                    schedules.append(temp_schedule)
-                except ValidationError as e:
-                    if "overlap" not in e.message_dict:
-                        raise
+        # bulk_create() skips save(), so materialize the slot rows explicitly.
+        with transaction.atomic():
+            created = DoctorSchedule.all_objects.bulk_create(schedules)
+            ScheduleSlot.objects.create_for(created)
+            availability_cache.invalidate_schedules(created)
+        return created
 
-            current_date += datetime.timedelta(days=1)
 
-        return DoctorSchedule.all_objects.bulk_create(schedules)
+class RosterRuleSerializer(RepeatedDoctorScheduleSerializer):
+    """
+    One recurring rule of a roster import. Doctor and clinic are plain IDs
+    here; their existence is checked for the whole roster in bulk.
+    """
+
+    doctor = serializers.IntegerField(min_value=1)
+    clinic = serializers.IntegerField(min_value=1)
@@ -0,0 +1,161 @@
+"""Tests for the multi-doctor roster import endpoint."""
+
+from datetime import date, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from clinic.models import Clinic
+from profiles.models import DoctorProfile
+from schedules.models import DoctorSchedule, ScheduleSlot
+
+User = get_user_model()
+
+
+class RosterImportTests(APITestCase):
+    def setUp(self):
+        self.staff = User.objects.create_user(
+            email="staff@example.com",
+            first_name="Staff",
+            last_name="User",
+            password="password123",
+            is_staff=True,
+        )
+        self.doctors = []
+        for i in range(2):
+            doctor = User.objects.create_user(
+                email=f"doctor{i}@example.com",
+                first_name="Doc",
+                last_name=f"Tor{i}",
+                password="password123",
+            )
+            DoctorProfile.objects.create(user=doctor)
+            self.doctors.append(doctor)
+        self.clinics = [Clinic.objects.create(name=f"Clinic {i}") for i in range(2)]
+        self.start = date.today() + timedelta(days=7)
+        self.end = self.start + timedelta(days=13)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.staff)
+        self.url = reverse("schedule-import-roster")
+
+    def rule(self, doctor, clinic, **overrides):
+        return {
+            "doctor": doctor.id,
+            "clinic": clinic.id,
+            "start_date": self.start.isoformat(),
+            "end_date": self.end.isoformat(),
+            "weekdays": ["M", "T", "W", "R", "F", "S", "U"],
+            "start_time": "09:00",
+            "end_time": "11:00",
+            "slot_duration": 30,
+            "appointment_type": "physical",
+            **overrides,
+        }
+
+    def test_import_many_doctors_and_clinics(self):
+        rules = [
+            self.rule(self.doctors[0], self.clinics[0]),
+            self.rule(
+                self.doctors[0], self.clinics[1], start_time="13:00", end_time="15:00"
+            ),
+            self.rule(self.doctors[1], self.clinics[1], appointment_type="online"),
+        ]
+
+        res = self.client.post(self.url, {"rules": rules}, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data["schedules"], 42)
+        self.assertEqual(DoctorSchedule.all_objects.count(), 42)
+        self.assertEqual(ScheduleSlot.objects.count(), 42 * 4)
+        self.assertEqual(
+            DoctorSchedule.all_objects.filter(last_modified_by=self.staff).count(), 42
+        )
+
+    def test_validation_queries_do_not_grow_with_rows(self):
+        rules = [
+            self.rule(
+                self.doctors[i % 2],
+                self.clinics[i % 2],
+                start_time=f"{8 + i}:00",
+                end_time=f"{8 + i}:30",
+            )
+            for i in range(10)
+        ]
+
+        # doctors + clinics + one overlap scan
+        with self.assertNumQueries(3):
+            res = self.client.post(
+                self.url, {"rules": rules, "dry_run": True}, format="json"
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["schedules"], 140)
+        self.assertFalse(DoctorSchedule.all_objects.exists())
+
+    def test_per_row_errors_reject_whole_roster(self):
+        DoctorSchedule.objects.create(
+            doctor=self.doctors[1],
+            clinic=self.clinics[0],
+            date=self.start,
+            start_time=time(10, 0),
+            end_time=time(12, 0),
+            slot_duration=30,
+        )
+        rules = [
+            self.rule(self.doctors[0], self.clinics[0]),
+            self.rule(
+                self.doctors[0], self.clinics[1], start_time="10:30", end_time="12:00"
+            ),
+            self.rule(self.doctors[1], self.clinics[0]),
+            {**self.rule(self.doctors[1], self.clinics[0]), "doctor": 999999},
+            self.rule(self.doctors[1], self.clinics[0], slot_duration=0),
+        ]
+
+        res = self.client.post(self.url, {"rules": rules}, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        errors = {e["row"]: e["errors"] for e in res.data["errors"]}
+        self.assertEqual(set(errors), {1, 2, 3, 4, 5})
+        self.assertIn("Overlaps row 2", errors[1]["non_field_errors"][0])
+        self.assertIn("Overlaps row 1", errors[2]["non_field_errors"][0])
+        self.assertIn("existing schedule", errors[3]["non_field_errors"][0])
+        self.assertIn("doctor", errors[4])
+        self.assertIn("slot_duration", errors[5])
+        self.assertEqual(DoctorSchedule.all_objects.count(), 1)
+
+    def test_csv_upload(self):
+        header = "doctor,clinic,start_date,end_date,weekdays,start_time,end_time,slot_duration,appointment_type"
+        lines = [
+            header,
+            f"{self.doctors[0].id},{self.clinics[0].id},{self.start},{self.end},MWF,09:00,10:00,15,physical",
+            f'{self.doctors[1].id},{self.clinics[1].id},{self.start},{self.end},"S,U",14:00,15:00,30,online',
+        ]
+        upload = SimpleUploadedFile(
+            "roster.csv", "\n".join(lines).encode(), content_type="text/csv"
+        )
+
+        res = self.client.post(self.url, {"file": upload}, format="multipart")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data["rules"], 2)
+        self.assertEqual(
+            DoctorSchedule.all_objects.filter(doctor=self.doctors[1]).count(), 4
+        )
+        self.assertEqual(
+            DoctorSchedule.all_objects.filter(doctor=self.doctors[0]).count(), 6
+        )
+
+    def test_requires_staff(self):
+        self.client.force_authenticate(user=self.doctors[0])
+
+        res = self.client.post(
+            self.url,
+            {"rules": [self.rule(self.doctors[0], self.clinics[0])]},
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,223 @@
+"""Tests for the materialized ScheduleSlot rows."""
+
+from datetime import date, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from appointment.models import Appointment
+from clinic.models import Clinic
+from profiles.models import DoctorProfile
+from schedules.models import DoctorSchedule, ScheduleSlot
+from schedules.serializers import RepeatedDoctorScheduleSerializer
+
+User = get_user_model()
+
+
+class ScheduleSlotTests(TestCase):
+    def setUp(self):
+        self.doctor = User.objects.create_user(
+            email="doctor@example.com",
+            first_name="Doc",
+            last_name="Tor",
+            password="password123",
+        )
+        DoctorProfile.objects.create(user=self.doctor)
+        self.patient = User.objects.create_user(
+            email="patient@example.com",
+            first_name="Pat",
+            last_name="Ient",
+            password="password123",
+        )
+        self.clinic = Clinic.objects.create(name="Test Clinic")
+        self.schedule = DoctorSchedule.objects.create(
+            doctor=self.doctor,
+            clinic=self.clinic,
+            date=date.today() + timedelta(days=1),
+            start_time=time(9, 0),
+            end_time=time(10, 0),
+            slot_duration=15,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.patient)
+
+    def book(self, start_time):
+        return self.client.post(
+            reverse("appointment:appointment-list"),
+            {"schedule": self.schedule.id, "start_time": start_time},
+            format="json",
+        )
+
+    def test_slots_created_with_schedule(self):
+        slots = list(self.schedule.slots.values_list("start_time", "end_time"))
+        self.assertEqual(slots, self.schedule.get_time_slots())
+        self.assertFalse(self.schedule.slots.filter(is_booked=True).exists())
+
+    def test_booking_marks_slot_booked(self):
+        res = self.book("09:15:00")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        slot = self.schedule.slots.get(start_time=time(9, 15))
+        self.assertTrue(slot.is_booked)
+        self.assertNotIn(
+            (time(9, 15), time(9, 30)), self.schedule.get_available_time_slots()
+        )
+
+    def test_claim_is_conditional(self):
+        self.assertTrue(ScheduleSlot.objects.claim(self.schedule, time(9, 0)))
+        self.assertFalse(ScheduleSlot.objects.claim(self.schedule, time(9, 0)))
+        self.assertFalse(ScheduleSlot.objects.claim(self.schedule, time(9, 5)))
+
+    def test_cancel_frees_slot(self):
+        res = self.book("09:30:00")
+        url = reverse("appointment:appointment-cancel", kwargs={"pk": res.data["id"]})
+
+        self.client.post(url, {"cancellation_reason": "Not needed"}, format="json")
+
+        slot = self.schedule.slots.get(start_time=time(9, 30))
+        self.assertFalse(slot.is_booked)
+
+    def test_resize_keeps_booked_slot(self):
+        self.book("09:00:00")
+
+        self.schedule.end_time = time(9, 30)
+        self.schedule.save()
+
+        slots = list(self.schedule.slots.values_list("start_time", "is_booked"))
+        self.assertEqual(slots, [(time(9, 0), True), (time(9, 15), False)])
+
+    def test_bulk_create_materializes_slots(self):
+        start = date.today() + timedelta(days=7)
+        serializer = RepeatedDoctorScheduleSerializer(
+            data={
+                "doctor": self.doctor.id,
+                "clinic": self.clinic.id,
+                "start_date": start.isoformat(),
+                "end_date": (start + timedelta(days=6)).isoformat(),
+                "weekdays": ["M", "T", "W", "R", "F", "S", "U"],
+                "start_time": "13:00",
+                "end_time": "14:00",
+                "slot_duration": 30,
+                "appointment_type": "physical",
+            }
+        )
+        serializer.is_valid(raise_exception=True)
+
+        created = serializer.save()
+
+        self.assertEqual(len(created), 7)
+        self.assertEqual(ScheduleSlot.objects.filter(schedule__in=created).count(), 14)
+
+    def bulk_serializer(self, start, end, weekdays=("M", "T", "W", "R", "F")):
+        serializer = RepeatedDoctorScheduleSerializer(
+            data={
+                "doctor": self.doctor.id,
+                "clinic": self.clinic.id,
+                "start_date": start.isoformat(),
+                "end_date": end.isoformat(),
+                "weekdays": list(weekdays),
+                "start_time": "09:00",
+                "end_time": "12:00",
+                "slot_duration": 30,
+                "appointment_type": "physical",
+            }
+        )
+        serializer.is_valid(raise_exception=True)
+        return serializer
+
+    def test_bulk_create_query_count_is_constant(self):
+        start = date.today() + timedelta(days=30)
+        serializer = self.bulk_serializer(start, start + timedelta(days=364))
+
+        # overlap check + schedules insert + slots insert (+ savepoint pair)
+        with self.assertNumQueries(5):
+            created = serializer.save()
+
+        self.assertGreater(len(created), 250)
+        self.assertEqual(
+            ScheduleSlot.objects.filter(schedule__in=created).count(),
+            len(created) * 6,
+        )
+
+    def test_bulk_endpoint_response_loads_slots_in_one_query(self):
+        staff = User.objects.create_user(
+            email="staff@example.com",
+            first_name="Sta",
+            last_name="Ff",
+            password="password123",
+            is_staff=True,
+        )
+        self.client.force_authenticate(user=staff)
+        start = date.today() + timedelta(days=30)
+        payload = {
+            "doctor": self.doctor.id,
+            "clinic": self.clinic.id,
+            "start_date": start.isoformat(),
+            "end_date": (start + timedelta(days=27)).isoformat(),
+            "weekdays": ["M", "T", "W", "R", "F", "S", "U"],
+            "start_time": "09:00",
+            "end_time": "10:00",
+            "slot_duration": 30,
+            "appointment_type": "physical",
+        }
+
+        # doctor + clinic lookups, the five above, and one slot prefetch
+        with self.assertNumQueries(8):
+            res = self.client.post(
+                reverse("schedule-bulk-create-schedules"), payload, format="json"
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data), 28)
+        self.assertEqual(
+            res.data[0]["available_time_slots"],
+            ["09:00:00 - 09:30:00", "09:30:00 - 10:00:00"],
+        )
+
+    def test_create_for_matches_time_slots(self):
+        schedule = DoctorSchedule.all_objects.bulk_create(
+            [
+                DoctorSchedule(
+                    doctor=self.doctor,
+                    clinic=self.clinic,
+                    date=date.today() + timedelta(days=3),
+                    start_time=time(9, 10),
+                    end_time=time(10, 20),
+                    slot_duration=25,
+                )
+            ]
+        )[0]
+
+        ScheduleSlot.objects.create_for([schedule])
+
+        slots = list(schedule.slots.values_list("start_time", "end_time"))
+        self.assertEqual(slots, schedule.get_time_slots())
+        self.assertEqual(len(slots), 2)
+
+    def test_bulk_create_rejects_overlap(self):
+        start = self.schedule.date
+        serializer = self.bulk_serializer(start, start, weekdays="MTWRFSU")
+
+        with self.assertRaisesMessage(ValidationError, "Overlapping schedule"):
+            serializer.save()
+
+        self.assertEqual(DoctorSchedule.all_objects.count(), 1)
+
+    def test_direct_appointment_save_syncs_slot(self):
+        appt = Appointment.objects.create(
+            patient=self.patient,
+            schedule=self.schedule,
+            start_time=time(9, 45),
+            end_time=time(10, 0),
+        )
+        self.assertTrue(self.schedule.slots.get(start_time=time(9, 45)).is_booked)
+
+        appt.status = Appointment.Status.CANCELED
+        appt.save()
+
+        self.assertFalse(self.schedule.slots.get(start_time=time(9, 45)).is_booked)
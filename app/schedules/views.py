@@ -1,18 +1,31 @@
 """Views for the schedules app."""
 
+import csv
+
 from django.core.exceptions import ValidationError
+from django.db.models import Prefetch, prefetch_related_objects
 
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
-from schedules.models import DoctorSchedule
+from schedules.models import DoctorSchedule, ScheduleSlot
+from schedules.roster import apply_roster, parse_csv, plan_roster
 from schedules.serializers import (
     DoctorScheduleSerializer,
     RepeatedDoctorScheduleSerializer,
 )
 
 
+def free_slots_prefetch():
+    """Load free slots for the available_time_slots field in one query."""
+    return Prefetch(
+        "slots",
+        queryset=ScheduleSlot.objects.filter(is_booked=False),
+        to_attr="free_slots",
+    )
+
+
 class IsStaffUser(permissions.BasePermission):
     """Staff-only for write operations, public read"""
 
@@ -31,6 +44,7 @@ class DoctorScheduleViewSet(viewsets.ModelViewSet):
     - Soft delete implementation.
     - Uses custom manager for active schedules.
     - Custom action for bulk creation of schedules.
+    - Roster import of many doctors/clinics from CSV or JSON, with dry-run.
     - Public endpoint for available time slots.
 
     """
@@ -42,9 +56,13 @@ class DoctorScheduleViewSet(viewsets.ModelViewSet):
         """Return appropriate queryset based on user role"""
         if self.request.user.is_staff:
             # Staff sees all schedules through original manager
-            return DoctorSchedule.all_objects.all()
-        # Others see active future schedules through custom manager
-        return DoctorSchedule.objects.all()
+            qs = DoctorSchedule.all_objects.all()
+        else:
+            # Others see active future schedules through custom manager
+            qs = DoctorSchedule.objects.all()
+        if self.action == "list":
+            qs = qs.prefetch_related(free_slots_prefetch())
+        return qs
 
     @action(detail=False, methods=["post"], url_path="bulk")
     def bulk_create_schedules(self, request):
@@ -59,11 +77,62 @@ class DoctorScheduleViewSet(viewsets.ModelViewSet):
         except ValidationError as e:
             return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
+        prefetch_related_objects(created, free_slots_prefetch())
         return Response(
             DoctorScheduleSerializer(created, many=True).data,
             status=status.HTTP_201_CREATED,
         )
 
+    @action(detail=False, methods=["post"], url_path="import")
+    def import_roster(self, request):
+        """
+        Import a roster of recurring rules for many doctors and clinics.
+        Accepts a CSV upload in `file` or JSON {"rules": [...]}, each rule
+        shaped like the bulk endpoint's payload. Nothing is written if any
+        row fails; pass dry_run=true to only validate.
+        """
+        data = request.data if isinstance(request.data, dict) else {}
+        upload = request.FILES.get("file")
+        if upload is not None:
+            try:
+                rows = parse_csv(upload)
+            except (UnicodeDecodeError, csv.Error):
+                return Response(
+                    {"detail": "Could not read the CSV file."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+        else:
+            rows = data.get("rules")
+        if not isinstance(rows, list) or not rows:
+            return Response(
+                {"detail": "Provide a CSV file or a non-empty 'rules' list."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        dry_run = str(
+            request.query_params.get("dry_run", data.get("dry_run", ""))
+        ).lower() in ("1", "true", "yes")
+
+        schedules, errors = plan_roster(rows)
+        if errors:
+            return Response(
+                {"dry_run": dry_run, "rules": len(rows), "errors": errors},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        summary = {
+            "dry_run": dry_run,
+            "rules": len(rows),
+            "schedules": len(schedules),
+            "slots": sum(len(s.get_time_slots()) for s in schedules),
+            "errors": [],
+        }
+        if dry_run:
+            return Response(summary, status=status.HTTP_200_OK)
+
+        apply_roster(schedules, user=request.user)
+        return Response(summary, status=status.HTTP_201_CREATED)
+
     def perform_destroy(self, instance):
         """Soft delete implementation"""
         instance.is_active = False
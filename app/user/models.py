@@ -10,6 +10,8 @@ from django.contrib.auth.models import (
     PermissionsMixin,
 )
 from django.db import models
+from django.db.models import Case, F, Q, Value, When
+from django.db.models.functions import Concat
 
 
 class UserManager(BaseUserManager):
@@ -94,3 +96,27 @@ class User(AbstractBaseUser, PermissionsMixin):
             full_name += f"{self.middle_name} "
         full_name += self.last_name
         return full_name
+
+
+def full_name(prefix=""):
+    """
+    SQL version of User.__str__ for annotating names onto other rows,
+    e.g. full_name("doctor__") on an Appointment queryset. None when the
+    relation is empty, as for a missing user in Python.
+    """
+    middle = f"{prefix}middle_name"
+    return Case(
+        When(**{f"{prefix}id__isnull": True}, then=Value(None)),
+        default=Concat(
+            F(f"{prefix}first_name"),
+            Value(" "),
+            Case(
+                When(
+                    Q(**{f"{middle}__isnull": True}) | Q(**{middle: ""}),
+                    then=Value(""),
+                ),
+                default=Concat(F(middle), Value(" ")),
+            ),
+            F(f"{prefix}last_name"),
+        ),
+    )